@@ -8,16 +8,63 @@ Urutan kode sudah dirapikan:
 # =============================
 # IMPORT & INISIALISASI FLASK
 # =============================
-from flask import Flask, render_template, request, jsonify
-from utils.model_handler import ModelHandler
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context, g
+from utils.inference_rpc import InferenceUnavailable, build_classifier
 from utils.bmkg_api import BMKGHandler
+from utils.upstream_guard import set_budget, reset_budget
 from utils.word2vec_handler import Word2VecHandler
+from utils.spike_detector import SpikeDetector
+from utils.review_ingest import PlayStoreSource, ReviewStore, IngestWorker, spike_listener
+from utils.term_index import TermIndex, term_listener
+from utils.trending import TrendingTracker, trending_listener
+from utils.search_index import SearchIndex, search_listener
+from utils.embedding_store import EmbeddingStore, embedding_listener
+from utils.gazetteer import Gazetteer
+from utils.live_feed import LiveFeedBroadcaster
+from utils.quake_history import QuakeHistory, quake_listener
+from utils.leader import LeaderLock, SharedState
+from utils.artifacts import ArtifactStore, choose_encoding
+from utils.preprocessing import clean_text
+from utils.metrics import REGISTRY, HTTP_LATENCY, CACHE_REQUESTS
+import config
 import pandas as pd
+import numpy as np
 import os
 import threading
+import hmac
+import atexit
+import time
 import re
 
 app = Flask(__name__)
+artifact_store = ArtifactStore()
+
+@app.context_processor
+def inject_artifact_url():
+    """Template helper: {{ artifact_url('bug_report.json') }} -> URL ber-hash (cache immutable)"""
+    return {"artifact_url": artifact_store.url}
+
+@app.before_request
+def start_timer():
+    g.request_start = time.perf_counter()
+    # Route yang memanggil BMKG: timeout upstream dipotong ke sisa budget; habis -> data baik terakhir
+    rule = request.url_rule.rule if request.url_rule else None
+    g.budget_token = set_budget(config.ROUTE_BUDGETS.get(rule))
+
+@app.teardown_request
+def end_budget(exc=None):
+    token = g.pop('budget_token', None)
+    if token is not None:
+        reset_budget(token)
+
+@app.after_request
+def record_latency(response):
+    """Histogram latensi per route (pakai pola route, bukan URL mentah, agar kardinalitas tetap kecil)"""
+    start = g.pop('request_start', None)
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        HTTP_LATENCY.observe(time.perf_counter() - start, route=route, method=request.method, status=response.status_code)
+    return response
 
 # ==========================================
 # 1. SYSTEM BOOT: LOAD RESOURCES
@@ -26,20 +73,39 @@ print("🔌 SYSTEM BOOT: Initializing Neural Networks & Data Streams...")
 
 # A. Load AI Model
 try:
-    ai_brain = ModelHandler()
-    print("✅ AI CORE: ONLINE (IndoBERT Loaded)")
+    # INFERENCE_SERVER: model hidup di inference server terpisah (scripts/18_inference_server.py); web worker tanpa torch
+    ai_brain = build_classifier(config)
+    if config.INFERENCE_SERVER:
+        print(f"✅ AI CORE: REMOTE ({config.INFERENCE_SERVER})")
+    else:
+        print(f"✅ AI CORE: ONLINE ({'Student Bi-LSTM' if ai_brain.served_backend == 'student' else 'IndoBERT'} Loaded)")
 except Exception as e:
     print(f"❌ AI CORE ERROR: {e}")
     ai_brain = None
 
 # B. Load BMKG API Handler
 try:
-    bmkg_feed = BMKGHandler()
+    bmkg_feed = BMKGHandler(data_base_url=config.BMKG_DATA_BASE_URL, api_base_url=config.BMKG_API_BASE_URL,
+                            web_base_url=config.BMKG_WEB_BASE_URL, breaker_failures=config.UPSTREAM_BREAKER_FAILURES,
+                            breaker_reset=config.UPSTREAM_BREAKER_RESET, hedge_percentile=config.UPSTREAM_HEDGE_PERCENTILE,
+                            connect_timeout=config.UPSTREAM_CONNECT_TIMEOUT)
     print("✅ BMKG FEED: READY")
 except Exception as e:
     print(f"⚠️ BMKG FEED ERROR: {e}")
     bmkg_feed = None
 
+# B2. Live Feed Poller (1 poller upstream untuk SEMUA worker: leader menulis snapshot, worker lain membaca file itu)
+live_feed = LiveFeedBroadcaster(bmkg_feed, interval=config.LIVE_FEED_POLL_SECONDS,
+                                snapshot_path=config.LIVE_FEED_SNAPSHOT_PATH) if bmkg_feed else None
+
+# B3. Leader antar-worker (lock file): hanya 1 proses menjalankan poller upstream, ingest & arsip gempa
+leader_lock = LeaderLock(config.LEADER_LOCK_PATH)
+
+def owns_shared_state():
+    """State ingest (spike/term/trending) ditulis proses ini: leader dengan ingest di app.
+    Selain itu state dimuat ulang dari file (ditulis leader atau scripts/08_review_ingest.py)."""
+    return config.INGEST_IN_APP and leader_lock.held
+
 # C. Load Word2Vec
 word2vec_model = None
 def load_word2vec():
@@ -50,7 +116,94 @@ def load_word2vec():
     except Exception as e:
         print(f'❌ Word2Vec Load Error: {e}')
 
-threading.Thread(target=load_word2vec).start()
+if config.PRELOAD_MODELS:
+    load_word2vec()  # Mode preload: dimuat di master sebelum fork agar memorinya dibagi semua worker
+else:
+    threading.Thread(target=load_word2vec).start()
+
+# D. Spike Detector (Lonjakan Keluhan per Aspek/Emosi/Bug)
+spike_state = SharedState(config.SPIKE_STATE_PATH, lambda path: SpikeDetector.load(
+    path,
+    bucket_seconds=config.SPIKE_BUCKET_SECONDS,
+    alpha=config.SPIKE_ALPHA,
+    z_threshold=config.SPIKE_Z_THRESHOLD,
+    cusum_k=config.SPIKE_CUSUM_K,
+    cusum_h=config.SPIKE_CUSUM_H,
+    min_count=config.SPIKE_MIN_COUNT
+), is_owner=owns_shared_state)
+try:
+    print(f"✅ SPIKE DETECTOR: READY ({len(spike_state.get().series)} seri)")
+except Exception as e:
+    print(f"⚠️ SPIKE DETECTOR ERROR: {e}")
+    spike_state = None
+
+# D2. Index Frekuensi Kata (word cloud per filter, scripts/09_generate_wordcloud.py)
+term_state = SharedState(config.TERM_INDEX_PATH, TermIndex.load, is_owner=owns_shared_state)
+try:
+    print(f"✅ TERM INDEX: READY ({len(term_state.get().days)} hari)")
+except Exception as e:
+    print(f"⚠️ TERM INDEX ERROR: {e}")
+    term_state = None
+
+# D3. Kata Trending (sketch memori tetap; di-update per review ingest & teks /analyze)
+trending_state = SharedState(config.TRENDING_STATE_PATH, lambda path: TrendingTracker.load(
+    path,
+    short_half_life=config.TRENDING_SHORT_HALF_LIFE,
+    long_half_life=config.TRENDING_LONG_HALF_LIFE,
+    width=config.TRENDING_WIDTH,
+    depth=config.TRENDING_DEPTH,
+    k=config.TRENDING_TOP_K,
+    min_count=config.TRENDING_MIN_COUNT
+), is_owner=owns_shared_state)
+try:
+    print(f"✅ TRENDING SKETCH: READY ({trending_state.get().memory_bytes() // 1024} KB)")
+except Exception as e:
+    print(f"⚠️ TRENDING SKETCH ERROR: {e}")
+    trending_state = None
+
+def save_shared_state(records=None):
+    """Leader: tulis state ingest agar worker lain (dan restart berikutnya) melihatnya; follower tidak pernah menimpa"""
+    if owns_shared_state():
+        for state in (spike_state, term_state, trending_state):
+            if state:
+                state.save()
+
+atexit.register(save_shared_state)
+
+# D4. Pencarian Review BM25 (base mmap + delta; scripts/19_build_search_index.py)
+try:
+    search_index = SearchIndex.load(config.SEARCH_INDEX_DIR)
+    print(f"✅ SEARCH INDEX: READY ({search_index.n_docs} review)")
+except Exception as e:
+    print(f"⚠️ SEARCH INDEX ERROR: {e}")
+    search_index = None
+
+# D5. Keluhan Serupa (embedding IndoBERT float16 mmap + IVF; scripts/20_build_embeddings.py)
+try:
+    similar_store = EmbeddingStore.load(config.SIMILAR_INDEX_DIR)
+    print(f"✅ SIMILAR INDEX: READY ({similar_store.n} embedding, versi {similar_store.model_version})")
+except Exception as e:
+    print(f"⚠️ SIMILAR INDEX ERROR: {e}")
+    similar_store = None
+
+# D6. Gazetteer adm4 (mmap, KD-tree dibangun saat lookup koordinat pertama; scripts/21_build_gazetteer.py)
+try:
+    gazetteer = Gazetteer.load(config.GAZETTEER_DIR)
+    print(f"✅ GAZETTEER: READY ({len(gazetteer)} adm4)")
+except Exception as e:
+    print(f"⚠️ GAZETTEER ERROR: {e}")
+    gazetteer = None
+
+# D7. Arsip Riwayat Gempa (SQLite + R-tree; diisi poller live feed / scripts/22_quake_poller.py)
+try:
+    quake_history = QuakeHistory(config.QUAKE_DB_PATH)  # Listener poller dipasang hanya di leader (F)
+    print(f"✅ QUAKE HISTORY: READY ({quake_history.stats()['events']} event)")
+except Exception as e:
+    print(f"⚠️ QUAKE HISTORY ERROR: {e}")
+    quake_history = None
+
+def weather_reply(place, w):
+    return f"Cuaca di {w['kota']}, {place['kotkab'] or w['provinsi']}: {w['desc']}, Suhu {w['suhu']}°C, Humiditas {w['humid']}%, Angin {w['angin']} km/jam."
 
 # ==========================================
 # 5. API CHATBOT (INFORMASI GEMPA & CUACA)
@@ -85,6 +238,14 @@ def api_chatbot():
     if "cuaca" in msg or "hujan" in msg or "panas" in msg:
         try:
             print(f"[Chatbot] Query cuaca: {msg}")
+            # Gazetteer: desa/kecamatan/kota mana pun -> 1 adm4 -> 1 request prakiraan (bukan seluruh kota)
+            row = gazetteer.resolve(msg) if gazetteer else None
+            if row is not None and bmkg_feed:
+                place = gazetteer.place(row)
+                print(f"[Chatbot] Lokasi gazetteer: {place['desa']} ({place['code']})")
+                w = bmkg_feed.get_weather(place['code'], place['desa'], max_age=config.FORECAST_TTL)
+                if w:
+                    return jsonify({"reply": weather_reply(place, w)})
             kota = None
             for city in bmkg_feed.cities:
                 # Cek apakah nama kota (tanpa spasi, lowercase) ada di pertanyaan
@@ -118,6 +279,8 @@ def api_chatbot():
     if "peringatan" in msg or "warning" in msg:
         try:
             warnings = bmkg_feed.get_weather_warning() if bmkg_feed else []
+            if warnings is None:
+                return jsonify({"reply": "Maaf, data peringatan BMKG sedang tidak tersedia."})
             if not warnings:
                 return jsonify({"reply": "Tidak ada peringatan cuaca/gempa saat ini."})
             reply = "\n\n".join([f"{w['judul']}: {w['deskripsi']}" for w in warnings])
@@ -168,6 +331,77 @@ except Exception as e:
     print(f"❌ DATA STAT ERROR: {e}")
 
 
+# E. Ingest Worker Play Store (opsional, INGEST_IN_APP=1)
+ingest_worker = None
+
+def update_data_metrics(records):
+    """Listener ingest: perbarui kartu statistik dashboard tanpa membaca ulang CSV"""
+    global DATA_METRICS
+    total = int(DATA_METRICS['total'].replace('.', '') or 0) + len(records)
+    DATA_METRICS = dict(DATA_METRICS,
+                        total=f"{total:,}".replace(",", "."),
+                        size=f"{os.path.getsize(config.RAW_CSV) / 1024:.1f} KB",
+                        last_update=pd.Timestamp(records[-1]['Tanggal']).strftime('%d %b %Y'),
+                        status="Active")
+
+def build_ingest_worker():
+    """Dibangun saat proses menjadi leader: listener memegang state yang sudah tidak dimuat ulang dari file"""
+    listeners = [update_data_metrics]
+    if spike_state:
+        listeners.append(spike_listener(spike_state.get()))
+    if term_state:
+        listeners.append(term_listener(term_state.get()))
+    if trending_state:
+        listeners.append(trending_listener(trending_state.get()))
+    if search_index:
+        listeners.append(search_listener(search_index))
+    if similar_store:
+        listeners.append(embedding_listener(similar_store, ai_brain, batch_size=config.INGEST_BATCH_SIZE))
+    listeners.append(save_shared_state)  # Tiap batch: worker lain memuat ulang state dari file
+    return IngestWorker(
+        PlayStoreSource(app_id=config.INGEST_APP_ID),
+        ReviewStore(config.RAW_CSV, config.LIVE_LABELED_CSV),
+        ai_brain, config.INGEST_CURSOR_PATH,
+        batch_size=config.INGEST_BATCH_SIZE, poll_interval=config.INGEST_POLL_SECONDS,
+        listeners=listeners
+    )
+
+
+# F. Thread Background
+def start_leader_services():
+    """Layanan tunggal (1 proses untuk semua worker): poller upstream BMKG, arsip gempa, worker ingest"""
+    global ingest_worker
+    print(f"👑 LEADER: proses {os.getpid()} menjalankan poller upstream & ingest")
+    for state in (spike_state, term_state, trending_state):
+        if state:
+            state.value = None  # Muat ulang sekali: state follower bisa tertinggal dari file leader lama
+            state.get()
+    if live_feed:
+        if quake_history and config.QUAKE_HISTORY_IN_APP:
+            live_feed.listeners.append(quake_listener(quake_history))
+        live_feed.become_primary()
+    if config.INGEST_IN_APP and ai_brain:
+        ingest_worker = build_ingest_worker()
+        threading.Thread(target=ingest_worker.run_forever, daemon=True).start()
+        print("✅ INGEST WORKER: RUNNING")
+
+def start_background_services():
+    """Thread tidak ikut ter-fork: mode preload memanggil ini per worker dari gunicorn.conf.py (post_fork).
+    Watcher registry model berjalan per worker (tiap worker memegang modelnya sendiri); sisanya hanya di leader,
+    worker lain mengikuti snapshot live feed leader & mengambil alih jika leader mati."""
+    if ai_brain and not config.INFERENCE_SERVER and config.MODEL_WATCH_SECONDS > 0:
+        ai_brain.watch_registry(config.MODEL_WATCH_SECONDS)
+    if live_feed:
+        live_feed.start()  # Follower: membaca snapshot leader (tanpa request ke BMKG)
+    if leader_lock.try_acquire():
+        start_leader_services()
+    else:
+        leader_lock.wait_async(start_leader_services, interval=config.LEADER_RETRY_SECONDS)
+
+if not config.PRELOAD_MODELS:
+    start_background_services()
+
+
 # ==========================================
 # 3. WEB ROUTES (PAGES)
 # ==========================================
@@ -204,10 +438,36 @@ def semantic_lab():
 # 4. API ENDPOINTS (JSON DATA)
 # ==========================================
 
+@app.route('/data/<path:name>')
+def data_artifact(name):
+    """Artefak JSON Pipeline (precompressed br/gzip + ETag kuat + 304)"""
+    entry = artifact_store.entry(name)
+    if not entry: return jsonify({"error": f"Artefak '{name}' tidak ada di manifest."}), 404
+
+    encoding = choose_encoding(request.headers.get('Accept-Encoding'), entry)
+    etag = f"{entry['hash']}-{encoding or 'identity'}"
+    # URL ber-hash aman di-cache selamanya; URL polos wajib revalidasi (murah: 304)
+    if request.args.get('v') == entry['hash']:
+        cache_control = 'public, max-age=31536000, immutable'
+    else:
+        cache_control = 'public, no-cache'
+
+    if request.if_none_match.contains(etag):
+        resp = Response(status=304)
+    else:
+        resp = Response(artifact_store.read(name, encoding), mimetype='application/json')
+        if encoding:
+            resp.headers['Content-Encoding'] = encoding
+    resp.set_etag(etag)
+    resp.headers['Cache-Control'] = cache_control
+    resp.headers['Vary'] = 'Accept-Encoding'
+    return resp
+
 # Endpoint Word2Vec untuk Semantic Lab
 @app.route('/api/word2vec')
 def api_word2vec():
-    word = request.args.get('word', '').strip().lower()
+    # Pipeline sama dengan training Word2Vec ("gak" -> "tidak")
+    word = clean_text(request.args.get('word', ''), slang=True)
     if not word:
         return jsonify({"error": "Parameter 'word' kosong."}), 400
     if not word2vec_model or not hasattr(word2vec_model, 'get_similar'):
@@ -228,7 +488,11 @@ def analyze():
     
     try:
         result = ai_brain.predict(text)
+        if trending_state:
+            trending_state.get().observe(text)
         return jsonify(result)
+    except InferenceUnavailable as e:
+        return jsonify({"error": str(e)}), 503
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -236,13 +500,162 @@ def analyze():
 def model_info():
     """API Metadata Model"""
     if not ai_brain: return jsonify({})
-    return jsonify(ai_brain.get_model_metadata())
+    try:
+        return jsonify(ai_brain.get_model_metadata())
+    except InferenceUnavailable as e:
+        return jsonify({"error": str(e)}), 503
+
+@app.route('/admin/model/activate', methods=['POST'])
+def admin_model_activate():
+    """Aktifkan versi model lalu hot-swap di background (worker lain menyusul via registry watcher)"""
+    token = request.headers.get('X-Admin-Token', '')
+    if not config.ADMIN_TOKEN or not hmac.compare_digest(token, config.ADMIN_TOKEN):
+        return jsonify({"error": "Forbidden"}), 403
+    if not ai_brain: return jsonify({"error": "AI System Not Loaded"}), 500
+
+    data = request.get_json(silent=True) or {}
+    head, version = data.get('head'), data.get('version')
+    if head not in ('absa', 'emotion'):
+        return jsonify({"error": "head harus 'absa' atau 'emotion'"}), 400
+    try:
+        # Tanpa versi: muat ulang versi aktif registry (mis. setelah file model diganti)
+        return jsonify(ai_brain.activate(head, version)), 202
+    except KeyError as e:
+        return jsonify({"error": str(e)}), 404
+    except InferenceUnavailable as e:
+        return jsonify({"error": str(e)}), 503
+
+@app.route('/api/alerts')
+def api_alerts():
+    """Alert Lonjakan Keluhan (Streaming Spike Detection)"""
+    if not spike_state: return jsonify({"alerts": [], "bucket_seconds": 0})
+    spike_detector = spike_state.get()
+    return jsonify({"alerts": spike_detector.alerts(), "bucket_seconds": spike_detector.bucket_seconds})
+
+@app.route('/api/terms')
+def api_terms():
+    """Top kata untuk word cloud: gabungan irisan per hari (from/to YYYY-MM-DD, sentiment, aspect, emotion)"""
+    index = term_state.get() if term_state else None
+    if index is None: return jsonify({"error": "Term index belum siap."}), 500
+
+    args = request.args
+    for key in ('from', 'to'):
+        if args.get(key) and not re.fullmatch(r'\d{4}-\d{2}-\d{2}', args[key]):
+            return jsonify({"error": f"Parameter '{key}' harus berformat YYYY-MM-DD."}), 400
+    try:
+        top = min(int(args.get('top', 50)), config.TERMS_MAX_TOP)
+    except ValueError:
+        return jsonify({"error": "Parameter 'top' harus angka."}), 400
+
+    first, last = index.date_range()
+    result = index.query(args.get('from'), args.get('to'), top=top, sentimen=args.get('sentiment') or None,
+                         aspek=args.get('aspect') or None, emosi=args.get('emotion') or None)
+    return jsonify(dict(result, available={"from": first, "to": last}))
+
+@app.route('/api/trending')
+def api_trending():
+    """Kata/frasa yang naik sekarang vs baseline (lift) + heavy hitter jendela pendek"""
+    if not trending_state: return jsonify({"trending": [], "top": []})
+    trending = trending_state.get()
+    try:
+        top = min(int(request.args.get('top', 20)), config.TRENDING_TOP_K)
+    except ValueError:
+        return jsonify({"error": "Parameter 'top' harus angka."}), 400
+    return jsonify({
+        "trending": trending.trending(top),
+        "top": trending.heavy_hitters(top),
+        "half_life_s": {"short": config.TRENDING_SHORT_HALF_LIFE, "long": config.TRENDING_LONG_HALF_LIFE}
+    })
+
+@app.route('/api/search')
+def api_search():
+    """Cari review (BM25) + filter bintang, tanggal, sentiment, aspect, emotion, category; q kosong = terbaru"""
+    if not search_index: return jsonify({"error": "Search index belum siap."}), 500
+
+    args = request.args
+    for key in ('from', 'to'):
+        if args.get(key) and not re.fullmatch(r'\d{4}-\d{2}-\d{2}', args[key]):
+            return jsonify({"error": f"Parameter '{key}' harus berformat YYYY-MM-DD."}), 400
+    try:
+        top = max(0, min(int(args.get('top', 20)), config.SEARCH_MAX_TOP))
+        offset = max(0, int(args.get('offset', 0)))
+        bintang = [int(b) for b in args['bintang'].split(',')] if args.get('bintang') else None
+    except ValueError:
+        return jsonify({"error": "Parameter 'top', 'offset' & 'bintang' harus angka."}), 400
+
+    search_index.refresh()
+    result = search_index.search(args.get('q', ''), top=top, offset=offset, bintang=bintang,
+                                 date_from=args.get('from'), date_to=args.get('to'),
+                                 sentimen=args.get('sentiment'), aspek=args.get('aspect'),
+                                 emosi=args.get('emotion'), kategori=args.get('category'))
+    return jsonify(dict(result, q=args.get('q', ''), top=top, offset=offset))
+
+@app.route('/api/similar_reviews')
+def api_similar_reviews():
+    """Review arsip paling mirip secara makna (cosine embedding IndoBERT): text=... atau id=baris hasil sebelumnya"""
+    if not similar_store: return jsonify({"error": "Similar index belum siap."}), 500
+    similar_store.refresh()
+    if not similar_store.n:
+        return jsonify({"error": "Embedding belum dibangun. Jalankan scripts/20_build_embeddings.py"}), 500
+
+    args = request.args
+    try:
+        top = max(0, min(int(args.get('top', 20)), config.SIMILAR_MAX_TOP))
+        bintang = [int(b) for b in args['bintang'].split(',')] if args.get('bintang') else None
+        row = int(args['id']) if args.get('id') else None
+    except ValueError:
+        return jsonify({"error": "Parameter 'top', 'id' & 'bintang' harus angka."}), 400
+
+    if row is not None:
+        if not 0 <= row < similar_store.n:
+            return jsonify({"error": f"Review id {row} tidak ada."}), 404
+        vector = similar_store.vector(row)
+    else:
+        text = args.get('text', '').strip()
+        if not text: return jsonify({"error": "Parameter 'text' atau 'id' wajib diisi."}), 400
+        if not ai_brain: return jsonify({"error": "AI System Not Loaded"}), 500
+        try:
+            version, vectors = ai_brain.embed_batch([text])
+        except InferenceUnavailable as e:
+            return jsonify({"error": str(e)}), 503
+        if version != similar_store.model_version:
+            return jsonify({"error": f"Embedding arsip dibuat encoder versi {similar_store.model_version}, model aktif "
+                                     f"versi {version}. Jalankan scripts/20_build_embeddings.py --rebuild"}), 409
+        vector = vectors[0]
+
+    results = similar_store.search(vector, top=top, nprobe=config.SIMILAR_NPROBE, bintang=bintang, exclude=row)
+    return jsonify({"results": results, "indexed": similar_store.n, "model_version": similar_store.model_version})
+
+@app.route('/api/ingest_status')
+def api_ingest_status():
+    """Status Worker Ingest Review"""
+    if not ingest_worker: return jsonify({"running": False, "leader": leader_lock.held})
+    return jsonify(dict(ingest_worker.stats, running=True, leader=True, cursor=ingest_worker.cursor))
+
+@app.route('/api/stream')
+def api_stream():
+    """Push Channel SSE: Gempa Terkini, Riwayat Gempa & Peringatan Dini"""
+    if not live_feed: return jsonify({"error": "BMKG Handler Error"}), 500
+    # Tiap koneksi SSE memegang 1 thread worker: sisakan thread untuk request biasa; client di atas batas
+    # jatuh ke polling /api/live_quake lalu mencoba stream lagi
+    if len(live_feed.subscribers) >= config.SSE_MAX_STREAMS:
+        return jsonify({"error": "Kapasitas stream penuh"}), 503, {'Retry-After': str(config.SSE_RETRY_SECONDS)}
+    stream = live_feed.stream(max_seconds=config.SSE_MAX_SECONDS, retry_ms=config.SSE_RETRY_SECONDS * 1000)
+    return Response(stream_with_context(stream), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 @app.route('/api/live_quake')
 def api_live_quake():
     """Proxy API Gempa BMKG (Latest & Recent)"""
     if not bmkg_feed: return jsonify({"error": "BMKG Handler Error"}), 500
-    
+
+    # Sajikan dari snapshot poller jika sudah terisi (tanpa hit upstream per request)
+    if live_feed and live_feed.ready.is_set():
+        CACHE_REQUESTS.inc(cache='live_feed', result='hit')
+        snap = live_feed.get_snapshot()
+        return jsonify({"latest": snap['latest'], "recent": snap['recent']})
+    CACHE_REQUESTS.inc(cache='live_feed', result='miss')
+
     latest = bmkg_feed.get_latest_quake()
     recent = bmkg_feed.get_recent_quakes()
     return jsonify({"latest": latest, "recent": recent})
@@ -254,12 +667,136 @@ def api_live_weather():
     weather_data = bmkg_feed.get_all_weather()
     return jsonify(weather_data)
 
+@app.route('/api/weather/lookup')
+def api_weather_lookup():
+    """Prakiraan adm4 mana pun: q=teks bebas, lat=&lon= (adm4 terdekat), atau code=kode adm4"""
+    if not gazetteer: return jsonify({"error": "Gazetteer belum siap."}), 500
+    args = request.args
+    distance = None
+    if args.get('lat') or args.get('lon'):
+        try:
+            lat, lon = float(args['lat']), float(args['lon'])
+        except (KeyError, ValueError):
+            return jsonify({"error": "Parameter 'lat' & 'lon' harus angka."}), 400
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            return jsonify({"error": "Koordinat di luar jangkauan."}), 400
+        row, distance = gazetteer.nearest(lat, lon)[0]
+        if distance > config.GAZETTEER_MAX_DISTANCE_KM:
+            return jsonify({"error": f"Tidak ada wilayah gazetteer dalam {config.GAZETTEER_MAX_DISTANCE_KM:.0f} km dari titik ini."}), 404
+    elif args.get('code'):
+        row = gazetteer.by_code(args['code'])
+    elif args.get('q', '').strip():
+        row = gazetteer.resolve(args['q'])
+    else:
+        return jsonify({"error": "Parameter 'q', 'lat'/'lon', atau 'code' wajib diisi."}), 400
+    if row is None:
+        return jsonify({"error": "Lokasi tidak ditemukan di gazetteer."}), 404
+
+    place = gazetteer.place(row, distance_km=distance)
+    weather = bmkg_feed.get_weather(place['code'], place['desa'], max_age=config.FORECAST_TTL) if bmkg_feed else None
+    # Seed 33 kota: adm4 terdekat = titik wakil kota, bukan desa tempat pengguna (sampai ekspor adm4 lengkap dibundel)
+    return jsonify({"place": place, "weather": weather, "resolution": "kota" if gazetteer.city_level else "desa"})
+
+ADM4_RE = re.compile(r'\d{2}\.\d{2}\.\d{2}\.\d{4}')
+LOCAL_TIME_RE = re.compile(r'\d{4}-\d{2}-\d{2}([T ]\d{2}:\d{2}(:\d{2})?)?')
+
+def resolve_forecast_city(city):
+    """Nama kota daftar BMKGHandler, kode adm4, atau teks bebas (gazetteer) -> (kode adm4, nama) / (None, None)"""
+    for c in bmkg_feed.cities:
+        if c['name'].lower() == city.lower():
+            return c['code'], c['name']
+    if ADM4_RE.fullmatch(city):
+        row = gazetteer.by_code(city) if gazetteer else None  # Kode di luar gazetteer tetap bisa diminta ke BMKG
+        return city, gazetteer.place(row)['desa'] if row is not None else None
+    row = gazetteer.resolve(city) if gazetteer else None
+    if row is None:
+        return None, None
+    place = gazetteer.place(row)
+    return place['code'], place['desa']
+
+@app.route('/api/forecast')
+def api_forecast():
+    """Prakiraan semua time step 1 lokasi (city=nama/kode adm4/teks), opsional from/to waktu lokal YYYY-MM-DD[THH:MM]"""
+    if not bmkg_feed: return jsonify({"error": "BMKG Handler Error"}), 500
+    args = request.args
+    city = args.get('city', '').strip()
+    if not city: return jsonify({"error": "Parameter 'city' wajib diisi."}), 400
+    bounds = {}
+    for key in ('from', 'to'):
+        value = args.get(key)
+        if value and not LOCAL_TIME_RE.fullmatch(value):
+            return jsonify({"error": f"Parameter '{key}' harus berformat YYYY-MM-DD atau YYYY-MM-DDTHH:MM."}), 400
+        if value:
+            bounds[key] = int(np.datetime64(value.replace(' ', 'T'), 's').astype(np.int64))
+            if key == 'to' and len(value) == 10:
+                bounds[key] += 86399  # Tanggal saja = sampai akhir hari itu
+
+    code, name = resolve_forecast_city(city)
+    if not code: return jsonify({"error": f"Lokasi '{city}' tidak ditemukan."}), 404
+    store = bmkg_feed.forecasts
+    age = store.age(code)
+    if age is None or age >= config.FORECAST_TTL:
+        CACHE_REQUESTS.inc(cache='forecast', result='miss')
+        if not bmkg_feed.fetch_single_weather({"name": name or code, "code": code}) and age is None:
+            return jsonify({"error": "Prakiraan BMKG tidak tersedia untuk lokasi ini."}), 503
+    else:
+        CACHE_REQUESTS.inc(cache='forecast', result='hit')
+    result = store.query(code, start=bounds.get('from'), end=bounds.get('to'))
+    return jsonify(dict(result, city=name or result['lokasi'].get('desa'), age_seconds=round(store.age(code), 1)))
+
+@app.route('/api/quakes')
+def api_quakes():
+    """Arsip gempa: bbox=minLon,minLat,maxLon,maxLat, since/until UTC YYYY-MM-DD[THH:MM], min_mag, limit; terbaru dulu"""
+    if not quake_history: return jsonify({"error": "Arsip gempa tidak tersedia"}), 500
+    args = request.args
+    bbox = None
+    if args.get('bbox'):
+        try:
+            bbox = tuple(float(v) for v in args['bbox'].split(','))
+        except ValueError:
+            bbox = ()
+        if len(bbox) != 4 or bbox[0] > bbox[2] or bbox[1] > bbox[3]:
+            return jsonify({"error": "Parameter 'bbox' harus berformat minLon,minLat,maxLon,maxLat."}), 400
+    bounds = {}
+    for key in ('since', 'until'):
+        value = args.get(key)
+        if value and not LOCAL_TIME_RE.fullmatch(value):
+            return jsonify({"error": f"Parameter '{key}' harus berformat YYYY-MM-DD atau YYYY-MM-DDTHH:MM (UTC)."}), 400
+        if value:
+            bounds[key] = int(np.datetime64(value.replace(' ', 'T'), 's').astype(np.int64))
+            if key == 'until' and len(value) == 10:
+                bounds[key] += 86399
+    try:
+        min_mag = float(args['min_mag']) if args.get('min_mag') else None
+        limit = min(max(int(args.get('limit', 100)), 1), config.QUAKES_MAX_LIMIT)
+    except ValueError:
+        return jsonify({"error": "Parameter 'min_mag' / 'limit' harus berupa angka."}), 400
+
+    quakes = quake_history.query(bbox=bbox, since=bounds.get('since'), until=bounds.get('until'), min_mag=min_mag, limit=limit)
+    return jsonify({"quakes": quakes, "count": len(quakes), "archive": quake_history.stats()})
+
 @app.route('/api/weather_warning')
 def api_weather_warning():
     """Proxy API Peringatan Dini (CAP)"""
     if not bmkg_feed: return jsonify([])
+    if live_feed and live_feed.ready.is_set():
+        CACHE_REQUESTS.inc(cache='live_feed', result='hit')
+        return jsonify(live_feed.get_snapshot()['warnings'])
+    CACHE_REQUESTS.inc(cache='live_feed', result='miss')
     warnings = bmkg_feed.get_weather_warning()
-    return jsonify(warnings)
+    return jsonify(warnings or [])
+
+
+@app.route('/api/upstream_status')
+def api_upstream_status():
+    """State circuit breaker per host BMKG, umur data baik terakhir & delay hedge per feed"""
+    if not bmkg_feed: return jsonify({"error": "BMKG Handler Error"}), 500
+    return jsonify(bmkg_feed.status())
+
+@app.route('/metrics')
+def metrics():
+    """Metrik Prometheus (route latency, inferensi, upstream BMKG, Word2Vec, cache)"""
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
 
 
 if __name__ == '__main__':
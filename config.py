@@ -0,0 +1,133 @@
+"""
+Konfigurasi terpusat BMKG-INTEL.
+Semua nilai bisa di-override lewat environment variable (lihat nama di os.environ.get).
+"""
+import os
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+MODELS_DIR = os.path.join(BASE_DIR, 'models')
+STATIC_DIR = os.path.join(BASE_DIR, 'static')
+
+# --- DATA ---
+RAW_CSV = os.path.join(DATA_DIR, 'raw', 'arsip_scraping_lengkap.csv')
+ABSA_CSV = os.path.join(DATA_DIR, 'processed', 'dataset_absa_labeled.csv')
+EMOTION_CSV = os.path.join(DATA_DIR, 'processed', 'dataset_emotion_labeled.csv')
+
+# --- DEDUPE HAMPIR-DUPLIKAT SEBELUM AUTO-LABELING (scripts/01_data_preparation.py) ---
+NEAR_DUP_THRESHOLD = float(os.environ.get('NEAR_DUP_THRESHOLD', 0.8))   # Estimasi Jaccard k-gram minimum
+NEAR_DUP_NUM_PERM = int(os.environ.get('NEAR_DUP_NUM_PERM', 128))      # Panjang signature MinHash
+NEAR_DUP_REPORT = os.path.join(DATA_DIR, 'processed', 'near_duplicates.json')
+
+# --- BACKEND MODEL ('indobert' atau 'student' hasil scripts/15_distill_student.py) ---
+MODEL_BACKEND = os.environ.get('MODEL_BACKEND', 'indobert')
+STUDENT_MODEL_DIR = os.environ.get('STUDENT_MODEL_DIR', os.path.join(MODELS_DIR, 'student_model'))
+
+# --- REGISTRY VERSI MODEL & HOT-SWAP (scripts/16_model_registry.py) ---
+MODEL_WATCH_SECONDS = int(os.environ.get('MODEL_WATCH_SECONDS', 10))  # 0 = tidak memantau models/registry.json
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN', '')                       # Kosong = endpoint /admin/* nonaktif
+
+# --- SERVING MULTI-WORKER (gunicorn.conf.py) ---
+# 1 = model & Word2Vec dimuat sinkron di master sebelum fork; thread background dimulai per worker
+PRELOAD_MODELS = os.environ.get('PRELOAD_MODELS', '0') == '1'
+TORCH_THREADS_PER_WORKER = int(os.environ.get('TORCH_THREADS_PER_WORKER', 0))  # 0 = core / jumlah worker
+
+# --- INFERENCE SERVER TERPISAH (scripts/18_inference_server.py) ---
+INFERENCE_SERVER = os.environ.get('INFERENCE_SERVER', '')      # '' = model di proses web; 'unix:/path.sock' / 'host:port'
+INFERENCE_LISTEN = os.environ.get('INFERENCE_LISTEN', 'unix:/tmp/bmkg-infer.sock')
+INFERENCE_TIMEOUT = float(os.environ.get('INFERENCE_TIMEOUT', 5.0))     # Detik, per request web -> inference
+INFERENCE_MAX_BATCH = int(os.environ.get('INFERENCE_MAX_BATCH', 32))
+INFERENCE_MAX_WAIT_MS = float(os.environ.get('INFERENCE_MAX_WAIT_MS', 5))  # Jendela pengumpulan batch lintas client
+
+# --- CASCADE INFERENSI (tier cepat TF-IDF -> IndoBERT) ---
+CASCADE_ENABLED = os.environ.get('CASCADE_ENABLED', '0') == '1'
+CASCADE_THRESHOLD = float(os.environ.get('CASCADE_THRESHOLD', 0.85))  # Lihat data/benchmarks/cascade_report.json
+FAST_MODEL_PATH = os.environ.get('FAST_MODEL_PATH', os.path.join(MODELS_DIR, 'fast_classifier.pkl'))
+
+# --- DETEKSI LONJAKAN KELUHAN (SPIKE DETECTOR) ---
+SPIKE_STATE_PATH = os.environ.get('SPIKE_STATE_PATH', os.path.join(DATA_DIR, 'processed', 'spike_state.json'))
+SPIKE_BUCKET_SECONDS = int(os.environ.get('SPIKE_BUCKET_SECONDS', 86400))  # 1 bucket = 1 hari
+SPIKE_ALPHA = float(os.environ.get('SPIKE_ALPHA', 0.1))                   # Bobot EWMA
+SPIKE_Z_THRESHOLD = float(os.environ.get('SPIKE_Z_THRESHOLD', 3.0))
+SPIKE_CUSUM_K = float(os.environ.get('SPIKE_CUSUM_K', 0.5))
+SPIKE_CUSUM_H = float(os.environ.get('SPIKE_CUSUM_H', 5.0))
+SPIKE_MIN_COUNT = int(os.environ.get('SPIKE_MIN_COUNT', 5))               # Minimal laporan agar dianggap lonjakan
+
+# --- INDEX FREKUENSI KATA (scripts/09_generate_wordcloud.py, /api/terms) ---
+TERM_INDEX_PATH = os.environ.get('TERM_INDEX_PATH', os.path.join(DATA_DIR, 'processed', 'term_index.json'))
+TERMS_MAX_TOP = int(os.environ.get('TERMS_MAX_TOP', 300))
+
+# --- PENCARIAN REVIEW BM25 (scripts/19_build_search_index.py, /api/search) ---
+SEARCH_INDEX_DIR = os.environ.get('SEARCH_INDEX_DIR', os.path.join(DATA_DIR, 'processed', 'search_index'))
+SEARCH_MAX_TOP = int(os.environ.get('SEARCH_MAX_TOP', 100))
+
+# --- KELUHAN SERUPA (EMBEDDING INDOBERT, scripts/20_build_embeddings.py, /api/similar_reviews) ---
+SIMILAR_INDEX_DIR = os.environ.get('SIMILAR_INDEX_DIR', os.path.join(DATA_DIR, 'processed', 'embeddings'))
+SIMILAR_MAX_TOP = int(os.environ.get('SIMILAR_MAX_TOP', 50))
+SIMILAR_NPROBE = int(os.environ.get('SIMILAR_NPROBE', 8))   # Cluster IVF yang diperiksa per query (recall vs latensi)
+
+# --- KLASTER KELUHAN OTOMATIS (scripts/07_bug_extraction.py, melengkapi kategori rule-based) ---
+COMPLAINT_CLUSTER_STATE = os.environ.get('COMPLAINT_CLUSTER_STATE', os.path.join(DATA_DIR, 'processed', 'complaint_clusters.pkl'))
+COMPLAINT_CLUSTERS = int(os.environ.get('COMPLAINT_CLUSTERS', 20))
+COMPLAINT_CLUSTER_CHUNK = int(os.environ.get('COMPLAINT_CLUSTER_CHUNK', 5000))  # Baris arsip per partial_fit
+
+# --- KATA TRENDING (SKETCH COUNT-MIN + SPACE-SAVING, /api/trending) ---
+TRENDING_STATE_PATH = os.environ.get('TRENDING_STATE_PATH', os.path.join(DATA_DIR, 'processed', 'trending_state.npz'))
+TRENDING_SHORT_HALF_LIFE = int(os.environ.get('TRENDING_SHORT_HALF_LIFE', 6 * 3600))   # Detik, jendela "sekarang"
+TRENDING_LONG_HALF_LIFE = int(os.environ.get('TRENDING_LONG_HALF_LIFE', 7 * 86400))   # Detik, baseline
+TRENDING_WIDTH = int(os.environ.get('TRENDING_WIDTH', 16384))   # Memori = 2 x depth x width x 8 byte (default 1 MB)
+TRENDING_DEPTH = int(os.environ.get('TRENDING_DEPTH', 4))
+TRENDING_TOP_K = int(os.environ.get('TRENDING_TOP_K', 256))
+TRENDING_MIN_COUNT = float(os.environ.get('TRENDING_MIN_COUNT', 3))
+
+# --- GAZETTEER ADM4 (scripts/21_build_gazetteer.py, cuaca lokasi mana pun di chatbot & /api/weather/lookup) ---
+GAZETTEER_SOURCE = os.environ.get('GAZETTEER_SOURCE', os.path.join(DATA_DIR, 'gazetteer', 'wilayah_seed.csv'))
+GAZETTEER_DIR = os.environ.get('GAZETTEER_DIR', os.path.join(DATA_DIR, 'gazetteer', 'adm4'))
+GAZETTEER_MAX_DISTANCE_KM = float(os.environ.get('GAZETTEER_MAX_DISTANCE_KM', 50))  # Lookup lat/lon lebih jauh -> 404
+
+# --- PRAKIRAAN MULTI-HARI (ForecastStore kolumnar, /api/forecast) ---
+FORECAST_TTL = int(os.environ.get('FORECAST_TTL', 600))  # Detik sebelum prakiraan 1 lokasi di-fetch ulang dari BMKG
+
+# --- ARSIP RIWAYAT GEMPA (SQLite + R-tree, scripts/22_quake_poller.py, /api/quakes) ---
+QUAKE_DB_PATH = os.environ.get('QUAKE_DB_PATH', os.path.join(DATA_DIR, 'processed', 'quake_history.sqlite'))
+QUAKE_HISTORY_IN_APP = os.environ.get('QUAKE_HISTORY_IN_APP', '1') == '1'  # Arsipkan dari poller live feed di app
+QUAKES_MAX_LIMIT = int(os.environ.get('QUAKES_MAX_LIMIT', 1000))
+
+# --- INGEST REVIEW PLAY STORE ---
+LIVE_LABELED_CSV = os.path.join(DATA_DIR, 'processed', 'live_reviews_labeled.csv')
+INGEST_CURSOR_PATH = os.environ.get('INGEST_CURSOR_PATH', os.path.join(DATA_DIR, 'processed', 'ingest_cursor.json'))
+INGEST_APP_ID = os.environ.get('INGEST_APP_ID', 'com.Info_BMKG')
+INGEST_POLL_SECONDS = int(os.environ.get('INGEST_POLL_SECONDS', 300))
+INGEST_BATCH_SIZE = int(os.environ.get('INGEST_BATCH_SIZE', 32))
+INGEST_IN_APP = os.environ.get('INGEST_IN_APP', '0') == '1'      # Jalankan worker di dalam proses Flask
+
+# --- LIVE FEED (SSE) ---
+LIVE_FEED_POLL_SECONDS = int(os.environ.get('LIVE_FEED_POLL_SECONDS', 30))
+LIVE_FEED_SNAPSHOT_PATH = os.environ.get('LIVE_FEED_SNAPSHOT_PATH', os.path.join(DATA_DIR, 'processed', 'live_feed_snapshot.json'))
+SSE_MAX_STREAMS = int(os.environ.get('SSE_MAX_STREAMS', 2))        # Koneksi SSE per worker (tiap koneksi = 1 thread)
+SSE_MAX_SECONDS = int(os.environ.get('SSE_MAX_SECONDS', 300))      # Umur 1 koneksi sebelum browser reconnect
+SSE_RETRY_SECONDS = int(os.environ.get('SSE_RETRY_SECONDS', 5))
+
+# --- LEADER ANTAR-WORKER (poller upstream, ingest & arsip gempa hanya di 1 proses) ---
+LEADER_LOCK_PATH = os.environ.get('LEADER_LOCK_PATH', os.path.join(DATA_DIR, 'processed', 'background.lock'))
+LEADER_RETRY_SECONDS = int(os.environ.get('LEADER_RETRY_SECONDS', 30))  # Follower mencoba mengambil alih leader yang mati
+
+# --- UPSTREAM BMKG (arahkan ke server replay lokal untuk load test) ---
+BMKG_DATA_BASE_URL = os.environ.get('BMKG_DATA_BASE_URL', 'https://data.bmkg.go.id')
+BMKG_API_BASE_URL = os.environ.get('BMKG_API_BASE_URL', 'https://api.bmkg.go.id')
+BMKG_WEB_BASE_URL = os.environ.get('BMKG_WEB_BASE_URL', 'https://www.bmkg.go.id')
+
+# --- PELINDUNG UPSTREAM BMKG (circuit breaker per host, hedged request, budget latensi per route) ---
+UPSTREAM_BREAKER_FAILURES = int(os.environ.get('UPSTREAM_BREAKER_FAILURES', 5))  # Gagal beruntun sebelum breaker host OPEN
+UPSTREAM_BREAKER_RESET = float(os.environ.get('UPSTREAM_BREAKER_RESET', 30))     # Detik OPEN sebelum 1 probe (HALF_OPEN)
+UPSTREAM_HEDGE_PERCENTILE = float(os.environ.get('UPSTREAM_HEDGE_PERCENTILE', 95))  # Request cadangan setelah latensi > p95 feed
+UPSTREAM_CONNECT_TIMEOUT = float(os.environ.get('UPSTREAM_CONNECT_TIMEOUT', 3.05))
+ROUTE_BUDGET_SECONDS = float(os.environ.get('ROUTE_BUDGET_SECONDS', 3))  # Tenggat end-to-end route yang memanggil BMKG
+ROUTE_BUDGETS = {
+    '/api/chatbot': ROUTE_BUDGET_SECONDS,
+    '/api/live_quake': ROUTE_BUDGET_SECONDS,
+    '/api/live_weather': ROUTE_BUDGET_SECONDS * 2,  # 33 kota, 10 paralel
+    '/api/weather/lookup': ROUTE_BUDGET_SECONDS,
+    '/api/forecast': ROUTE_BUDGET_SECONDS,
+    '/api/weather_warning': ROUTE_BUDGET_SECONDS,
+}
@@ -0,0 +1,52 @@
+"""
+Konfigurasi Gunicorn BMKG-INTEL (mode preload)
+    gunicorn -c gunicorn.conf.py app:app
+
+- Model IndoBERT + Word2Vec dimuat SEKALI di master, lalu worker hasil fork berbagi halaman memorinya
+  (copy-on-write). gc.freeze() sebelum fork mencegah GC menulis ulang header objek hasil preload.
+- Tiap worker mendapat jatah thread torch = core / jumlah worker, sehingga total thread = jumlah core.
+- Thread background dimulai per worker di post_fork, tetapi poller upstream BMKG, ingest & arsip gempa hanya
+  berjalan di 1 worker (leader, lock file LEADER_LOCK_PATH); worker lain mengikuti snapshot leader.
+- Tiap koneksi SSE (/api/stream) memegang 1 thread gthread: dibatasi SSE_MAX_STREAMS per worker & SSE_MAX_SECONDS
+  per koneksi (browser reconnect otomatis), sehingga thread untuk request biasa selalu tersisa.
+Ukur RSS/PSS & throughput per jumlah worker: python scripts/17_worker_scaling.py
+"""
+import gc
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(BASE_DIR)
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+timeout = 120
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') == '1'
+
+# Dibaca config.py saat app di-import (harus sebelum import config di bawah)
+os.environ['PRELOAD_MODELS'] = '1' if preload_app else '0'
+
+import config as bmkg_config  # Nama `config` bentrok dengan setting gunicorn
+
+
+def _cores():
+    return len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else (os.cpu_count() or 1)
+
+
+def when_ready(server):
+    # Objek hasil preload pindah ke generasi permanen: tidak pernah di-scan GC -> halaman tetap shared
+    gc.freeze()
+    server.log.info(f"gc.freeze(): {gc.get_freeze_count()} objek dibekukan sebelum fork")
+
+
+def post_fork(server, worker):
+    # INFERENCE_SERVER: model di proses terpisah, worker web berjalan tanpa torch
+    if not bmkg_config.INFERENCE_SERVER:
+        import torch
+        budget = bmkg_config.TORCH_THREADS_PER_WORKER or max(1, _cores() // server.cfg.workers)
+        torch.set_num_threads(budget)
+        server.log.info(f"Worker {worker.pid}: torch {budget} thread")
+    if server.cfg.preload_app:
+        from app import start_background_services
+        start_background_services()
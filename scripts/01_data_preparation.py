@@ -1,5 +1,6 @@
 import os
-import re
+import json
+import argparse
 import pandas as pd
 import torch
 from transformers import pipeline
@@ -10,16 +11,11 @@ import sys
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_RAW = os.path.join(BASE_DIR, 'data', 'raw', 'arsip_scraping_lengkap.csv')
 DATA_PROCESSED = os.path.join(BASE_DIR, 'data', 'processed', 'dataset_absa_labeled.csv')
+sys.path.append(BASE_DIR)
 
-def clean_text(text):
-    """Membersihkan teks dari URL, tanda baca, dan spasi berlebih."""
-    if not isinstance(text, str):
-        return ""
-    text = text.lower()
-    text = re.sub(r'http\S+', '', text)
-    text = re.sub(r'[^\w\s]', ' ', text)
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
+import config
+from utils.preprocessing import clean_series
+from utils.near_duplicates import dedupe_frame, cluster_report, propagate_labels
 
 def map_sentiment(star):
     """Mapping Bintang ke Label Sentimen"""
@@ -28,6 +24,11 @@ def map_sentiment(star):
     else: return 'Positif'
 
 def main():
+    parser = argparse.ArgumentParser(description="Cleaning, dedupe hampir-duplikat & auto-labeling aspek (zero-shot)")
+    parser.add_argument('--threshold', type=float, default=config.NEAR_DUP_THRESHOLD,
+                        help="Estimasi Jaccard minimum agar 2 review dianggap hampir duplikat (1.0 = nonaktif)")
+    args = parser.parse_args()
+
     print("="*60)
     print("🚀 MEMULAI DATA PREPARATION & AUTO-LABELING (FIXED)")
     print(f"📂 Membaca data dari: {DATA_RAW}")
@@ -55,8 +56,8 @@ def main():
     df.dropna(subset=['Komentar'], inplace=True)
     df.drop_duplicates(subset=['Komentar'], inplace=True)
     
-    # Terapkan cleaning
-    df['clean_text'] = df['Komentar'].apply(clean_text)
+    # Terapkan cleaning (modul bersama: identik dengan cleaning saat serving)
+    df['clean_text'] = clean_series(df['Komentar'])
     
     # Hapus data kosong hasil cleaning
     initial_count = len(df)
@@ -65,6 +66,21 @@ def main():
     dropped_count = initial_count - len(df)
     
     print(f"🗑️ Dibuang {dropped_count} data sampah (hanya emoji/tanda baca).")
+
+    # Hampir duplikat (elongasi, variasi emoji, template spam): hanya 1 representatif per cluster yang dilabeli,
+    # labelnya lalu disalin ke semua anggota cluster (ukuran di Dup_Count)
+    full = None
+    if args.threshold < 1.0:
+        before = len(df)
+        df, full = dedupe_frame(df, threshold=args.threshold, num_perm=config.NEAR_DUP_NUM_PERM)
+        report = cluster_report(full)
+        with open(config.NEAR_DUP_REPORT, 'w', encoding='utf-8') as f:
+            json.dump({"threshold": args.threshold, "before": before, "after": len(df), "top_clusters": report},
+                      f, ensure_ascii=False, indent=2)
+        print(f"🧬 Near-duplicate (Jaccard >= {args.threshold}): {before} -> {len(df)} baris "
+              f"({before - len(df)} tidak ikut labeling, laporan: {config.NEAR_DUP_REPORT})")
+        for cluster in report[:3]:
+            print(f"   x{cluster['size']}: {cluster['examples'][:3]}")
     print(f"✅ Sisa Data Bersih: {len(df)} baris")
     
     # Mapping Sentimen
@@ -117,6 +133,12 @@ def main():
     if len(aspects) == len(df):
         df['Aspek_Terdeteksi'] = aspects
         df['Confidence_Score'] = confidences
+
+        # Semua review tetap tersimpan (tren 05, hitungan bug 07, arsip berlabel); training memakai Dup_Representative
+        if full is not None:
+            full['Sentimen'] = full['Bintang'].apply(map_sentiment)  # Sentimen dari bintang masing-masing review
+            df = propagate_labels(full, df, ['Aspek_Terdeteksi', 'Confidence_Score'])
+            print(f"🧬 Label representatif disalin ke {int((~df['Dup_Representative']).sum())} anggota cluster")
         
         # 5. Saving
         df.to_csv(DATA_PROCESSED, index=False)
@@ -5,10 +5,14 @@ from transformers import pipeline
 from tqdm import tqdm
 from geopy.geocoders import Nominatim
 from geopy.extra.rate_limiter import RateLimiter
-import json
+import sys
 
 # --- KONFIGURASI ---
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from utils.artifacts import publish_artifact
+
 DATA_PATH = os.path.join(BASE_DIR, 'data', 'raw', 'arsip_scraping_lengkap.csv')
 OUTPUT_JSON = os.path.join(BASE_DIR, 'static', 'data_map.json')
 
@@ -93,8 +97,7 @@ def main():
             print(f"⚠️ Skip '{loc_name}': {e}")
 
     # 5. Simpan
-    with open(OUTPUT_JSON, 'w') as f:
-        json.dump(final_map_data, f, indent=4)
+    publish_artifact('data_map.json', final_map_data)
 
     print(f"\n✅ Data Peta Siap: {OUTPUT_JSON}")
 
@@ -1,8 +1,8 @@
 import os
+import argparse
 import pandas as pd
 import torch
-from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification, Trainer, TrainingArguments, DataCollatorWithPadding
-from sklearn.model_selection import train_test_split
+from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
 from sklearn.metrics import accuracy_score, f1_score
 from tqdm import tqdm
 import sys
@@ -12,6 +12,10 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_RAW = os.path.join(BASE_DIR, 'data', 'raw', 'arsip_scraping_lengkap.csv')
 DATA_LABELED = os.path.join(BASE_DIR, 'data', 'processed', 'dataset_emotion_labeled.csv')
 MODEL_DIR = os.path.join(BASE_DIR, 'models', 'emotion_model')
+sys.path.append(BASE_DIR)
+
+from utils.training import hardware_profile, apply_threads, training_arguments, tokenized_splits, build_trainer
+from utils.preprocessing import clean_series
 
 # Definisi Label Emosi
 emotion_labels = ["marah", "takut", "bahagia", "sedih"]
@@ -19,26 +23,6 @@ label2id = {label: i for i, label in enumerate(emotion_labels)}
 id2label = {i: label for i, label in enumerate(emotion_labels)}
 
 # --- FUNGSI UTILITIES ---
-def clean_text(text):
-    if not isinstance(text, str): return ""
-    import re
-    text = text.lower()
-    text = re.sub(r'http\S+', '', text)
-    text = re.sub(r'[^\w\s]', ' ', text)
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
-
-class EmotionDataset(torch.utils.data.Dataset):
-    def __init__(self, encodings, labels):
-        self.encodings = encodings
-        self.labels = labels
-    def __getitem__(self, idx):
-        item = {key: torch.tensor(val[idx]) for key, val in self.encodings.items()}
-        item['labels'] = torch.tensor(self.labels[idx])
-        return item
-    def __len__(self):
-        return len(self.labels)
-
 def compute_metrics(pred):
     labels = pred.label_ids
     preds = pred.predictions.argmax(-1)
@@ -46,13 +30,21 @@ def compute_metrics(pred):
     return {'accuracy': acc}
 
 def main():
+    parser = argparse.ArgumentParser(description="Auto-label + fine-tuning IndoBERT untuk deteksi Emosi")
+    parser.add_argument('--epochs', type=int, default=3)
+    parser.add_argument('--max-length', type=int, default=128)
+    args = parser.parse_args()
+
     print("="*60)
     print("🎭 MEMULAI PIPELINE EMOTION DETECTION (AUTO-LABEL + TRAIN)")
     print("="*60)
 
-    # 1. Setup Device
-    device = 0 if torch.cuda.is_available() else -1
-    print(f"✅ GPU: {torch.cuda.get_device_name(0) if device == 0 else 'CPU'}")
+    # 1. Setup Device (thread, worker & presisi otomatis)
+    profile = hardware_profile()
+    apply_threads(profile)
+    device = 0 if profile['device'] == 'cuda' else -1
+    print(f"✅ Device: {profile['name']} | threads {profile['threads']} | workers {profile['workers']} | "
+          f"bf16 {profile['bf16']} | fp16 {profile['fp16']}")
 
     # 2. Cek apakah sudah ada data berlabel?
     if os.path.exists(DATA_LABELED):
@@ -61,7 +53,7 @@ def main():
     else:
         print("⚠️ Data emosi belum ada. Memulai AUTO-LABELING dengan Zero-Shot...")
         df = pd.read_csv(DATA_RAW)
-        df['clean_text'] = df['Komentar'].apply(clean_text)
+        df['clean_text'] = clean_series(df['Komentar'])
         df = df[df['clean_text'].str.strip() != '']
         
         # Load Zero-Shot Model
@@ -96,43 +88,20 @@ def main():
     texts = [texts[i] for i in valid_idxs]
     labels = [label2id[df['Emosi'].iloc[i]] for i in valid_idxs]
 
-    train_texts, val_texts, train_labels, val_labels = train_test_split(texts, labels, test_size=0.2, random_state=42)
-    print(f"📊 Train Size: {len(train_texts)} | Val Size: {len(val_texts)}")
-
     model_checkpoint = "indobenchmark/indobert-base-p1"
     tokenizer = AutoTokenizer.from_pretrained(model_checkpoint)
     model = AutoModelForSequenceClassification.from_pretrained(
         model_checkpoint, num_labels=len(label2id), id2label=id2label, label2id=label2id
     )
 
-    train_encodings = tokenizer(train_texts, truncation=True, padding=True, max_length=128)
-    val_encodings = tokenizer(val_texts, truncation=True, padding=True, max_length=128)
-    
-    train_dataset = EmotionDataset(train_encodings, train_labels)
-    val_dataset = EmotionDataset(val_encodings, val_labels)
-
-    training_args = TrainingArguments(
-        output_dir=os.path.join(BASE_DIR, 'models', 'emotion_checkpoints'),
-        num_train_epochs=3,
-        per_device_train_batch_size=16,
-        per_device_eval_batch_size=64,
-        warmup_steps=100,
-        weight_decay=0.01,
-        logging_dir='./logs',
-        eval_strategy="steps",
-        eval_steps=50,
-        save_strategy="steps",
-        save_steps=50,
-        save_total_limit=2,
-        load_best_model_at_end=True,
-        fp16=True, 
-        report_to="none"
-    )
+    # Split + tokenisasi ter-cache di disk (tanpa padding: dipad per batch oleh collator)
+    train_dataset, val_dataset = tokenized_splits('emotion', texts, labels, tokenizer, max_length=args.max_length)
+    print(f"📊 Train Size: {len(train_dataset)} | Val Size: {len(val_dataset)}")
 
-    trainer = Trainer(
-        model=model, args=training_args, train_dataset=train_dataset, eval_dataset=val_dataset,
-        compute_metrics=compute_metrics, tokenizer=tokenizer, data_collator=DataCollatorWithPadding(tokenizer=tokenizer)
-    )
+    training_args = training_arguments(os.path.join(BASE_DIR, 'models', 'emotion_checkpoints'), profile,
+                                       epochs=args.epochs)
+
+    trainer = build_trainer(model, training_args, train_dataset, val_dataset, compute_metrics, tokenizer)
 
     trainer.train()
 
@@ -1,12 +1,46 @@
 import pandas as pd
 import os
-import json
+import sys
 
 # --- KONFIGURASI ---
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+import config
+from utils.spike_detector import SpikeDetector
+from utils.issue_categories import categorize_issue
+from utils.artifacts import publish_artifact
+
 DATA_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'dataset_absa_labeled.csv')
+EMO_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'dataset_emotion_labeled.csv')
 OUTPUT_JSON = os.path.join(BASE_DIR, 'static', 'trends_data.json')
 
+def seed_spike_detector(df):
+    """
+    Replay histori keluhan (Bintang <= 2) SEKALI ke Spike Detector agar baseline EWMA/CUSUM
+    langsung terisi. Setelah itu app hanya meng-update state per review baru.
+    """
+    detector = SpikeDetector(
+        bucket_seconds=config.SPIKE_BUCKET_SECONDS, alpha=config.SPIKE_ALPHA,
+        z_threshold=config.SPIKE_Z_THRESHOLD, cusum_k=config.SPIKE_CUSUM_K,
+        cusum_h=config.SPIKE_CUSUM_H, min_count=config.SPIKE_MIN_COUNT
+    )
+    complaints = df[df['Bintang'] <= 2]
+    for row in complaints.itertuples(index=False):
+        detector.observe_review(aspek=row.Aspek_Terdeteksi, bug=categorize_issue(row.Komentar),
+                                ts=row.Tanggal.timestamp())
+
+    if os.path.exists(EMO_PATH):
+        emo = pd.read_csv(EMO_PATH)
+        emo['Tanggal'] = pd.to_datetime(emo['Tanggal'], errors='coerce')
+        emo = emo.dropna(subset=['Tanggal']).sort_values('Tanggal')
+        emo = emo[emo['Bintang'] <= 2]
+        for row in emo.itertuples(index=False):
+            detector.observe_review(emosi=row.Emosi, ts=row.Tanggal.timestamp())
+
+    detector.save(config.SPIKE_STATE_PATH)
+    print(f"✅ Baseline Spike Detector Disimpan: {config.SPIKE_STATE_PATH} ({len(detector.series)} seri)")
+
 def main():
     print("="*60)
     print("📈 MEMULAI TIME SERIES ANALYSIS (AGGREGATION)")
@@ -74,13 +108,15 @@ def main():
     }
 
     # 5. Simpan
-    with open(OUTPUT_JSON, 'w') as f:
-        json.dump(trends_data, f, indent=4)
+    publish_artifact('trends_data.json', trends_data)
 
     print(f"\n✅ Data Tren Disimpan: {OUTPUT_JSON}")
     print("Sample Data:")
     print(f"   Dates: {trends_data['dates'][:3]} ...")
     print(f"   Positif: {trends_data['sentiment']['positif'][:3]} ...")
 
+    # 6. Baseline Deteksi Lonjakan (Streaming)
+    seed_spike_detector(df)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
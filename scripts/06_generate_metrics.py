@@ -1,7 +1,8 @@
 import os
+import time
 import torch
 import pandas as pd
-import json
+import sys
 from transformers import AutoTokenizer, AutoModelForSequenceClassification
 from sklearn.metrics import confusion_matrix, accuracy_score, f1_score
 from sklearn.model_selection import train_test_split
@@ -9,13 +10,30 @@ from tqdm import tqdm
 
 # --- KONFIGURASI ---
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from utils.artifacts import publish_artifact
+from utils.near_duplicates import representatives
+from utils.student_model import load_student
+from utils.training import tokenized_splits, predict_dataset
+
 DATA_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'dataset_absa_labeled.csv')
 EMO_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'dataset_emotion_labeled.csv')
 OUTPUT_JSON = os.path.join(BASE_DIR, 'static', 'model_metrics.json')
+STUDENT_DIR = os.path.join(BASE_DIR, 'models', 'student_model')
+LATENCY_SAMPLES = 100
 
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
-def evaluate_model(model_path, data_path, text_col, label_col, label_map):
+def load_hf(model_path):
+    tokenizer = AutoTokenizer.from_pretrained(model_path)
+    model = AutoModelForSequenceClassification.from_pretrained(model_path).to(device).eval()
+    return tokenizer, model
+
+def load_kd(model_path):
+    return load_student(model_path, device)
+
+def evaluate_model(model_path, data_path, text_col, label_col, label_map, loader=load_hf, cache_name=None):
     print(f"📊 Evaluating model: {model_path}...")
     
     if not os.path.exists(model_path):
@@ -23,22 +41,21 @@ def evaluate_model(model_path, data_path, text_col, label_col, label_map):
         return None
 
     try:
-        tokenizer = AutoTokenizer.from_pretrained(model_path)
-        model = AutoModelForSequenceClassification.from_pretrained(model_path).to(device)
+        tokenizer, model = loader(model_path)
     except Exception as e:
         print(f"❌ Error loading model: {e}")
         return None
     
     try:
         # LOAD FULL DATA (Tanpa Sample 200)
-        df = pd.read_csv(data_path)
+        df = representatives(pd.read_csv(data_path))  # Split sama dengan training (tanpa anggota cluster duplikat)
         
-        # Normalisasi Label (Title Case)
-        df[label_col] = df[label_col].astype(str).str.strip().str.title()
+        # Normalisasi Label (case-insensitive ke nama label resmi; .title() mengubah "UI/UX" jadi "Ui/Ux")
+        canonical = {label.lower(): label for label in label_map.values()}
+        df[label_col] = df[label_col].astype(str).str.strip().str.lower().map(canonical)
         
         # Filter Label Valid
-        valid_labels = list(label_map.values())
-        df = df[df[label_col].isin(valid_labels)]
+        df = df.dropna(subset=[label_col])
         
         # --- PENTING UNTUK AKADEMIK ---
         # Kita gunakan 20% data sebagai Test Set (Data yang tidak dilihat saat training)
@@ -62,16 +79,34 @@ def evaluate_model(model_path, data_path, text_col, label_col, label_map):
     
     # Batch Processing agar lebih cepat
     batch_size = 32
-    for i in tqdm(range(0, len(texts), batch_size)):
-        batch_texts = texts[i:i+batch_size]
-        
-        inputs = tokenizer(batch_texts, return_tensors="pt", padding=True, truncation=True, max_length=128).to(device)
+    if cache_name:
+        # Pakai dataset ter-tokenisasi dari 02/04 (split identik, padding dinamis per batch)
+        label_ids = {v: k for k, v in label_map.items()}
+        _, val_ds = tokenized_splits(cache_name, df[text_col].tolist(), [label_ids[l] for l in df[label_col]], tokenizer)
+        texts, true_labels = val_ds.texts, [label_map[l] for l in val_ds.labels]
+        start = time.perf_counter()
+        preds = [label_map[p] for p in predict_dataset(model, tokenizer, val_ds, device)]
+    else:
+        start = time.perf_counter()
+        for i in tqdm(range(0, len(texts), batch_size)):
+            batch_texts = texts[i:i+batch_size]
+
+            inputs = tokenizer(batch_texts, return_tensors="pt", padding=True, truncation=True, max_length=128).to(device)
+            with torch.no_grad():
+                logits = model(**inputs).logits
+
+            pred_ids = torch.argmax(logits, dim=1).tolist()
+            for pid in pred_ids:
+                preds.append(label_map[pid])
+    batch_ms = (time.perf_counter() - start) * 1000 / len(texts)
+
+    # Latensi 1 item (skenario request /analyze)
+    start = time.perf_counter()
+    for text in texts[:LATENCY_SAMPLES]:
+        inputs = tokenizer([text], return_tensors="pt", padding=True, truncation=True, max_length=128).to(device)
         with torch.no_grad():
-            logits = model(**inputs).logits
-        
-        pred_ids = torch.argmax(logits, dim=1).tolist()
-        for pid in pred_ids:
-            preds.append(label_map[pid])
+            model(**inputs)
+    single_ms = (time.perf_counter() - start) * 1000 / min(len(texts), LATENCY_SAMPLES)
 
     # Hitung Metrics
     acc = accuracy_score(true_labels, preds)
@@ -84,7 +119,22 @@ def evaluate_model(model_path, data_path, text_col, label_col, label_map):
         "accuracy": round(acc * 100, 2),
         "f1": round(f1, 2),
         "cm": cm.tolist(),
-        "labels": unique_labels
+        "labels": unique_labels,
+        "single_ms": round(single_ms, 2),
+        "batch_ms_per_item": round(batch_ms, 3),
+        "device": str(device)
+    }
+
+def distillation_report(teacher, student):
+    """Selisih akurasi & speedup student (Bi-LSTM) terhadap teacher (IndoBERT)"""
+    return {
+        "teacher_acc": teacher['accuracy'],
+        "student_acc": student['accuracy'],
+        "acc_delta": round(student['accuracy'] - teacher['accuracy'], 2),
+        "teacher_single_ms": teacher['single_ms'],
+        "student_single_ms": student['single_ms'],
+        # Single-item (termasuk tokenisasi) adalah pembanding yang adil: batch IndoBERT memakai cache token
+        "speedup_single": round(teacher['single_ms'] / student['single_ms'], 1)
     }
 
 def main():
@@ -93,18 +143,32 @@ def main():
     # 1. Evaluasi ABSA
     absa_path = os.path.join(BASE_DIR, 'models', 'aspect_model')
     absa_map = {0: "Akurasi", 1: "UI/UX", 2: "Performa", 3: "Lainnya"}
-    absa_metrics = evaluate_model(absa_path, DATA_PATH, 'clean_text', 'Aspek_Terdeteksi', absa_map)
+    absa_metrics = evaluate_model(absa_path, DATA_PATH, 'clean_text', 'Aspek_Terdeteksi', absa_map, cache_name='absa')
 
     # 2. Evaluasi Emotion
     emo_path = os.path.join(BASE_DIR, 'models', 'emotion_model')
     emo_map = {0: "Marah", 1: "Takut", 2: "Bahagia", 3: "Sedih"}
-    emo_metrics = evaluate_model(emo_path, EMO_PATH, 'clean_text', 'Emosi', emo_map)
+    emo_metrics = evaluate_model(emo_path, EMO_PATH, 'clean_text', 'Emosi', emo_map, cache_name='emotion')
+
+    # 3. Evaluasi Student hasil distilasi (scripts/15_distill_student.py), jika ada
+    final_data = {"absa": absa_metrics, "emotion": emo_metrics}
+    teachers = {"absa": (absa_metrics, DATA_PATH, 'Aspek_Terdeteksi', absa_map),
+                "emotion": (emo_metrics, EMO_PATH, 'Emosi', emo_map)}
+    for head, (teacher, data_path, label_col, label_map) in teachers.items():
+        student_path = os.path.join(STUDENT_DIR, f"{head}.pt")
+        if not (teacher and os.path.exists(student_path)):
+            continue
+        student = evaluate_model(student_path, data_path, 'clean_text', label_col, label_map, loader=load_kd)
+        if student:
+            final_data[f"{head}_student"] = student
+            report = distillation_report(teacher, student)
+            final_data.setdefault("distillation", {})[head] = report
+            print(f"🎓 Student {head}: Acc {report['student_acc']}% (Δ {report['acc_delta']:+.2f}) | "
+                  f"{report['speedup_single']}x lebih cepat (1 item)")
 
-    # 3. Simpan
+    # 4. Simpan
     if absa_metrics and emo_metrics:
-        final_data = {"absa": absa_metrics, "emotion": emo_metrics}
-        with open(OUTPUT_JSON, 'w') as f:
-            json.dump(final_data, f, indent=4)
+        publish_artifact('model_metrics.json', final_data)
         print(f"\n✅ SUCCESS! Full Metrics saved to: {OUTPUT_JSON}")
     else:
         print("\n❌ FAILED.")
@@ -1,74 +1,40 @@
 import pandas as pd
 import os
-import json
+import sys
+import time
+import argparse
 from collections import Counter
 
 # --- KONFIGURASI ---
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DATA_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'dataset_absa_labeled.csv')
-OUTPUT_JSON = os.path.join(BASE_DIR, 'static', 'bug_report.json')
-
-def categorize_issue(text):
-    """
-    Mengelompokkan teks keluhan ke dalam kategori masalah spesifik.
-    Ini membuat laporan lebih mudah dibaca manusia daripada sekadar n-gram.
-    """
-    text = str(text).lower()
-    
-    # 1. Kategori Performa / Teknis
-    if any(x in text for x in ['lemot', 'lambat', 'berat', 'lag', 'macet', 'stuck']):
-        return "Aplikasi Lambat / Berat"
-    if any(x in text for x in ['keluar sendiri', 'force close', 'fc', 'crash', 'tutup']):
-        return "Force Close / Crash"
-    if any(x in text for x in ['gagal login', 'masuk', 'daftar', 'otp']):
-        return "Masalah Login / Akun"
-    if any(x in text for x in ['koneksi', 'jaringan', 'internet', 'server', 'down']):
-        return "Koneksi / Server Down"
-    
-    # 2. Kategori Fitur Gempa
-    if 'gempa' in text:
-        if any(x in text for x in ['notif', 'bunyi', 'suara', 'alarm', 'telat']):
-            return "Notifikasi Gempa Terlambat/Mati"
-        if any(x in text for x in ['lokasi', 'titik', 'peta', 'koordinat']):
-            return "Akurasi Lokasi Gempa"
-        return "Info Gempa Tidak Update"
+sys.path.append(BASE_DIR)
 
-    # 3. Kategori Cuaca
-    if any(x in text for x in ['cuaca', 'hujan', 'panas', 'mendung']):
-        if any(x in text for x in ['salah', 'beda', 'ngaco', 'tidak sesuai']):
-            return "Prediksi Cuaca Tidak Akurat"
-        if any(x in text for x in ['widget', 'tampilan']):
-            return "Widget Cuaca Bermasalah"
-    
-    # 4. Kategori UI/UX
-    if any(x in text for x in ['iklan', 'banyak iklan']):
-        return "Terlalu Banyak Iklan"
-    if any(x in text for x in ['update', 'versi baru']):
-        return "Bug Setelah Update Aplikasi"
-    if any(x in text for x in ['gelap', 'mode malam', 'tulisan', 'huruf']):
-        return "Masalah Tampilan / UI"
+import config
+from utils.issue_categories import categorize_issue, get_recommendation, is_critical
+from utils.artifacts import publish_artifact
+from utils.complaint_clusters import ComplaintClusterer
 
-    return None # Tidak masuk kategori utama
+DATA_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'dataset_absa_labeled.csv')
+OUTPUT_JSON = os.path.join(BASE_DIR, 'static', 'bug_report.json')
 
-def get_recommendation(issue):
-    """Memberikan saran teknis berdasarkan kategori masalah"""
-    recs = {
-        "Aplikasi Lambat / Berat": "Lakukan profiling memori & optimasi query database lokal.",
-        "Force Close / Crash": "Cek log 'Fatal Exception' pada Android Vitals & perbaiki NullPointer.",
-        "Masalah Login / Akun": "Periksa API Gateway & layanan OTP provider.",
-        "Koneksi / Server Down": "Scale-up kapasitas server saat traffic tinggi & cek CDN.",
-        "Notifikasi Gempa Terlambat/Mati": "Prioritaskan push notification channel 'High Importance' di Firebase.",
-        "Akurasi Lokasi Gempa": "Validasi koordinat sensor seismograf dengan peta digital.",
-        "Info Gempa Tidak Update": "Pastikan sinkronisasi data background berjalan real-time.",
-        "Prediksi Cuaca Tidak Akurat": "Kalibrasi model prediksi dengan data stasiun pengamatan terdekat.",
-        "Widget Cuaca Bermasalah": "Perbaiki service widget agar auto-refresh di background.",
-        "Terlalu Banyak Iklan": "Kurangi frekuensi iklan interstitial agar tidak mengganggu UX.",
-        "Bug Setelah Update Aplikasi": "Rollback fitur bermasalah atau rilis hotfix secepatnya.",
-        "Masalah Tampilan / UI": "Evaluasi kontras warna & ukuran font untuk aksesibilitas."
-    }
-    return recs.get(issue, "Lakukan investigasi log lebih lanjut.")
+def discover_clusters(args):
+    """Klaster keluhan di luar daftar rule-based; hanya baris arsip baru sejak run sebelumnya yang diproses"""
+    if args.reset and os.path.exists(config.COMPLAINT_CLUSTER_STATE):
+        os.remove(config.COMPLAINT_CLUSTER_STATE)
+    clusterer = ComplaintClusterer.load(config.COMPLAINT_CLUSTER_STATE, n_clusters=args.clusters)
+    start = time.perf_counter()
+    new = clusterer.update_from_csv(DATA_PATH, chunksize=args.chunksize)
+    clusterer.save(config.COMPLAINT_CLUSTER_STATE)
+    print(f"   Klaster: {new:,} review negatif baru ({clusterer.cursor:,} baris arsip) | {time.perf_counter() - start:.1f} s")
+    return clusterer.report()
 
 def main():
+    parser = argparse.ArgumentParser(description="Laporan bug rule-based + klaster keluhan otomatis")
+    parser.add_argument('--clusters', type=int, default=config.COMPLAINT_CLUSTERS)
+    parser.add_argument('--chunksize', type=int, default=config.COMPLAINT_CLUSTER_CHUNK)
+    parser.add_argument('--reset', action='store_true', help="Bangun klaster dari awal arsip")
+    args = parser.parse_args()
+
     print("🐛 SMART BUG DETECTION RUNNING...")
     
     if not os.path.exists(DATA_PATH):
@@ -94,7 +60,8 @@ def main():
     # Format JSON Output
     report = {
         "critical": [],
-        "ux_issues": []
+        "ux_issues": [],
+        "clusters": discover_clusters(args)
     }
     
     for issue, count in issue_counts:
@@ -105,19 +72,20 @@ def main():
         }
         
         # Pisahkan mana Critical (Teknis) vs UX (Tampilan)
-        if any(x in issue for x in ['Lambat', 'Crash', 'Login', 'Server', 'Notifikasi', 'Akurasi']):
+        if is_critical(issue):
             report['critical'].append(item)
         else:
             report['ux_issues'].append(item)
 
     # Simpan
-    with open(OUTPUT_JSON, 'w') as f:
-        json.dump(report, f, indent=4)
+    publish_artifact('bug_report.json', report)
         
     print(f"✅ Smart Bug Report Generated: {OUTPUT_JSON}")
     # Preview
     for item in report['critical'][:3]:
         print(f"   - {item['issue']}: {item['count']}")
+    for cluster in report['clusters'][:5]:
+        print(f"   * [{cluster['label']}] {cluster['count']} review, {cluster['uncategorized_share']:.0%} di luar kategori")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
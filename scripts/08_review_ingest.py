@@ -0,0 +1,82 @@
+import os
+import sys
+import argparse
+
+# --- KONFIGURASI ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+import config
+from utils.inference_rpc import build_classifier
+from utils.spike_detector import SpikeDetector
+from utils.term_index import TermIndex, term_listener
+from utils.trending import TrendingTracker, trending_listener
+from utils.search_index import SearchIndex, search_listener
+from utils.embedding_store import EmbeddingStore, embedding_listener
+from utils.review_ingest import (
+    PlayStoreSource, FixtureReviewSource, ReviewStore, IngestWorker, spike_listener
+)
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker ingest review Play Store (long-running)")
+    parser.add_argument('--fixture', help="Replay file lokal (CSV/JSONL) sebagai pengganti Play Store")
+    parser.add_argument('--once', action='store_true', help="Jalankan 1 siklus lalu keluar")
+    parser.add_argument('--interval', type=int, default=config.INGEST_POLL_SECONDS, help="Jeda polling (detik)")
+    args = parser.parse_args()
+
+    print("="*60)
+    print("📥 REVIEW INGEST WORKER")
+    print("="*60)
+
+    if args.fixture:
+        source = FixtureReviewSource(args.fixture)
+        print(f"🧪 Source: Fixture ({args.fixture})")
+    else:
+        source = PlayStoreSource(app_id=config.INGEST_APP_ID)
+        print(f"🌐 Source: Google Play ({config.INGEST_APP_ID})")
+
+    store = ReviewStore(config.RAW_CSV, config.LIVE_LABELED_CSV)
+    print(f"📂 Store: {len(store.keys)} review sudah tersimpan")
+
+    detector = SpikeDetector.load(
+        config.SPIKE_STATE_PATH, bucket_seconds=config.SPIKE_BUCKET_SECONDS, alpha=config.SPIKE_ALPHA,
+        z_threshold=config.SPIKE_Z_THRESHOLD, cusum_k=config.SPIKE_CUSUM_K,
+        cusum_h=config.SPIKE_CUSUM_H, min_count=config.SPIKE_MIN_COUNT
+    )
+    term_index = TermIndex.load(config.TERM_INDEX_PATH)
+    trending = TrendingTracker.load(
+        config.TRENDING_STATE_PATH, short_half_life=config.TRENDING_SHORT_HALF_LIFE,
+        long_half_life=config.TRENDING_LONG_HALF_LIFE, width=config.TRENDING_WIDTH, depth=config.TRENDING_DEPTH,
+        k=config.TRENDING_TOP_K, min_count=config.TRENDING_MIN_COUNT
+    )
+    # Model & tier sama dengan serving (MODEL_BACKEND, CASCADE_*); INFERENCE_SERVER -> pakai server, tanpa IndoBERT kedua
+    handler = build_classifier(config)
+    print(f"🧠 Classifier: {config.INFERENCE_SERVER or handler.served_backend}")
+    listeners = [
+        spike_listener(detector),
+        lambda records: detector.save(config.SPIKE_STATE_PATH),
+        term_listener(term_index, config.TERM_INDEX_PATH),  # App memuat ulang saat file berubah
+        trending_listener(trending),
+        lambda records: trending.save(config.TRENDING_STATE_PATH),
+        search_listener(SearchIndex.load(config.SEARCH_INDEX_DIR)),  # Delta log, app me-replay via refresh()
+        # Keluhan serupa: hanya review baru yang di-embed & di-append (app membaca ulang store saat berubah)
+        embedding_listener(EmbeddingStore.load(config.SIMILAR_INDEX_DIR), handler, batch_size=config.INGEST_BATCH_SIZE)
+    ]
+
+    worker = IngestWorker(
+        source, store, handler, config.INGEST_CURSOR_PATH,
+        batch_size=config.INGEST_BATCH_SIZE, poll_interval=args.interval, listeners=listeners
+    )
+
+    if args.once:
+        n = worker.run_once()
+        print(f"✅ Selesai: {n} review baru | Stats: {worker.stats}")
+    else:
+        print(f"🔁 Polling tiap {args.interval} detik (Ctrl+C untuk berhenti)")
+        try:
+            worker.run_forever()
+        except KeyboardInterrupt:
+            print(f"\n🛑 Worker dihentikan | Stats: {worker.stats}")
+
+if __name__ == "__main__":
+    main()
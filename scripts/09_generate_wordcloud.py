@@ -1,71 +1,71 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-from wordcloud import WordCloud
 import os
-import re
-
-# Gunakan backend non-interaktif agar tidak error di server
-import matplotlib
-matplotlib.use('Agg')
+import sys
+import argparse
+import time
 
 # --- KONFIGURASI PATH ---
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DATA_PATH = os.path.join(BASE_DIR, 'data', 'raw', 'arsip_scraping_lengkap.csv')
 OUTPUT_IMG = os.path.join(BASE_DIR, 'static', 'images', 'wordcloud_freq.png')
+sys.path.append(BASE_DIR)
+
+import config
+from utils.review_ingest import load_labeled_archive
+from utils.term_index import TermIndex
+
+def render_png(index, top):
+    """Opsional: PNG statis lama dari index (dashboard sekarang memakai /api/terms)"""
+    import matplotlib
+    matplotlib.use('Agg')  # Backend non-interaktif agar tidak error di server
+    import matplotlib.pyplot as plt
+    from wordcloud import WordCloud
 
-# Stopwords Bahasa Indonesia (Manual agar ringan)
-STOPWORDS = set([
-    'dan', 'yang', 'di', 'ke', 'dari', 'ini', 'itu', 'ada', 'untuk', 'tapi', 
-    'saya', 'tidak', 'gak', 'bisa', 'aplikasi', 'bmkg', 'nya', 'sangat', 
-    'terlalu', 'tolong', 'min', 'kalau', 'pas', 'yg', 'ga', 'aja', 'juga', 
-    'mau', 'sudah', 'lagi', 'kalo', 'sama', 'bikin', 'malah', 'kok', 'biar',
-    'karena', 'banget', 'apk', 'info', 'update', 'padahal', 'lebih', 'masih'
-])
+    freqs = {t['term']: t['count'] for t in index.query(top=top)['terms']}
+    wc = WordCloud(width=1600, height=800, background_color='white',
+                   colormap='ocean',  # Tema Biru Laut/Langit (Sesuai BMKG)
+                   min_font_size=10, max_words=top).generate_from_frequencies(freqs)
 
-def clean_text(text):
-    """Membersihkan teks untuk WordCloud"""
-    text = str(text).lower()
-    text = re.sub(r'[^a-z\s]', '', text) # Hapus angka & simbol
-    return text
+    plt.figure(figsize=(20, 10), facecolor=None)
+    plt.imshow(wc)
+    plt.axis("off")
+    plt.tight_layout(pad=0)
+    os.makedirs(os.path.dirname(OUTPUT_IMG), exist_ok=True)
+    plt.savefig(OUTPUT_IMG)
+    plt.close()
+    print(f"✅ WordCloud PNG Saved to: {OUTPUT_IMG}")
 
 def main():
-    print("☁️ GENERATING WORDCLOUD...")
-    
-    if not os.path.exists(DATA_PATH):
+    parser = argparse.ArgumentParser(description="Bangun ulang index frekuensi kata per hari x sentimen/aspek/emosi")
+    parser.add_argument('--out', default=config.TERM_INDEX_PATH)
+    parser.add_argument('--png', action='store_true', help="Render juga PNG WordCloud statis (seluruh histori)")
+    parser.add_argument('--top', type=int, default=200)
+    args = parser.parse_args()
+
+    print("☁️ BUILDING TERM INDEX...")
+    if not os.path.exists(config.RAW_CSV):
         print("❌ CSV Not Found!")
         return
 
-    # 1. Load Data
-    df = pd.read_csv(DATA_PATH)
+    # 1. Load Data + Label
+    df = load_labeled_archive(config.RAW_CSV, config.ABSA_CSV, config.EMOTION_CSV, config.LIVE_LABELED_CSV)
     print(f"   Loaded {len(df)} comments.")
 
-    # 2. Gabungkan seluruh komentar jadi satu string raksasa
-    all_text = " ".join(df['Komentar'].apply(clean_text))
+    # 2. Stream ke index (jalur yang sama dengan listener ingest)
+    start = time.perf_counter()
+    index = TermIndex()
+    index.add_records(df.to_dict('records'))
+    first, last = index.date_range()
+    print(f"   Index: {len(index.days)} hari ({first} s/d {last}) | {time.perf_counter() - start:.2f} s")
 
-    # 3. Generate WordCloud
-    wc = WordCloud(
-        width=1600, 
-        height=800,
-        background_color='white',
-        stopwords=STOPWORDS,
-        colormap='ocean', # Tema Biru Laut/Langit (Sesuai BMKG)
-        min_font_size=10,
-        max_words=200
-    ).generate(all_text)
+    # 3. Simpan
+    os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    index.save(args.out)
+    print(f"✅ Term Index Saved to: {args.out}")
 
-    # 4. Simpan Gambar
-    plt.figure(figsize=(20,10), facecolor=None)
-    plt.imshow(wc)
-    plt.axis("off")
-    plt.tight_layout(pad=0)
-    
-    # Pastikan folder images ada
-    os.makedirs(os.path.dirname(OUTPUT_IMG), exist_ok=True)
-    
-    plt.savefig(OUTPUT_IMG)
-    plt.close()
-    
-    print(f"✅ WordCloud Saved to: {OUTPUT_IMG}")
+    top = index.query(top=10)['terms']
+    print("   Top 10: " + ", ".join(f"{t['term']} ({t['count']})" for t in top))
+
+    if args.png:
+        render_png(index, args.top)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
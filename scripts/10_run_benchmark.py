@@ -1,7 +1,15 @@
 import pandas as pd
 import numpy as np
 import os
+import sys
+import json
 import time
+import pickle
+import resource
+import argparse
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
 import torch
 import torch.nn as nn
 import torch.optim as optim
@@ -11,52 +19,28 @@ from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.naive_bayes import MultinomialNB
 from sklearn.svm import SVC
 from sklearn.metrics import accuracy_score, f1_score
-from collections import Counter
-from tqdm import tqdm
 
 # --- KONFIGURASI ---
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'dataset_absa_labeled.csv')
+BERT_PATH = os.path.join(BASE_DIR, 'models', 'aspect_model')
+STUDENT_PATH = os.path.join(BASE_DIR, 'models', 'student_model', 'absa.pt')
+BENCH_DIR = os.path.join(BASE_DIR, 'data', 'benchmarks')
+ARTIFACT_DIR = os.path.join(BENCH_DIR, 'model_candidates')
+RESULT_JSON = os.path.join(BENCH_DIR, 'model_benchmark.json')
 DEVICE = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+sys.path.append(BASE_DIR)
 
-# --- KELAS BI-LSTM MODEL (PYTORCH) ---
-class BiLSTMClassifier(nn.Module):
-    def __init__(self, vocab_size, embed_dim, hidden_dim, output_dim, n_layers):
-        super(BiLSTMClassifier, self).__init__()
-        self.embedding = nn.Embedding(vocab_size, embed_dim)
-        self.lstm = nn.LSTM(embed_dim, hidden_dim, num_layers=n_layers, 
-                            bidirectional=True, batch_first=True, dropout=0.3)
-        self.fc = nn.Linear(hidden_dim * 2, output_dim) # *2 karena Bidirectional
-        self.dropout = nn.Dropout(0.3)
-        
-    def forward(self, text):
-        # text = [batch size, sent len]
-        embedded = self.embedding(text)
-        # embedded = [batch size, sent len, emb dim]
-        output, (hidden, cell) = self.lstm(embedded)
-        # Ambil hidden state terakhir dari forward dan backward
-        hidden = self.dropout(torch.cat((hidden[-2,:,:], hidden[-1,:,:]), dim = 1))
-        return self.fc(hidden)
+from utils.near_duplicates import representatives
+from utils.student_model import BiLSTMClassifier, build_vocab, text_pipeline, load_student
 
-# --- UTILS UNTUK TEXT PROCESSING LSTM ---
-def build_vocab(texts, max_size=5000):
-    words = []
-    for t in texts: words.extend(t.split())
-    count = Counter(words)
-    # Urutkan kata yang paling sering muncul
-    vocab = {word: i+2 for i, (word, _) in enumerate(count.most_common(max_size))}
-    vocab["<PAD>"] = 0
-    vocab["<UNK>"] = 1
-    return vocab
-
-def text_pipeline(text, vocab, max_len=50):
-    tokens = [vocab.get(w, 1) for w in text.split()]
-    if len(tokens) < max_len:
-        tokens += [0] * (max_len - len(tokens)) # Padding
-    else:
-        tokens = tokens[:max_len] # Truncate
-    return tokens
+# Label & split identik dengan 02_train_aspect_model.py agar test set = validation set IndoBERT
+label2id = {"Akurasi": 0, "UI/UX": 1, "Performa": 2, "Lainnya": 3}
+
+BATCH_SIZE = 32
+LATENCY_SAMPLES = 200
 
+# --- UTILS UNTUK TEXT PROCESSING LSTM ---
 class TextDataset(Dataset):
     def __init__(self, texts, labels, vocab):
         self.X = torch.tensor([text_pipeline(t, vocab) for t in texts], dtype=torch.long)
@@ -64,61 +48,57 @@ class TextDataset(Dataset):
     def __len__(self): return len(self.X)
     def __getitem__(self, i): return self.X[i], self.y[i]
 
-# --- MAIN BENCHMARK ---
-def main():
-    print("⚔️  MEMULAI ULTIMATE BENCHMARK: BERT vs Bi-LSTM vs SVM vs NB")
-    print(f"   Menggunakan Device: {DEVICE} (RTX 3080 Ready)")
-    print("="*60)
+# --- UTILS PENGUKURAN ---
+def rss_mb():
+    """RSS saat ini (Linux /proc), fallback ke peak RSS"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
 
-    # 1. Load Data
-    if not os.path.exists(DATA_PATH): return print("❌ Data not found!")
-    df = pd.read_csv(DATA_PATH)
-    
-    # Mapping Label (String -> Int)
-    label_map = {label: idx for idx, label in enumerate(df['Aspek_Terdeteksi'].unique())}
-    df['label_id'] = df['Aspek_Terdeteksi'].map(label_map)
-    
-    X_train, X_test, y_train, y_test = train_test_split(df['clean_text'].astype(str), df['label_id'], test_size=0.2, random_state=42)
-    
-    print(f"📊 Data Training: {len(X_train)} | Testing: {len(X_test)}")
-    print("-" * 60)
+def dir_size_mb(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path) / 1024 ** 2
+    total = 0
+    for root, _, files in os.walk(path):
+        # Checkpoint trainer (optimizer state) bukan bagian dari model yang disajikan
+        if 'checkpoint-' in root:
+            continue
+        total += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+    return total / 1024 ** 2
 
-    # ==========================================
-    # ROUND 1: MACHINE LEARNING KLASIK (NB & SVM)
-    # ==========================================
-    print("1️⃣  Training ML Klasik (TF-IDF Vectorizer)...")
-    vectorizer = TfidfVectorizer(max_features=5000)
-    X_train_vec = vectorizer.fit_transform(X_train)
-    X_test_vec = vectorizer.transform(X_test)
+def load_split():
+    df = representatives(pd.read_csv(DATA_PATH))
+    df = df[df['Aspek_Terdeteksi'].isin(label2id.keys())]
+    texts = df['clean_text'].astype(str).tolist()
+    labels = [label2id[label] for label in df['Aspek_Terdeteksi'].tolist()]
+    return train_test_split(texts, labels, test_size=0.2, random_state=42)
 
-    # Naive Bayes
+# ==========================================
+# TAHAP 1: TRAINING (PARALEL, 1 PROSES PER KANDIDAT)
+# ==========================================
+def train_classic(name, X_train, y_train):
     start = time.time()
-    nb = MultinomialNB()
-    nb.fit(X_train_vec, y_train)
-    nb_acc = accuracy_score(y_test, nb.predict(X_test_vec)) * 100
-    print(f"   👉 Naive Bayes Acc: {nb_acc:.2f}% (Time: {time.time()-start:.2f}s)")
+    vectorizer = TfidfVectorizer(max_features=5000)
+    X_vec = vectorizer.fit_transform(X_train)
+    model = MultinomialNB() if name == 'Naive Bayes' else SVC(kernel='linear')
+    model.fit(X_vec, y_train)
+    train_time = time.time() - start
 
-    # SVM
-    start = time.time()
-    svm = SVC(kernel='linear')
-    svm.fit(X_train_vec, y_train)
-    svm_acc = accuracy_score(y_test, svm.predict(X_test_vec)) * 100
-    print(f"   👉 SVM Linear Acc : {svm_acc:.2f}% (Time: {time.time()-start:.2f}s)")
+    path = os.path.join(ARTIFACT_DIR, name.lower().replace(' ', '_') + '.pkl')
+    with open(path, 'wb') as f:
+        pickle.dump((vectorizer, model), f)
+    return {"name": name, "path": path, "train_time_s": round(train_time, 2)}
 
-    # ==========================================
-    # ROUND 2: DEEP LEARNING (Bi-LSTM)
-    # ==========================================
-    print("\n2️⃣  Training DEEP LEARNING (Bi-LSTM w/ PyTorch)...")
-    
-    # Setup Data
+def train_bilstm(name, X_train, y_train, threads):
+    torch.set_num_threads(threads)
     vocab = build_vocab(X_train)
-    train_ds = TextDataset(X_train.tolist(), y_train.tolist(), vocab)
-    test_ds = TextDataset(X_test.tolist(), y_test.tolist(), vocab)
-    train_loader = DataLoader(train_ds, batch_size=32, shuffle=True)
-    test_loader = DataLoader(test_ds, batch_size=32)
+    train_loader = DataLoader(TextDataset(X_train, y_train, vocab), batch_size=32, shuffle=True)
 
-    # Init Model
-    model = BiLSTMClassifier(len(vocab)+2, 100, 128, len(label_map), 2).to(DEVICE)
+    config = {"vocab_size": len(vocab)+2, "embed_dim": 100, "hidden_dim": 128,
+              "output_dim": len(label2id), "n_layers": 2}
+    model = BiLSTMClassifier(**config).to(DEVICE)
     optimizer = optim.Adam(model.parameters(), lr=0.001)
     criterion = nn.CrossEntropyLoss()
 
@@ -129,38 +109,188 @@ def main():
         for texts, labels in train_loader:
             texts, labels = texts.to(DEVICE), labels.to(DEVICE)
             optimizer.zero_grad()
-            preds = model(texts)
-            loss = criterion(preds, labels)
+            loss = criterion(model(texts), labels)
             loss.backward()
             optimizer.step()
-        print(f"   ...Epoch {epoch+1}/5 Selesai")
-
-    # Evaluation Loop
-    model.eval()
-    all_preds = []
-    all_labels = []
-    with torch.no_grad():
-        for texts, labels in test_loader:
-            texts, labels = texts.to(DEVICE), labels.to(DEVICE)
-            preds = model(texts).argmax(1)
-            all_preds.extend(preds.cpu().numpy())
-            all_labels.extend(labels.cpu().numpy())
-    
-    lstm_acc = accuracy_score(all_labels, all_preds) * 100
-    lstm_time = time.time() - start
-    print(f"   👉 Bi-LSTM Acc    : {lstm_acc:.2f}% (Time: {lstm_time:.2f}s)")
+        print(f"   ...Bi-LSTM Epoch {epoch+1}/5 Selesai")
+    train_time = time.time() - start
+
+    path = os.path.join(ARTIFACT_DIR, 'bilstm.pt')
+    torch.save({"config": config, "vocab": vocab, "state_dict": model.cpu().state_dict()}, path)
+    return {"name": name, "path": path, "train_time_s": round(train_time, 2)}
+
+def train_candidate(name, X_train, y_train, threads):
+    if name == 'Bi-LSTM':
+        return train_bilstm(name, X_train, y_train, threads)
+    return train_classic(name, X_train, y_train)
+
+# ==========================================
+# TAHAP 2: SERVING (CPU, PROSES BERSIH PER KANDIDAT)
+# ==========================================
+def load_predictor(name, path):
+    """Muat model dari disk -> fungsi predict(list_teks) -> list label id"""
+    if name in ('Naive Bayes', 'SVM Linear'):
+        with open(path, 'rb') as f:
+            vectorizer, model = pickle.load(f)
+        return lambda texts: model.predict(vectorizer.transform(texts)).tolist()
+
+    if name == 'Bi-LSTM':
+        ckpt = torch.load(path, map_location='cpu')
+        model = BiLSTMClassifier(**ckpt['config']).eval()
+        model.load_state_dict(ckpt['state_dict'])
+        vocab = ckpt['vocab']
+        def predict(texts):
+            with torch.no_grad():
+                X = torch.tensor([text_pipeline(t, vocab) for t in texts], dtype=torch.long)
+                return model(X).argmax(1).tolist()
+        return predict
+
+    if name == 'Student (KD)':
+        tokenizer, model = load_student(path)
+        id2label = model.id2label
+    else:
+        from transformers import AutoTokenizer, AutoModelForSequenceClassification
+        tokenizer = AutoTokenizer.from_pretrained(path)
+        model = AutoModelForSequenceClassification.from_pretrained(path).eval()
+        id2label = model.config.id2label
+    # Petakan label model -> label2id benchmark (lewat id2label hasil 02 / distilasi)
+    id_map = {int(i): label2id.get(lbl, -1) for i, lbl in id2label.items()}
+    def predict(texts):
+        inputs = tokenizer(texts, return_tensors="pt", padding=True, truncation=True, max_length=128)
+        with torch.no_grad():
+            return [id_map[i] for i in model(**inputs).logits.argmax(1).tolist()]
+    return predict
+
+def serve_candidate(name, path, X_test, y_test, threads):
+    torch.set_num_threads(threads)
+    rss_before = rss_mb()
+    predict = load_predictor(name, path)
+    predict(X_test[:BATCH_SIZE])  # Warm-up (alokasi buffer, lazy init)
+    rss_loaded = rss_mb()
+
+    # Batched: seluruh test set -> akurasi & throughput
+    preds = []
+    start = time.perf_counter()
+    for i in range(0, len(X_test), BATCH_SIZE):
+        preds.extend(predict(X_test[i:i+BATCH_SIZE]))
+    batch_time = time.perf_counter() - start
+
+    # Single-item: latensi request tunggal (skenario /analyze)
+    single = []
+    for text in X_test[:LATENCY_SAMPLES]:
+        t0 = time.perf_counter()
+        predict([text])
+        single.append((time.perf_counter() - t0) * 1000)
+
+    return {
+        "name": name,
+        "accuracy": round(accuracy_score(y_test, preds) * 100, 2),
+        "f1_weighted": round(f1_score(y_test, preds, average='weighted') * 100, 2),
+        "single_p50_ms": round(float(np.percentile(single, 50)), 3),
+        "single_p95_ms": round(float(np.percentile(single, 95)), 3),
+        "batch_ms_per_item": round(batch_time * 1000 / len(X_test), 3),
+        "throughput_per_s": round(len(X_test) / batch_time, 1),
+        "disk_mb": round(dir_size_mb(path), 2),
+        "rss_model_mb": round(rss_loaded - rss_before, 1),
+        "rss_total_mb": round(rss_mb(), 1),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    }
+
+# ==========================================
+# TAHAP 3: PARETO (AKURASI vs LATENSI)
+# ==========================================
+def pareto_front(results):
+    """Kandidat tidak terdominasi: tidak ada yang lebih akurat DAN lebih cepat (single p50)"""
+    front = set()
+    for r in results:
+        dominated = any(
+            o['accuracy'] >= r['accuracy'] and o['single_p50_ms'] <= r['single_p50_ms']
+            and (o['accuracy'] > r['accuracy'] or o['single_p50_ms'] < r['single_p50_ms'])
+            for o in results if o is not r)
+        if not dominated:
+            front.add(r['name'])
+    return front
+
+def print_table(results, front):
+    print(f"\n{'Model':<14}{'Acc%':>7}{'F1%':>7}{'p50 ms':>9}{'p95 ms':>9}{'ms/item':>9}"
+          f"{'item/s':>9}{'Disk MB':>9}{'RSS MB':>8}{'Train s':>9}  Pareto")
+    for r in sorted(results, key=lambda r: r['single_p50_ms']):
+        print(f"{r['name']:<14}{r['accuracy']:>7.1f}{r['f1_weighted']:>7.1f}{r['single_p50_ms']:>9.2f}"
+              f"{r['single_p95_ms']:>9.2f}{r['batch_ms_per_item']:>9.3f}{r['throughput_per_s']:>9.0f}"
+              f"{r['disk_mb']:>9.1f}{r['rss_model_mb']:>8.0f}{str(r.get('train_time_s', '-')):>9}"
+              f"  {'★' if r['name'] in front else ''}")
+
+# --- MAIN BENCHMARK ---
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark akurasi vs latensi/memori kandidat model Aspek")
+    parser.add_argument('--workers', type=int, default=3, help="Proses paralel untuk training NB/SVM/Bi-LSTM")
+    parser.add_argument('--threads', type=int, default=max(1, (os.cpu_count() or 1) // 2),
+                        help="Thread torch saat pengukuran inferensi CPU")
+    parser.add_argument('--skip-bert', action='store_true')
+    args = parser.parse_args()
+
+    print("⚔️  MEMULAI ULTIMATE BENCHMARK: BERT vs Bi-LSTM vs SVM vs NB")
+    print(f"   Training Device: {DEVICE} | Inferensi: CPU ({args.threads} thread)")
+    print("="*60)
+
+    # 1. Load Data
+    if not os.path.exists(DATA_PATH): return print("❌ Data not found!")
+    X_train, X_test, y_train, y_test = load_split()
+    print(f"📊 Data Training: {len(X_train)} | Testing: {len(X_test)}")
+    print("-" * 60)
+    os.makedirs(ARTIFACT_DIR, exist_ok=True)
+
+    # spawn + 1 task per proses: CUDA aman & peak RSS tiap kandidat tidak tercampur
+    ctx = mp.get_context('spawn')
+    candidates = ['Naive Bayes', 'SVM Linear', 'Bi-LSTM']
+    train_threads = max(1, (os.cpu_count() or 1) // args.workers)
+
+    print(f"1️⃣  Training {len(candidates)} kandidat paralel ({args.workers} proses)...")
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=ctx, max_tasks_per_child=1) as pool:
+        futures = [pool.submit(train_candidate, name, X_train, y_train, train_threads) for name in candidates]
+        trained = [f.result() for f in futures]
+    for t in trained:
+        print(f"   👉 {t['name']:<12} selesai ({t['train_time_s']}s) -> {os.path.relpath(t['path'], BASE_DIR)}")
+
+    if not args.skip_bert:
+        if os.path.exists(BERT_PATH):
+            trained.append({"name": "IndoBERT", "path": BERT_PATH})
+        else:
+            print(f"   ⚠️ {BERT_PATH} tidak ditemukan, IndoBERT dilewati (jalankan 02 dulu)")
+    if os.path.exists(STUDENT_PATH):
+        trained.append({"name": "Student (KD)", "path": STUDENT_PATH})
+
+    # Pengukuran latensi berurutan: kandidat tidak berebut CPU satu sama lain
+    print("\n2️⃣  Mengukur inferensi CPU (single-item & batch), disk, dan RSS...")
+    results = []
+    for t in trained:
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            r = pool.submit(serve_candidate, t['name'], t['path'], X_test, y_test, args.threads).result()
+        r['train_time_s'] = t.get('train_time_s')
+        results.append(r)
+        print(f"   👉 {r['name']:<12} Acc {r['accuracy']:.2f}% | p50 {r['single_p50_ms']:.2f} ms | "
+              f"{r['throughput_per_s']:.0f} item/s | RSS +{r['rss_model_mb']:.0f} MB")
 
     # ==========================================
     # HASIL AKHIR
     # ==========================================
+    front = pareto_front(results)
     print("\n" + "="*60)
-    print("🏆 FINAL SCOREBOARD (Data Asli)")
-    print(f"   1. IndoBERT (Transformer) : ~78.0% (SOTA)")
-    print(f"   2. Bi-LSTM (RNN)          : {lstm_acc:.1f}%")
-    print(f"   3. SVM (Machine Learning) : {svm_acc:.1f}%")
-    print(f"   4. Naive Bayes            : {nb_acc:.1f}%")
+    print("🏆 FINAL SCOREBOARD: AKURASI vs LATENSI (★ = Pareto-optimal)")
+    print_table(results, front)
     print("="*60)
+
+    for r in results:
+        r['pareto'] = r['name'] in front
+    report = {
+        "meta": {"timestamp": datetime.now().isoformat(), "n_train": len(X_train), "n_test": len(X_test),
+                 "inference_threads": args.threads, "batch_size": BATCH_SIZE, "latency_samples": LATENCY_SAMPLES},
+        "results": results
+    }
+    with open(RESULT_JSON, 'w') as f:
+        json.dump(report, f, indent=4)
+    print(f"✅ Hasil tersimpan: {RESULT_JSON}")
     print("👉 Silakan masukkan angka ini ke templates/dev_dashboard.html")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,34 @@
+import os
+import sys
+import json
+
+# --- KONFIGURASI ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from utils.artifacts import publish_artifact, brotli, STATIC_DIR
+
+# Artefak hasil pipeline 03 / 05 / 06 / 07 yang disajikan lewat /data/<nama>
+ARTIFACTS = ['trends_data.json', 'data_map.json', 'bug_report.json', 'model_metrics.json']
+
+def main():
+    print("📦 PUBLISHING STATIC DATA ARTIFACTS (minify + gzip/brotli + manifest)...")
+    if not brotli:
+        print("⚠️ Modul 'brotli' tidak terpasang: hanya varian .gz yang dibuat.")
+
+    for name in ARTIFACTS:
+        path = os.path.join(STATIC_DIR, name)
+        if not os.path.exists(path):
+            print(f"   ⏭️  {name}: tidak ditemukan, dilewati")
+            continue
+        before = os.path.getsize(path)
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        entry = publish_artifact(name, data)
+        print(f"   ✅ {name}: {before/1024:.1f} KB -> {entry['size']/1024:.1f} KB "
+              f"(gz {entry['gzip']/1024:.1f} KB"
+              + (f", br {entry['br']/1024:.1f} KB" if 'br' in entry else "")
+              + f") #{entry['hash']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import resource
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# --- KONFIGURASI ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from utils.bmkg_api import BMKGHandler
+from utils.bmkg_replay import ReplayServer
+
+DATA_PATH = os.path.join(BASE_DIR, 'data', 'raw', 'arsip_scraping_lengkap.csv')
+BENCH_DIR = os.path.join(BASE_DIR, 'data', 'benchmarks')
+RESULT_JSON = os.path.join(BENCH_DIR, 'perf_latest.json')
+BASELINE_JSON = os.path.join(BENCH_DIR, 'perf_baseline.json')
+
+BATCH_SIZES = [1, 2, 4, 8, 16, 32, 64]
+UPSTREAM_LATENCIES_MS = [0, 50, 200]
+RSS_NOISE_MB = 5  # Selisih delta RSS di bawah ini bukan regresi (alokator, GC)
+
+# --- UTILS ---
+def rss_mb():
+    """RSS proses saat ini (MB) dari /proc/self/statm; None di luar Linux"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * resource.getpagesize() / 1024 ** 2
+    except (OSError, ValueError, IndexError):
+        return None
+
+class RssPeak:
+    """Puncak RSS selama blok `with` di atas RSS awal blok (sampling /proc/self/statm).
+    ru_maxrss adalah puncak seumur proses, sehingga tiap konfigurasi setelah yang terberat ikut melaporkan puncaknya"""
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.start = self.peak = None
+        self._stop = threading.Event()
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, rss_mb())
+
+    def __enter__(self):
+        self.start = self.peak = rss_mb()
+        if self.start is not None:
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self.start is not None:
+            self._stop.set()
+            self._thread.join()
+            self.peak = max(self.peak, rss_mb())
+
+    @property
+    def delta_mb(self):
+        return None if self.start is None else round(self.peak - self.start, 1)
+
+def summarize(latencies_s, n_items=None, n_tokens=None, rss=None):
+    lat = np.array(latencies_s) * 1000
+    total = float(np.sum(latencies_s))
+    out = {
+        "p50_ms": round(float(np.percentile(lat, 50)), 3),
+        "p99_ms": round(float(np.percentile(lat, 99)), 3),
+        "runs": len(lat)
+    }
+    if n_items:
+        out["items_per_s"] = round(n_items / total, 1)
+    if n_tokens:
+        out["tokens_per_s"] = round(n_tokens / total, 1)
+    if rss is not None and rss.delta_mb is not None:
+        out["peak_rss_delta_mb"] = rss.delta_mb
+    return out
+
+def load_texts(n):
+    df = pd.read_csv(DATA_PATH).dropna(subset=['Komentar'])
+    return df['Komentar'].astype(str).sample(n=min(n, len(df)), random_state=42, replace=len(df) < n).tolist()
+
+# ==========================================
+# 1. ModelHandler.predict (batch 1..64)
+# ==========================================
+def bench_model(texts, repeats):
+    from utils.model_handler import ModelHandler
+    handler = ModelHandler()
+    results = {}
+    for bs in BATCH_SIZES:
+        batches = [texts[i:i+bs] for i in range(0, bs * repeats, bs)]
+        latencies, n_tokens = [], 0
+        with RssPeak() as rss:
+            handler.predict_batch(batches[0], batch_size=bs)  # Warm-up
+            for batch in batches:
+                # Token dihitung dari tokenizer ABSA (kedua model memakai vocab IndoBERT yang sama)
+                n_tokens += sum(len(ids) for ids in handler.models['absa']['tokenizer'](
+                    [handler.clean_text(t) for t in batch], truncation=True, max_length=128)['input_ids'])
+                start = time.perf_counter()
+                handler.predict_batch(batch, batch_size=bs)
+                latencies.append(time.perf_counter() - start)
+        results[f"bs_{bs}"] = summarize(latencies, n_items=bs * len(batches), n_tokens=n_tokens, rss=rss)
+        print(f"   bs={bs:>2}: {results[f'bs_{bs}']}")
+    return results
+
+# ==========================================
+# 2. BMKGHandler.get_all_weather (stub lokal)
+# ==========================================
+def bench_weather(repeats):
+    results = {}
+    for latency in UPSTREAM_LATENCIES_MS:
+        server = ReplayServer(latency_ms=latency).start()
+        try:
+            handler = BMKGHandler(data_base_url=server.base_url, api_base_url=server.base_url,
+                                  web_base_url=server.base_url)
+            latencies = []
+            with RssPeak() as rss:
+                handler.get_all_weather()  # Warm-up koneksi
+                for _ in range(repeats):
+                    start = time.perf_counter()
+                    handler.get_all_weather()
+                    latencies.append(time.perf_counter() - start)
+            results[f"upstream_{latency}ms"] = summarize(latencies, n_items=len(handler.cities) * repeats, rss=rss)
+            print(f"   upstream {latency}ms: {results[f'upstream_{latency}ms']}")
+        finally:
+            server.stop()
+    return results
+
+# ==========================================
+# 3. Word2VecHandler.get_similar
+# ==========================================
+def bench_word2vec(repeats):
+    from utils.word2vec_handler import Word2VecHandler
+    handler = Word2VecHandler()
+    words = handler.model.index_to_key[:max(repeats, 1)]
+    latencies = []
+    with RssPeak() as rss:
+        handler.get_similar(words[0])  # Warm-up (normalisasi vektor dilakukan sekali)
+        for w in words:
+            start = time.perf_counter()
+            handler.get_similar(w)
+            latencies.append(time.perf_counter() - start)
+    results = {"topn_10": summarize(latencies, n_items=len(words), rss=rss)}
+    print(f"   topn=10: {results['topn_10']}")
+    return results
+
+# ==========================================
+# 4. clean_text throughput
+# ==========================================
+def legacy_clean_text(text):
+    """Cleaning lama (01/04 sebelum utils/preprocessing.py) sebagai pembanding"""
+    import re
+    if not isinstance(text, str):
+        return ""
+    text = text.lower()
+    text = re.sub(r'http\S+', '', text)
+    text = re.sub(r'[^\w\s]', ' ', text)
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text
+
+def bench_clean_text(texts, repeats):
+    from utils.preprocessing import clean_text, clean_series, Stemmer, StemmerFactory
+    column = pd.read_csv(DATA_PATH)['Komentar']  # Seluruh kolom (ada duplikat & NaN seperti data asli)
+    n = len(column)
+    n_bytes = sum(len(t.encode('utf-8')) for t in texts)
+
+    def timed(fn):
+        latencies = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            fn()
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    # per_row: 1 teks per panggilan (jalur serving /analyze)
+    with RssPeak() as rss:
+        latencies = timed(lambda: [clean_text(t) for t in texts])
+    results = {"per_row": summarize(latencies, n_items=len(texts) * repeats, rss=rss)}
+    results["per_row"]["mb_per_s"] = round(n_bytes * repeats / sum(latencies) / 1e6, 2)
+
+    # Seluruh kolom, dinormalisasi ke waktu per 100rb baris
+    variants = {
+        "legacy_apply": lambda: column.apply(legacy_clean_text),
+        "clean_text_rows": lambda: column.apply(clean_text),
+        "clean_series": lambda: clean_series(column),
+        "clean_series_slang": lambda: clean_series(column, slang=True),
+    }
+    for name, fn in variants.items():
+        latencies = timed(fn)
+        results[name] = {"rows": n, "per_100k_ms": round(float(np.median(latencies)) * 1000 * 100000 / n, 1)}
+
+    if StemmerFactory is not None:
+        # Cold: stemmer tanpa cache -> biaya Sastrawi per kata baru; warm: semua kata sudah di cache
+        sample = column.dropna().sample(n=min(200, n), random_state=42).tolist()
+        stemmer = Stemmer()
+        start = time.perf_counter()
+        for t in sample:
+            stemmer.stem(clean_text(t))
+        cold = time.perf_counter() - start
+        results["stem_cold"] = {"new_words": len(stemmer.cache),
+                                "ms_per_new_word": round(cold * 1000 / max(1, len(stemmer.cache)), 2)}
+        # Sampel yang sama (cold-stem vocab seluruh kolom terlalu mahal untuk benchmark)
+        cleaned = [clean_text(t) for t in sample]
+        latencies = timed(lambda: [stemmer.stem(t) for t in cleaned])
+        results["stem_warm"] = {"rows": len(cleaned),
+                                "per_100k_ms": round(float(np.median(latencies)) * 1000 * 100000 / len(cleaned), 1)}
+
+    for name, row in results.items():
+        print(f"   {name}: {row}")
+    return results
+
+# ==========================================
+# 5. KOMPARASI DENGAN BASELINE
+# ==========================================
+def flatten(results, prefix=''):
+    flat = {}
+    for k, v in results.items():
+        key = f"{prefix}{k}"
+        if isinstance(v, dict):
+            flat.update(flatten(v, key + '.'))
+        else:
+            flat[key] = v
+    return flat
+
+def compare(current, baseline, threshold):
+    """Regresi: metrik *_ms/*_mb naik > threshold (delta RSS juga > RSS_NOISE_MB), atau metrik *_per_s turun > threshold"""
+    cur, base = flatten(current['results']), flatten(baseline['results'])
+    regressions = []
+    for key, new in cur.items():
+        old = base.get(key)
+        if not isinstance(old, (int, float)) or not isinstance(new, (int, float)):
+            continue
+        if key.endswith('_mb'):
+            # Delta RSS bisa 0 / negatif: regresi = naik > threshold dan > RSS_NOISE_MB
+            if new - old > max(RSS_NOISE_MB, threshold * abs(old)):
+                regressions.append((key, old, new, (new - old) / abs(old) if old else float('inf')))
+            continue
+        if not old:
+            continue
+        change = (new - old) / old
+        if key.endswith('_ms') and change > threshold:
+            regressions.append((key, old, new, change))
+        elif key.endswith('_per_s') and change < -threshold:
+            regressions.append((key, old, new, change))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark performa jalur produksi")
+    parser.add_argument('--suites', default='model,weather,word2vec,clean_text',
+                        help="Daftar suite dipisah koma: model,weather,word2vec,clean_text")
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--out', default=RESULT_JSON)
+    parser.add_argument('--baseline', default=BASELINE_JSON)
+    parser.add_argument('--compare', action='store_true', help="Bandingkan hasil dengan baseline")
+    parser.add_argument('--save-baseline', action='store_true', help="Simpan hasil sebagai baseline baru")
+    parser.add_argument('--threshold', type=float, default=0.10, help="Toleransi regresi (0.10 = 10%%)")
+    args = parser.parse_args()
+    suites = set(args.suites.split(','))
+
+    print("="*60)
+    print("⏱️  PERFORMANCE BENCHMARK SUITE")
+    print("="*60)
+
+    texts = load_texts(max(BATCH_SIZES) * args.repeats)
+    results = {}
+    if 'model' in suites:
+        print("\n1️⃣  ModelHandler.predict_batch")
+        results['model_predict'] = bench_model(texts, args.repeats)
+    if 'weather' in suites:
+        print("\n2️⃣  BMKGHandler.get_all_weather (stub lokal)")
+        results['weather'] = bench_weather(args.repeats)
+    if 'word2vec' in suites:
+        print("\n3️⃣  Word2VecHandler.get_similar")
+        results['word2vec'] = bench_word2vec(args.repeats * 10)
+    if 'clean_text' in suites:
+        print("\n4️⃣  clean_text")
+        results['clean_text'] = bench_clean_text(texts, max(1, args.repeats // 4))
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count()
+        },
+        "results": results
+    }
+    os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=4)
+    print(f"\n✅ Hasil tersimpan: {args.out}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=4)
+        print(f"📌 Baseline diperbarui: {args.baseline}")
+
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"⚠️ Baseline tidak ditemukan: {args.baseline}")
+            return
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} REGRESI (> {args.threshold:.0%}):")
+            for key, old, new, change in regressions:
+                print(f"   {key}: {old} -> {new} ({change:+.1%})")
+            sys.exit(1)
+        print(f"\n✅ Tidak ada regresi terhadap baseline (toleransi {args.threshold:.0%}).")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import subprocess
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import requests
+
+# --- KONFIGURASI ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from utils.bmkg_api import BMKGHandler
+from utils.bmkg_replay import ReplayServer
+
+DATA_PATH = os.path.join(BASE_DIR, 'data', 'raw', 'arsip_scraping_lengkap.csv')
+FIXTURES_DIR = os.path.join(BASE_DIR, 'data', 'fixtures', 'bmkg')
+RESULT_JSON = os.path.join(BASE_DIR, 'data', 'benchmarks', 'load_latest.json')
+
+# Campuran traffic realistis (bobot relatif)
+TRAFFIC_MIX = [
+    ('analyze', 30),
+    ('chatbot', 20),
+    ('live_quake', 15),
+    ('word2vec', 15),
+    ('live_weather', 10),
+    ('weather_warning', 10),
+]
+CHATBOT_MESSAGES = ["gempa terkini dimana?", "cuaca di Jakarta?", "cuaca di Makassar hari ini",
+                    "apakah ada peringatan dini?", "hujan di Bandung?", "magnitude gempa terbaru"]
+W2V_WORDS = ["lemot", "gempa", "cuaca", "notif", "iklan", "akurat", "hujan", "error", "update", "mantap"]
+
+# ==========================================
+# 1. RECORD: REKAM RESPON ASLI BMKG KE FIXTURE
+# ==========================================
+def record(args):
+    handler = BMKGHandler()
+    os.makedirs(os.path.join(args.fixtures, 'prakiraan-cuaca'), exist_ok=True)
+    targets = [(handler.url_gempa_latest, 'autogempa.json'),
+               (handler.url_gempa_list, 'gempaterkini.json'),
+               (handler.url_warning_rss, 'nowcast_rss.xml')]
+    targets += [(f"{handler.url_weather}?adm4={c['code']}", os.path.join('prakiraan-cuaca', f"{c['code']}.json"))
+                for c in handler.cities]
+    for url, name in targets:
+        try:
+            r = requests.get(url, headers=handler.headers, timeout=15)
+            if r.status_code == 200:
+                with open(os.path.join(args.fixtures, name), 'wb') as f:
+                    f.write(r.content)
+                print(f"   ✅ {name} ({len(r.content)} B)")
+            else:
+                print(f"   ⚠️ {name}: HTTP {r.status_code}")
+        except Exception as e:
+            print(f"   ❌ {name}: {e}")
+
+# ==========================================
+# 2. REPLAY: JALANKAN STAND-IN BMKG SAJA
+# ==========================================
+def start_replay(args):
+    server = ReplayServer(port=args.replay_port, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                          error_rate=args.error_rate, fixtures_dir=args.fixtures, seed=42,
+                          tail_rate=args.tail_rate, tail_ms=args.tail_ms).start()
+    print(f"🛰️  BMKG replay: {server.base_url} (latency {args.latency_ms}±{args.jitter_ms} ms, "
+          f"ekor {args.tail_rate:.0%} +{args.tail_ms} ms, error {args.error_rate:.0%}, fixtures: {args.fixtures})")
+    return server
+
+def replay(args):
+    server = start_replay(args)
+    print("   Set env berikut sebelum menjalankan app:")
+    for key in ('BMKG_DATA_BASE_URL', 'BMKG_API_BASE_URL', 'BMKG_WEB_BASE_URL'):
+        print(f"   export {key}={server.base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+# ==========================================
+# 3. RUN: LOAD DRIVER
+# ==========================================
+def build_request(kind, rng, texts):
+    if kind == 'analyze':
+        return 'POST', '/analyze', {"text": rng.choice(texts)}
+    if kind == 'chatbot':
+        return 'POST', '/api/chatbot', {"message": rng.choice(CHATBOT_MESSAGES)}
+    if kind == 'word2vec':
+        return 'GET', f"/api/word2vec?word={rng.choice(W2V_WORDS)}", None
+    return 'GET', f"/api/{kind}", None
+
+def worker(target, deadline, texts, seed, records, lock):
+    rng = random.Random(seed)
+    kinds = [k for k, _ in TRAFFIC_MIX]
+    weights = [w for _, w in TRAFFIC_MIX]
+    session = requests.Session()
+    local = []
+    while time.time() < deadline:
+        kind = rng.choices(kinds, weights)[0]
+        method, path, body = build_request(kind, rng, texts)
+        start = time.perf_counter()
+        try:
+            r = session.request(method, target + path, json=body, timeout=30)
+            ok = r.status_code < 500
+        except requests.RequestException:
+            ok = False
+        local.append((kind, time.perf_counter() - start, ok, time.time()))
+    with lock:
+        records.extend(local)
+
+def summarize(records, duration):
+    def stats(rows):
+        lat = np.array([r[1] for r in rows]) * 1000
+        return {
+            "requests": len(rows),
+            "errors": sum(1 for r in rows if not r[2]),
+            "rps": round(len(rows) / duration, 2),
+            "p50_ms": round(float(np.percentile(lat, 50)), 2),
+            "p95_ms": round(float(np.percentile(lat, 95)), 2),
+            "p99_ms": round(float(np.percentile(lat, 99)), 2)
+        }
+    report = {"overall": stats(records), "endpoints": {}}
+    for kind, _ in TRAFFIC_MIX:
+        rows = [r for r in records if r[0] == kind]
+        if rows:
+            report["endpoints"][kind] = stats(rows)
+    return report
+
+def spawn_gunicorn(args, bmkg_url):
+    env = dict(os.environ, BMKG_DATA_BASE_URL=bmkg_url, BMKG_API_BASE_URL=bmkg_url, BMKG_WEB_BASE_URL=bmkg_url)
+    cmd = ['gunicorn', '-w', str(args.workers), '--threads', str(args.threads),
+           '-b', f"127.0.0.1:{args.port}", '--timeout', '120', 'app:app']
+    print(f"🦄 {' '.join(cmd)}")
+    proc = subprocess.Popen(cmd, cwd=BASE_DIR, env=env)
+    target = f"http://127.0.0.1:{args.port}"
+    # Tunggu model & Word2Vec selesai dimuat (cold start bisa puluhan detik)
+    for _ in range(args.boot_timeout):
+        try:
+            if requests.get(target + '/model_info', timeout=2).status_code == 200:
+                return proc, target
+        except requests.RequestException:
+            pass
+        time.sleep(1)
+    proc.terminate()
+    raise RuntimeError("gunicorn tidak siap dalam batas waktu boot")
+
+def run(args):
+    server = proc = None
+    target = args.target
+    try:
+        if args.spawn:
+            server = start_replay(args)
+            proc, target = spawn_gunicorn(args, server.base_url)
+
+        df = pd.read_csv(DATA_PATH).dropna(subset=['Komentar'])
+        texts = df['Komentar'].astype(str).tolist()
+
+        print(f"🔥 Load test: {target} | {args.concurrency} klien | {args.duration}s (+{args.warmup}s warm-up)")
+        if args.warmup:
+            worker(target, time.time() + args.warmup, texts, -1, [], threading.Lock())
+
+        records, lock = [], threading.Lock()
+        deadline = time.time() + args.duration
+        threads = [threading.Thread(target=worker, args=(target, deadline, texts, i, records, lock))
+                   for i in range(args.concurrency)]
+        for t in threads: t.start()
+        for t in threads: t.join()
+
+        report = {
+            "meta": {"timestamp": datetime.now().isoformat(), "target": target, "concurrency": args.concurrency,
+                     "duration_s": args.duration, "workers": args.workers if args.spawn else None,
+                     "upstream_latency_ms": args.latency_ms, "upstream_error_rate": args.error_rate},
+            "results": summarize(records, args.duration)
+        }
+        os.makedirs(os.path.dirname(args.out), exist_ok=True)
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=4)
+
+        o = report['results']['overall']
+        print(f"\n📊 SUSTAINED: {o['rps']} RPS | p50 {o['p50_ms']} ms | p95 {o['p95_ms']} ms | "
+              f"p99 {o['p99_ms']} ms | error {o['errors']}/{o['requests']}")
+        for kind, st in report['results']['endpoints'].items():
+            print(f"   {kind:<16} {st['rps']:>7} RPS  p50 {st['p50_ms']:>8} ms  p99 {st['p99_ms']:>8} ms  err {st['errors']}")
+        if server:
+            print(f"   Upstream replay hits: {server.hits} (injected errors: {server.errors})")
+        print(f"✅ Hasil tersimpan: {args.out}")
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait(timeout=30)
+        if server:
+            server.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test end-to-end dengan stand-in BMKG lokal")
+    sub = parser.add_subparsers(dest='cmd', required=True)
+
+    def replay_opts(p):
+        p.add_argument('--fixtures', default=FIXTURES_DIR)
+        p.add_argument('--replay-port', type=int, default=0)
+        p.add_argument('--latency-ms', type=float, default=80)
+        p.add_argument('--jitter-ms', type=float, default=40)
+        p.add_argument('--error-rate', type=float, default=0.0)
+        p.add_argument('--tail-rate', type=float, default=0.0, help="Fraksi request yang diperlambat --tail-ms")
+        p.add_argument('--tail-ms', type=float, default=0)
+
+    p_rec = sub.add_parser('record', help="Rekam respon asli BMKG ke folder fixture")
+    p_rec.add_argument('--fixtures', default=FIXTURES_DIR)
+
+    p_rep = sub.add_parser('replay', help="Jalankan server replay BMKG saja")
+    replay_opts(p_rep)
+    p_rep.set_defaults(replay_port=8765)
+
+    p_run = sub.add_parser('run', help="Jalankan load driver")
+    replay_opts(p_run)
+    p_run.add_argument('--target', default='http://127.0.0.1:8000', help="URL app (abaikan jika --spawn)")
+    p_run.add_argument('--spawn', action='store_true', help="Start replay + gunicorn otomatis")
+    p_run.add_argument('--workers', type=int, default=2)
+    p_run.add_argument('--threads', type=int, default=4)
+    p_run.add_argument('--port', type=int, default=8000)
+    p_run.add_argument('--boot-timeout', type=int, default=180)
+    p_run.add_argument('--concurrency', type=int, default=16)
+    p_run.add_argument('--duration', type=int, default=60)
+    p_run.add_argument('--warmup', type=int, default=5)
+    p_run.add_argument('--out', default=RESULT_JSON)
+
+    args = parser.parse_args()
+    {'record': record, 'replay': replay, 'run': run}[args.cmd](args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+# --- KONFIGURASI ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+import config
+from utils.fast_classifier import FastClassifier
+from utils.near_duplicates import representatives
+
+REPORT_JSON = os.path.join(BASE_DIR, 'data', 'benchmarks', 'cascade_report.json')
+THRESHOLDS = [0.0, 0.5, 0.6, 0.7, 0.75, 0.8, 0.85, 0.9, 0.95, 1.01]  # 0.0 = selalu cepat, 1.01 = selalu IndoBERT
+LATENCY_SAMPLES = 100
+
+# Dataset & label per head: identik dengan 02_train_aspect_model.py / 04_emotion_training.py
+HEADS = {
+    'absa': (config.ABSA_CSV, 'Aspek_Terdeteksi', ["Akurasi", "UI/UX", "Performa", "Lainnya"],
+             os.path.join(config.MODELS_DIR, 'aspect_model')),
+    'emotion': (config.EMOTION_CSV, 'Emosi', ["marah", "takut", "bahagia", "sedih"],
+                os.path.join(config.MODELS_DIR, 'emotion_model')),
+}
+
+def load_split(csv_path, label_col, labels):
+    df = representatives(pd.read_csv(csv_path))
+    df = df[df[label_col].isin(labels)]
+    return train_test_split(df['clean_text'].astype(str).tolist(), df[label_col].tolist(),
+                            test_size=0.2, random_state=42)
+
+def single_latency_ms(predict, texts):
+    """Rata-rata latensi 1 item (skenario request /analyze)"""
+    texts = texts[:LATENCY_SAMPLES]
+    start = time.perf_counter()
+    for t in texts:
+        predict([t])
+    return (time.perf_counter() - start) * 1000 / len(texts)
+
+def bert_predictor(model_dir):
+    """IndoBERT di CPU -> predict(list_teks) -> list label string; None jika model belum dilatih"""
+    if not os.path.exists(model_dir):
+        return None
+    import torch
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    model = AutoModelForSequenceClassification.from_pretrained(model_dir).eval()
+    def predict(texts):
+        inputs = tokenizer(texts, return_tensors="pt", padding=True, truncation=True, max_length=128)
+        with torch.no_grad():
+            return [model.config.id2label[i] for i in model(**inputs).logits.argmax(1).tolist()]
+    return predict
+
+# ==========================================
+# LAPORAN THRESHOLD: AKURASI vs LATENSI RATA-RATA
+# ==========================================
+def threshold_report(y_val, fast_pred, fast_conf, fast_ms, bert_pred, bert_ms):
+    y = np.array(y_val)
+    fast_pred, fast_conf = np.array(fast_pred), np.array(fast_conf)
+    rows = []
+    for t in THRESHOLDS:
+        accepted = fast_conf >= t
+        coverage = float(accepted.mean())
+        row = {
+            "threshold": t,
+            "fast_coverage": round(coverage * 100, 1),
+            "fast_acc_on_accepted": round(float((fast_pred[accepted] == y[accepted]).mean()) * 100, 2) if accepted.any() else None
+        }
+        if bert_pred is not None:
+            combined = np.where(accepted, fast_pred, np.array(bert_pred))
+            row["cascade_acc"] = round(float((combined == y).mean()) * 100, 2)
+            # Tier cepat selalu jalan; IndoBERT hanya untuk sisa (1 - coverage)
+            row["avg_latency_ms"] = round(fast_ms + (1 - coverage) * bert_ms, 2)
+        rows.append(row)
+    return rows
+
+def suggest_threshold(rows, bert_acc, tolerance):
+    """Threshold termurah yang akurasinya maksimal `tolerance` poin di bawah IndoBERT penuh"""
+    ok = [r for r in rows if r.get('cascade_acc') is not None and r['cascade_acc'] >= bert_acc - tolerance]
+    return min(ok, key=lambda r: r['avg_latency_ms'])['threshold'] if ok else None
+
+def main():
+    parser = argparse.ArgumentParser(description="Latih tier cepat cascade + laporan threshold")
+    parser.add_argument('--out', default=config.FAST_MODEL_PATH)
+    parser.add_argument('--tolerance', type=float, default=1.0, help="Maks penurunan akurasi (poin %%) vs IndoBERT")
+    parser.add_argument('--full', action='store_true', help="Setelah laporan, latih ulang pada seluruh data")
+    args = parser.parse_args()
+
+    print("⚡ TRAINING TIER CEPAT CASCADE (TF-IDF + Linear SVM Terkalibrasi)")
+    print("=" * 60)
+    fast = FastClassifier()
+    report = {"meta": {"timestamp": datetime.now().isoformat(), "latency_samples": LATENCY_SAMPLES}, "heads": {}}
+
+    for head, (csv_path, label_col, labels, bert_dir) in HEADS.items():
+        X_train, X_val, y_train, y_val = load_split(csv_path, label_col, labels)
+        print(f"\n🧠 Head '{head}': Train {len(X_train)} | Val {len(X_val)}")
+
+        start = time.time()
+        fast.fit(head, X_train, y_train)
+        print(f"   ✅ Selesai dilatih ({time.time() - start:.1f}s)")
+
+        fast_pred, fast_conf = fast.predict(head, X_val)
+        fast_ms = single_latency_ms(lambda t: fast.predict(head, t), X_val)
+        fast_acc = float(np.mean(np.array(fast_pred) == np.array(y_val))) * 100
+
+        bert = bert_predictor(bert_dir)
+        bert_pred, bert_ms, bert_acc = None, None, None
+        if bert:
+            bert_pred = []
+            for i in range(0, len(X_val), 32):
+                bert_pred.extend(bert(X_val[i:i+32]))
+            bert_ms = single_latency_ms(bert, X_val)
+            bert_acc = float(np.mean(np.array(bert_pred) == np.array(y_val))) * 100
+        else:
+            print(f"   ⚠️ {bert_dir} tidak ada: laporan hanya berisi coverage & akurasi tier cepat")
+
+        rows = threshold_report(y_val, fast_pred, fast_conf, fast_ms, bert_pred, bert_ms)
+        suggested = suggest_threshold(rows, bert_acc, args.tolerance) if bert else None
+        report["heads"][head] = {
+            "n_val": len(X_val),
+            "fast_only_acc": round(fast_acc, 2), "fast_ms": round(fast_ms, 3),
+            "bert_only_acc": round(bert_acc, 2) if bert else None, "bert_ms": round(bert_ms, 2) if bert else None,
+            "suggested_threshold": suggested,
+            "thresholds": rows
+        }
+
+        print(f"   Tier cepat saja: Acc {fast_acc:.2f}% | {fast_ms:.2f} ms/item")
+        if bert:
+            print(f"   IndoBERT saja  : Acc {bert_acc:.2f}% | {bert_ms:.2f} ms/item")
+        print(f"   {'Thr':>5}{'Cepat%':>9}{'AccCepat':>10}{'AccCascade':>12}{'Lat ms':>9}")
+        for r in rows:
+            print(f"   {r['threshold']:>5.2f}{r['fast_coverage']:>9.1f}{str(r['fast_acc_on_accepted']):>10}"
+                  f"{str(r.get('cascade_acc', '-')):>12}{str(r.get('avg_latency_ms', '-')):>9}")
+        if suggested is not None:
+            print(f"   👉 Saran CASCADE_THRESHOLD: {suggested}")
+
+    os.makedirs(os.path.dirname(REPORT_JSON), exist_ok=True)
+    with open(REPORT_JSON, 'w') as f:
+        json.dump(report, f, indent=4)
+    print(f"\n📄 Laporan threshold: {REPORT_JSON}")
+
+    if args.full:
+        print("🔁 Melatih ulang pada seluruh data (train + val)...")
+        for head, (csv_path, label_col, labels, _) in HEADS.items():
+            X_train, X_val, y_train, y_val = load_split(csv_path, label_col, labels)
+            fast.fit(head, X_train + X_val, y_train + y_val)
+
+    os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    fast.save(args.out)
+    print(f"💾 Model tier cepat tersimpan: {args.out}")
+    print("👉 Aktifkan dengan CASCADE_ENABLED=1 (threshold via CASCADE_THRESHOLD)")
+
+if __name__ == "__main__":
+    main()
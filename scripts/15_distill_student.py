@@ -0,0 +1,150 @@
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+import torch
+import torch.nn.functional as F
+from sklearn.model_selection import train_test_split
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+from tqdm import tqdm
+
+# --- KONFIGURASI ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+import config
+from utils.near_duplicates import representatives
+from utils.student_model import BiLSTMClassifier, StudentTokenizer, build_vocab, save_student
+from utils.preprocessing import clean_series
+
+DEVICE = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+# Teacher & label per head (split identik dengan 02/04 agar val set tetap tidak terlihat student)
+HEADS = {
+    'absa': (config.ABSA_CSV, 'Aspek_Terdeteksi', ["Akurasi", "UI/UX", "Performa", "Lainnya"],
+             os.path.join(config.MODELS_DIR, 'aspect_model')),
+    'emotion': (config.EMOTION_CSV, 'Emosi', ["marah", "takut", "bahagia", "sedih"],
+                os.path.join(config.MODELS_DIR, 'emotion_model')),
+}
+
+# --- FUNGSI UTILITIES ---
+def teacher_logits(model_dir, texts, batch_size=64):
+    """Soft target teacher IndoBERT untuk seluruh transfer set"""
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    model = AutoModelForSequenceClassification.from_pretrained(model_dir).to(DEVICE).eval()
+    # Urutkan per panjang teks: padding per batch minimal -> labeling arsip jauh lebih cepat
+    order = np.argsort([len(t) for t in texts])
+    logits = np.zeros((len(texts), model.config.num_labels), dtype=np.float32)
+    for i in tqdm(range(0, len(texts), batch_size), desc="   Teacher"):
+        idx = order[i:i+batch_size]
+        inputs = tokenizer([texts[j] for j in idx], return_tensors="pt", padding=True,
+                           truncation=True, max_length=128).to(DEVICE)
+        with torch.no_grad():
+            logits[idx] = model(**inputs).logits.float().cpu().numpy()
+    return logits, model.config.id2label, model.config.label2id
+
+# ==========================================
+# DISTILASI 1 HEAD
+# ==========================================
+def distill_head(head, archive_texts, args):
+    csv_path, label_col, labels, teacher_dir = HEADS[head]
+    if not os.path.exists(teacher_dir):
+        print(f"⚠️ Teacher {teacher_dir} tidak ditemukan, head '{head}' dilewati (latih 02/04 dulu)")
+        return
+
+    df = representatives(pd.read_csv(csv_path))
+    df = df[df[label_col].isin(labels)]
+    df['clean_text'] = df['clean_text'].astype(str)
+    X_train, X_val, y_train, y_val = train_test_split(df['clean_text'].tolist(), df[label_col].tolist(),
+                                                      test_size=0.2, random_state=42)
+    val_set = set(X_val)
+
+    # Transfer set: arsip tanpa label + train berlabel, tanpa teks val (evaluasi 06 tetap jujur)
+    transfer = list(dict.fromkeys(t for t in archive_texts + X_train if t and t not in val_set))
+    if args.max_texts:
+        transfer = transfer[:args.max_texts]
+    print(f"\n🧠 Head '{head}': transfer set {len(transfer)} teks (val {len(X_val)} dikecualikan)")
+
+    logits, id2label, label2id = teacher_logits(teacher_dir, transfer)
+    # Label keras hanya untuk teks berlabel (-1 = tidak ada, cukup soft target)
+    hard_map = {t: label2id.get(str(y), label2id.get(str(y).lower(), -1)) for t, y in zip(X_train, y_train)}
+    hard = np.array([hard_map.get(t, -1) for t in transfer])
+
+    vocab = build_vocab(transfer, max_size=args.vocab_size)
+    tokenizer = StudentTokenizer(vocab)
+    cfg = {"vocab_size": len(vocab)+2, "embed_dim": args.embed_dim, "hidden_dim": args.hidden_dim,
+           "output_dim": logits.shape[1], "n_layers": 2}
+    net = BiLSTMClassifier(**cfg).to(DEVICE)
+    optimizer = torch.optim.Adam(net.parameters(), lr=args.lr)
+    T, alpha = args.temperature, args.alpha
+
+    start = time.time()
+    for epoch in range(args.epochs):
+        net.train()
+        perm = np.random.permutation(len(transfer))
+        total = 0.0
+        for i in range(0, len(perm), args.batch_size):
+            idx = perm[i:i+args.batch_size]
+            input_ids = tokenizer([transfer[j] for j in idx])['input_ids'].to(DEVICE)
+            t_logits = torch.from_numpy(logits[idx]).to(DEVICE)
+            y = torch.from_numpy(hard[idx]).to(DEVICE)
+
+            s_logits = net(input_ids)
+            # KD (Hinton): KL antara distribusi teacher & student pada suhu T, diskalakan T^2
+            loss = alpha * F.kl_div(F.log_softmax(s_logits / T, dim=1), F.softmax(t_logits / T, dim=1),
+                                    reduction='batchmean') * T * T
+            if (y >= 0).any():
+                loss = loss + (1 - alpha) * F.cross_entropy(s_logits, y, ignore_index=-1)
+
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+            total += loss.item() * len(idx)
+
+        # Akurasi student pada val (ringkas; laporan lengkap + speedup via 06_generate_metrics.py)
+        net.eval()
+        with torch.no_grad():
+            preds = [net(tokenizer(X_val[i:i+256])['input_ids'].to(DEVICE)).argmax(1).cpu().numpy()
+                     for i in range(0, len(X_val), 256)]
+        gold = np.array([label2id.get(str(y), label2id.get(str(y).lower(), -1)) for y in y_val])
+        acc = float((np.concatenate(preds) == gold).mean()) * 100
+        print(f"   ...Epoch {epoch+1}/{args.epochs} | loss {total / len(perm):.4f} | val acc {acc:.2f}%")
+
+    path = os.path.join(args.out_dir, f"{head}.pt")
+    save_student(path, net, cfg, vocab, {int(k): v for k, v in id2label.items()})
+    print(f"   💾 Student tersimpan: {path} ({os.path.getsize(path) / 1024 ** 2:.1f} MB, {time.time() - start:.0f}s)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Distilasi IndoBERT (teacher) -> Bi-LSTM (student) untuk CPU")
+    parser.add_argument('--heads', nargs='+', default=list(HEADS), choices=list(HEADS))
+    parser.add_argument('--out-dir', default=config.STUDENT_MODEL_DIR)
+    parser.add_argument('--epochs', type=int, default=8)
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--lr', type=float, default=2e-3)
+    parser.add_argument('--temperature', type=float, default=2.0)
+    parser.add_argument('--alpha', type=float, default=0.7, help="Bobot loss KD vs label keras")
+    parser.add_argument('--embed-dim', type=int, default=128)
+    parser.add_argument('--hidden-dim', type=int, default=128)
+    parser.add_argument('--vocab-size', type=int, default=20000)
+    parser.add_argument('--max-texts', type=int, default=0, help="Batasi transfer set (0 = seluruh arsip)")
+    args = parser.parse_args()
+
+    print("🎓 KNOWLEDGE DISTILLATION: IndoBERT -> Bi-LSTM Student")
+    print(f"   Device: {DEVICE}")
+    print("=" * 60)
+
+    archive = pd.read_csv(config.RAW_CSV).dropna(subset=['Komentar'])
+    # Cleaning bersama (utils/preprocessing.py): student melihat teks persis seperti saat serving
+    archive_texts = clean_series(archive['Komentar']).tolist()
+    print(f"📂 Arsip tanpa label: {len(archive_texts)} review")
+
+    for head in args.heads:
+        distill_head(head, archive_texts, args)
+
+    print("\n✅ Selesai. Aktifkan dengan MODEL_BACKEND=student, evaluasi via scripts/06_generate_metrics.py")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import os
+import sys
+import json
+import argparse
+
+# --- KONFIGURASI ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+import config
+from utils.model_registry import ModelRegistry, HEADS
+
+METRICS_JSON = os.path.join(config.STATIC_DIR, 'model_metrics.json')
+# Sumber default = output 02/04 (IndoBERT) atau 15 (student)
+DEFAULT_SRC = {
+    ('absa', 'hf'): os.path.join(config.MODELS_DIR, 'aspect_model'),
+    ('emotion', 'hf'): os.path.join(config.MODELS_DIR, 'emotion_model'),
+    ('absa', 'student'): os.path.join(config.STUDENT_MODEL_DIR, 'absa.pt'),
+    ('emotion', 'student'): os.path.join(config.STUDENT_MODEL_DIR, 'emotion.pt'),
+}
+
+def published_metrics(head, student):
+    """Metrik hasil scripts/06_generate_metrics.py untuk model yang akan didaftarkan"""
+    try:
+        with open(METRICS_JSON) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    metrics = data.get(f"{head}_student" if student else head) or {}
+    return {k: metrics[k] for k in ('accuracy', 'f1', 'single_ms', 'batch_ms_per_item', 'device') if k in metrics}
+
+# ==========================================
+# SUBCOMMAND
+# ==========================================
+def cmd_list(registry, args):
+    manifest = registry.load()
+    if not manifest:
+        print(f"📭 Registry kosong ({registry.path}); app memakai direktori model lama")
+        return
+    for head in HEADS:
+        info = manifest.get(head)
+        if not info:
+            continue
+        print(f"\n🧠 {head}")
+        for version, entry in sorted(info['versions'].items()):
+            mark = '✅' if version == info['active'] else '  '
+            acc = entry['metrics'].get('accuracy', '-')
+            print(f"   {mark} {version:<20} {entry['format']:<8} acc {acc:<6} {entry['created']}  {entry['note']}")
+
+def cmd_register(registry, args):
+    student = args.student
+    src = args.src or DEFAULT_SRC[(args.head, 'student' if student else 'hf')]
+    if not os.path.exists(src):
+        sys.exit(f"❌ Model tidak ditemukan: {src}")
+    metrics = published_metrics(args.head, student or os.path.isfile(src))
+    if not metrics:
+        print("⚠️ Metrik tidak ditemukan di model_metrics.json (jalankan 06_generate_metrics.py sebelum register)")
+    version = registry.register(args.head, src, version=args.version, metrics=metrics,
+                                note=args.note, activate=args.activate)
+    active = registry.active(args.head)['version']
+    print(f"💾 {args.head} versi {version} terdaftar dari {src}")
+    print(f"   Versi aktif: {active}" + ("" if active == version else " (aktifkan dengan subcommand 'activate')"))
+
+def cmd_activate(registry, args):
+    try:
+        registry.activate(args.head, args.version)
+    except KeyError as e:
+        sys.exit(f"❌ {e}")
+    print(f"✅ {args.head} -> {args.version}. Worker app akan swap dalam ≤{config.MODEL_WATCH_SECONDS}s "
+          f"(MODEL_WATCH_SECONDS) tanpa restart")
+
+def main():
+    parser = argparse.ArgumentParser(description="Registry versi model (models/registry.json) untuk hot-swap")
+    sub = parser.add_subparsers(dest='cmd', required=True)
+
+    sub.add_parser('list', help="Tampilkan semua versi & versi aktif")
+
+    p_reg = sub.add_parser('register', help="Salin model hasil training sebagai versi baru")
+    p_reg.add_argument('--head', required=True, choices=HEADS)
+    p_reg.add_argument('--src', help="Folder model HF atau file .pt student (default: output 02/04/15)")
+    p_reg.add_argument('--student', action='store_true', help="Daftarkan student hasil 15_distill_student.py")
+    p_reg.add_argument('--version', help="Nama versi (default: v<tanggal-jam>)")
+    p_reg.add_argument('--note', default='')
+    p_reg.add_argument('--activate', action='store_true', help="Langsung jadikan versi aktif")
+
+    p_act = sub.add_parser('activate', help="Ganti versi aktif (juga untuk rollback)")
+    p_act.add_argument('--head', required=True, choices=HEADS)
+    p_act.add_argument('--version', required=True)
+
+    args = parser.parse_args()
+    registry = ModelRegistry(config.MODELS_DIR)
+    {'list': cmd_list, 'register': cmd_register, 'activate': cmd_activate}[args.cmd](registry, args)
+
+if __name__ == "__main__":
+    main()
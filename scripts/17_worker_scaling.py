@@ -0,0 +1,151 @@
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import subprocess
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import requests
+
+# --- KONFIGURASI ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from utils.bmkg_replay import ReplayServer
+
+DATA_PATH = os.path.join(BASE_DIR, 'data', 'raw', 'arsip_scraping_lengkap.csv')
+RESULT_JSON = os.path.join(BASE_DIR, 'data', 'benchmarks', 'worker_scaling.json')
+
+# ==========================================
+# 1. MEMORI PROSES (RSS vs PSS)
+# ==========================================
+# RSS menghitung halaman shared berkali-kali (sekali per worker); PSS membaginya rata -> total PSS = memori riil
+def process_tree(pid):
+    pids = [pid]
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            pids += [int(p) for p in f.read().split()]
+    except OSError:
+        pass
+    return pids
+
+def memory_mb(pids):
+    total = {"rss_mb": 0.0, "pss_mb": 0.0, "uss_mb": 0.0}
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/smaps_rollup") as f:
+                fields = {line.split(':')[0]: int(line.split()[1]) for line in f if line.split()[-1] == 'kB'}
+        except OSError:
+            continue
+        total["rss_mb"] += fields.get('Rss', 0) / 1024
+        total["pss_mb"] += fields.get('Pss', 0) / 1024
+        total["uss_mb"] += (fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)) / 1024
+    return {k: round(v, 1) for k, v in total.items()}
+
+# ==========================================
+# 2. SPAWN GUNICORN & LOAD /analyze
+# ==========================================
+def spawn(workers, threads, preload, port, bmkg_url, boot_timeout):
+    env = dict(os.environ, GUNICORN_PRELOAD='1' if preload else '0', INGEST_IN_APP='0',
+               BMKG_DATA_BASE_URL=bmkg_url, BMKG_API_BASE_URL=bmkg_url, BMKG_WEB_BASE_URL=bmkg_url)
+    cmd = ['gunicorn', '-c', 'gunicorn.conf.py', '-w', str(workers), '--threads', str(threads),
+           '-b', f"127.0.0.1:{port}", 'app:app']
+    proc = subprocess.Popen(cmd, cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    target = f"http://127.0.0.1:{port}"
+    for _ in range(boot_timeout):
+        try:
+            # Siap = semua worker sudah fork & menjawab
+            if (requests.get(target + '/model_info', timeout=2).status_code == 200
+                    and len(process_tree(proc.pid)) == workers + 1):
+                return proc, target
+        except requests.RequestException:
+            pass
+        time.sleep(1)
+    proc.terminate()
+    raise RuntimeError("gunicorn tidak siap dalam batas waktu boot")
+
+def drive(target, texts, concurrency, duration):
+    latencies, errors, lock = [], [0], threading.Lock()
+    deadline = time.time() + duration
+
+    def client(seed):
+        rng = np.random.default_rng(seed)
+        session = requests.Session()
+        local, err = [], 0
+        while time.time() < deadline:
+            start = time.perf_counter()
+            try:
+                ok = session.post(target + '/analyze', json={"text": texts[rng.integers(len(texts))]},
+                                  timeout=60).status_code == 200
+            except requests.RequestException:
+                ok = False
+            local.append(time.perf_counter() - start)
+            err += not ok
+        with lock:
+            latencies.extend(local)
+            errors[0] += err
+
+    clients = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    for t in clients: t.start()
+    for t in clients: t.join()
+    lat = np.array(latencies) * 1000
+    return {"requests": len(lat), "errors": errors[0], "rps": round(len(lat) / duration, 2),
+            "p50_ms": round(float(np.percentile(lat, 50)), 1), "p95_ms": round(float(np.percentile(lat, 95)), 1)}
+
+def measure(workers, preload, args, texts, bmkg_url):
+    proc, target = spawn(workers, args.threads, preload, args.port, bmkg_url, args.boot_timeout)
+    try:
+        idle = memory_mb(process_tree(proc.pid))
+        load = drive(target, texts, workers * args.threads, args.duration)
+        # Memori setelah trafik: halaman yang tersentuh tulis (COW pecah) sudah jadi milik worker
+        after = memory_mb(process_tree(proc.pid))
+    finally:
+        proc.terminate()
+        proc.wait(timeout=60)
+    return {"workers": workers, "preload": preload, "idle": idle, "after_load": after, **load}
+
+def main():
+    parser = argparse.ArgumentParser(description="RSS/PSS & throughput /analyze untuk 1..N worker gunicorn")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--threads', type=int, default=4, help="Thread gunicorn per worker")
+    parser.add_argument('--duration', type=int, default=30, help="Detik load per konfigurasi")
+    parser.add_argument('--port', type=int, default=8011)
+    parser.add_argument('--boot-timeout', type=int, default=300)
+    parser.add_argument('--no-baseline', action='store_true', help="Lewati pembanding tanpa preload")
+    parser.add_argument('--out', default=RESULT_JSON)
+    args = parser.parse_args()
+
+    texts = pd.read_csv(DATA_PATH).dropna(subset=['Komentar'])['Komentar'].astype(str).tolist()
+    server = ReplayServer(latency_ms=20).start()  # Poller live feed tidak menyentuh BMKG asli
+    modes = [True] if args.no_baseline else [False, True]
+    rows = []
+    try:
+        for preload in modes:
+            for n in args.workers:
+                print(f"🦄 {n} worker | preload={'ya' if preload else 'tidak'} ...")
+                row = measure(n, preload, args, texts, server.base_url)
+                rows.append(row)
+                print(f"   RSS {row['after_load']['rss_mb']} MB | PSS {row['after_load']['pss_mb']} MB | "
+                      f"{row['rps']} RPS | p95 {row['p95_ms']} ms | error {row['errors']}")
+    finally:
+        server.stop()
+
+    report = {"meta": {"timestamp": datetime.now().isoformat(), "cores": os.cpu_count(),
+                       "threads_per_worker": args.threads, "duration_s": args.duration},
+              "results": rows}
+    os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=4)
+
+    print(f"\n{'Worker':>6} {'Preload':>8} {'RSS MB':>9} {'PSS MB':>9} {'RPS':>8} {'p95 ms':>9}")
+    for r in rows:
+        print(f"{r['workers']:>6} {'ya' if r['preload'] else 'tidak':>8} {r['after_load']['rss_mb']:>9} "
+              f"{r['after_load']['pss_mb']:>9} {r['rps']:>8} {r['p95_ms']:>9}")
+    print(f"✅ Hasil tersimpan: {args.out}")
+
+if __name__ == "__main__":
+    main()
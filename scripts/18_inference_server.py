@@ -0,0 +1,59 @@
+import os
+import sys
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# --- KONFIGURASI ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+import config
+from utils.inference_rpc import InferenceServer, local_model_handler
+from utils.metrics import REGISTRY
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Metrik Prometheus proses inference (batch lintas client, antrean, latensi tahap model)"""
+    def do_GET(self):
+        body = REGISTRY.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def main():
+    parser = argparse.ArgumentParser(description="Inference server IndoBERT (IPC biner) untuk web worker app.py")
+    parser.add_argument('--listen', default=config.INFERENCE_LISTEN, help="unix:/path.sock atau host:port")
+    parser.add_argument('--max-batch', type=int, default=config.INFERENCE_MAX_BATCH)
+    parser.add_argument('--max-wait-ms', type=float, default=config.INFERENCE_MAX_WAIT_MS)
+    parser.add_argument('--threads', type=int, default=0, help="Thread torch (0 = default torch)")
+    parser.add_argument('--metrics-port', type=int, default=0, help="Port HTTP /metrics (0 = nonaktif)")
+    args = parser.parse_args()
+
+    if args.threads:
+        import torch
+        torch.set_num_threads(args.threads)
+
+    handler = local_model_handler(config)
+    if config.MODEL_WATCH_SECONDS > 0:
+        handler.watch_registry(config.MODEL_WATCH_SECONDS)
+
+    if args.metrics_port:
+        metrics_server = ThreadingHTTPServer(('0.0.0.0', args.metrics_port), MetricsHandler)
+        threading.Thread(target=metrics_server.serve_forever, daemon=True).start()
+        print(f"📈 Metrik: http://0.0.0.0:{args.metrics_port}/metrics")
+
+    server = InferenceServer(handler, args.listen, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
+    print(f"🧠 Inference server: {args.listen} (batch ≤{args.max_batch}, jendela {args.max_wait_ms} ms)")
+    print(f"   Jalankan web dengan: INFERENCE_SERVER={args.listen} gunicorn -c gunicorn.conf.py app:app")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Inference server berhenti")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# --- KONFIGURASI ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+import config
+from utils.review_ingest import load_labeled_archive
+from utils.search_index import SearchIndex
+
+CHUNK = 50000
+
+BENCH_QUERIES = [
+    {"q": "notifikasi gempa telat"},
+    {"q": "aplikasi lemot", "sentimen": "Negatif"},
+    {"q": "radar cuaca", "aspek": "Performa", "date_from": "2025-01-01"},
+    {"q": "", "kategori": "Force Close / Crash", "bintang": [1, 2]},
+    {"q": "tidak akurat", "emosi": "Marah", "bintang": [1]},
+]
+
+def bench(index, repeats):
+    """Latensi search() per query (ms) pada index yang baru dibangun"""
+    print(f"\n⏱️  Benchmark search ({index.n_docs:,} dokumen)")
+    for params in BENCH_QUERIES:
+        params = dict(params)
+        q = params.pop('q')
+        latencies = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            result = index.search(q, top=20, **params)
+            latencies.append((time.perf_counter() - start) * 1000)
+        print(f"   {q or '(filter saja)':<24} {params} -> {result['total']:>7} hasil | "
+              f"p50 {np.percentile(latencies, 50):.2f} ms | p95 {np.percentile(latencies, 95):.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Bangun ulang index BM25 review (postings + kolom filter, mmap)")
+    parser.add_argument('--out', default=config.SEARCH_INDEX_DIR)
+    parser.add_argument('--scale', type=int, default=1, help="Replikasi arsip N kali (uji skala, jangan untuk produksi)")
+    parser.add_argument('--bench', action='store_true', help="Ukur latensi query setelah build")
+    parser.add_argument('--repeats', type=int, default=50)
+    args = parser.parse_args()
+
+    print("🔎 BUILDING SEARCH INDEX...")
+    df = load_labeled_archive(config.RAW_CSV, config.ABSA_CSV, config.EMOTION_CSV, config.LIVE_LABELED_CSV)
+    if args.scale > 1:
+        df = pd.concat([df] * args.scale, ignore_index=True)
+    print(f"   Loaded {len(df):,} reviews.")
+
+    start = time.perf_counter()
+    index = SearchIndex()
+    records = df.to_dict('records')
+    for i in range(0, len(records), CHUNK):
+        index.add_records(records[i:i + CHUNK])
+    index.save(args.out)
+    print(f"   Index: {index.n_docs:,} dokumen | {len(index.vocab):,} term | {len(index.post_docs):,} postings | "
+          f"{time.perf_counter() - start:.1f} s")
+
+    size = sum(os.path.getsize(os.path.join(args.out, f)) for f in os.listdir(args.out))
+    print(f"✅ Search Index Saved to: {args.out} ({size / 1024 / 1024:.1f} MB)")
+
+    if args.bench:
+        bench(SearchIndex.load(args.out), args.repeats)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+# --- KONFIGURASI ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+import config
+from utils.model_handler import ModelHandler
+from utils.review_ingest import load_labeled_archive, review_key
+from utils.embedding_store import EmbeddingStore
+
+CHUNK = 1024  # Review per append (progress tersimpan; build terputus cukup dijalankan ulang)
+
+def bench(store, queries, repeats, nprobe):
+    """Latensi & recall@20 IVF dibanding scan penuh (baris arsip acak sebagai query)"""
+    print(f"\n⏱️  Benchmark similar ({store.n:,} embedding, IVF {'aktif' if store.centroids is not None else 'tidak ada'})")
+    rows = np.random.default_rng(0).choice(store.n, size=min(queries, store.n), replace=False)
+    for exact in (True, False):
+        if not exact and store.centroids is None:
+            break
+        latencies, recalls = [], []
+        for row in rows:
+            vector = store.vector(row)
+            for _ in range(repeats):
+                start = time.perf_counter()
+                result = store.search(vector, top=20, nprobe=nprobe, exclude=row, exact=exact)
+                latencies.append((time.perf_counter() - start) * 1000)
+            if not exact:
+                truth = {r['id'] for r in store.search(vector, top=20, exclude=row, exact=True)}
+                recalls.append(len(truth & {r['id'] for r in result}) / max(len(truth), 1))
+        label = "Scan penuh" if exact else f"IVF nprobe={nprobe}"
+        recall = f" | recall@20 {np.mean(recalls):.3f}" if recalls else ""
+        print(f"   {label:<16} p50 {np.percentile(latencies, 50):.2f} ms | p95 {np.percentile(latencies, 95):.2f} ms{recall}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding IndoBERT seluruh arsip (append-only) + index IVF keluhan serupa")
+    parser.add_argument('--out', default=config.SIMILAR_INDEX_DIR)
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--rebuild', action='store_true', help="Hapus embedding lama (wajib jika versi model aspek berganti)")
+    parser.add_argument('--ivf', action='store_true', help="Paksa latih ulang index IVF")
+    parser.add_argument('--nlist', type=int, default=None, help="Jumlah cluster IVF (default sqrt(n))")
+    parser.add_argument('--bench', action='store_true', help="Ukur latensi & recall setelah build")
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    print("🧬 BUILDING REVIEW EMBEDDINGS...")
+    store = EmbeddingStore.load(args.out)
+    handler = ModelHandler(backend=config.MODEL_BACKEND, student_dir=config.STUDENT_MODEL_DIR)
+    version = handler.embedding_version()
+    if store.n and store.model_version != version:
+        if not args.rebuild:
+            print(f"❌ Store berisi embedding versi {store.model_version}, encoder aktif {version}. Jalankan dengan --rebuild.")
+            return
+    if args.rebuild:
+        store.clear()
+    print(f"   Encoder: versi {version} | tersimpan: {store.n:,} embedding")
+
+    # 1. Hanya review yang belum punya embedding (arsip + live, kunci Komentar|Tanggal)
+    df = load_labeled_archive(config.RAW_CSV, config.ABSA_CSV, config.EMOTION_CSV, config.LIVE_LABELED_CSV)
+    keys = df.apply(lambda r: review_key(r['Komentar'], r['Tanggal']), axis=1)
+    done = {review_key(r['Komentar'], r['Tanggal']) for r in store.reviews()}
+    todo = df[~keys.isin(done) & ~keys.duplicated()]
+    print(f"   Arsip: {len(df):,} review | baru: {len(todo):,}")
+
+    # 2. Embedding per chunk -> append (float16)
+    start = time.perf_counter()
+    records = todo.to_dict('records')
+    for i in range(0, len(records), CHUNK):
+        chunk = records[i:i + CHUNK]
+        version, vectors = handler.embed_batch([r['Komentar'] for r in chunk], batch_size=args.batch_size)
+        store.append(chunk, vectors, version)
+        done_n = i + len(chunk)
+        elapsed = time.perf_counter() - start
+        print(f"   {done_n:,}/{len(records):,} | {done_n / elapsed:.0f} review/s", end='\r')
+    if records:
+        print(f"\n   Embedding selesai: {time.perf_counter() - start:.1f} s")
+
+    # 3. Index IVF (hanya jika store besar; di bawah EXACT_BELOW scan penuh sudah cukup cepat)
+    if args.ivf or store.needs_ivf():
+        start = time.perf_counter()
+        nlist = store.build_ivf(nlist=args.nlist)
+        print(f"   IVF: {nlist} cluster untuk {store.n_indexed:,} embedding | {time.perf_counter() - start:.1f} s")
+    print(f"✅ Embeddings Saved to: {args.out} ({store.n:,} x {store.dim}, {store.size_bytes() / 1024 / 1024:.1f} MB)")
+
+    if args.bench and store.n:
+        bench(store, args.queries, args.repeats, config.SIMILAR_NPROBE)
+
+if __name__ == "__main__":
+    main()
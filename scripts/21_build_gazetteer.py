@@ -0,0 +1,114 @@
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# --- KONFIGURASI ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+import config
+from utils.gazetteer import Gazetteer, build_gazetteer
+from utils.bmkg_api import BMKGHandler
+
+def enrich_from_bmkg(frame):
+    """Nama & koordinat resmi per adm4 dari blok 'lokasi' respons prakiraan cuaca BMKG (butuh koneksi)"""
+    handler = BMKGHandler(data_base_url=config.BMKG_DATA_BASE_URL, api_base_url=config.BMKG_API_BASE_URL,
+                          web_base_url=config.BMKG_WEB_BASE_URL)
+    frame = frame.copy()
+    fixed = 0
+    for i, kode in frame.loc[frame['kode'].str.len() == 13, 'kode'].items():
+        try:
+            loc = handler._get('prakiraan_cuaca', f"{handler.url_weather}?adm4={kode}", timeout=5).json()['lokasi']
+        except Exception as e:
+            print(f"   ⚠️ {kode}: {e}")
+            continue
+        frame.loc[i, ['nama', 'lat', 'lon']] = [loc['desa'], float(loc['lat']), float(loc['lon'])]
+        for width, field in ((8, 'kecamatan'), (5, 'kotkab'), (2, 'provinsi')):
+            parent = frame['kode'] == kode[:width]
+            if parent.any():
+                frame.loc[parent, 'nama'] = loc[field]
+            else:
+                frame.loc[len(frame)] = [kode[:width], loc[field], np.nan, np.nan]
+        fixed += 1
+    print(f"   BMKG: {fixed} adm4 diperbarui dari API")
+    return frame
+
+def synthetic_frame(n, seed=0):
+    """Wilayah sintetis seukuran data nasional (34 provinsi, ~500 kotkab, ~7k kecamatan, n desa) untuk benchmark"""
+    rng = np.random.default_rng(seed)
+    syllables = ['su', 'ka', 'ma', 'ju', 'ba', 'ru', 'ja', 'ya', 'si', 'di', 'lo', 'ta', 'ra', 'wa', 'ti', 'ng', 'an', 'pu']
+    word = lambda: ''.join(rng.choice(syllables, size=rng.integers(2, 4))).title()
+    rows = []
+    per_kec = max(n // 7000, 1)
+    for i in range(n):
+        p, k, c, d = 11 + i // (n // 34 + 1), 1 + (i // (n // 500 + 1)) % 99, 1 + (i // per_kec) % 99, 1001 + i % per_kec
+        rows.append((f"{p:02d}.{k:02d}.{c:02d}.{d:04d}", f"{word()} {word()}" if i % 3 else word(),
+                     rng.uniform(-11, 6), rng.uniform(95, 141)))
+    frame = pd.DataFrame(rows, columns=['kode', 'nama', 'lat', 'lon'])
+    parents = [(code, f"Wilayah {code}") for width in (8, 5, 2) for code in frame['kode'].str[:width].unique()]
+    return pd.concat([frame, pd.DataFrame(parents, columns=['kode', 'nama'])], ignore_index=True)
+
+def bench(gazetteer, queries):
+    """Latensi lookup koordinat (KD-tree) & nama (searchsorted) setelah struktur siap"""
+    rng = np.random.default_rng(1)
+    start = time.perf_counter()
+    gazetteer.nearest(-6.2, 106.8)
+    print(f"\n⏱️  Benchmark gazetteer ({len(gazetteer):,} adm4) | build KD-tree (malas): {(time.perf_counter() - start) * 1000:.1f} ms")
+    points = np.column_stack([rng.uniform(-11, 6, queries), rng.uniform(95, 141, queries)])
+    latencies = []
+    for lat, lon in points:
+        start = time.perf_counter()
+        gazetteer.nearest(lat, lon)
+        latencies.append((time.perf_counter() - start) * 1e6)
+    print(f"   Koordinat -> adm4 : p50 {np.percentile(latencies, 50):.0f} µs | p95 {np.percentile(latencies, 95):.0f} µs")
+
+    rows = rng.integers(0, len(gazetteer), queries)
+    texts = [f"cuaca di {gazetteer.place(row)['desa']} besok" for row in rows]
+    latencies = []
+    for text in texts:
+        start = time.perf_counter()
+        gazetteer.resolve(text)
+        latencies.append((time.perf_counter() - start) * 1e6)
+    print(f"   Teks -> adm4      : p50 {np.percentile(latencies, 50):.0f} µs | p95 {np.percentile(latencies, 95):.0f} µs")
+
+def main():
+    parser = argparse.ArgumentParser(description="Gazetteer adm4 (kode, nama, koordinat) + index nama & KD-tree")
+    parser.add_argument('--source', default=config.GAZETTEER_SOURCE,
+                        help="CSV wilayah berjenjang kolom kode,nama,lat,lon (mis. ekspor data wilayah Kemendagri)")
+    parser.add_argument('--out', default=config.GAZETTEER_DIR)
+    parser.add_argument('--from-bmkg', action='store_true', help="Perbarui nama & koordinat adm4 dari API prakiraan BMKG")
+    parser.add_argument('--bench', action='store_true')
+    parser.add_argument('--synthetic', type=int, default=0, help="Benchmark dengan N desa sintetis (tidak menimpa --out)")
+    parser.add_argument('--queries', type=int, default=2000)
+    args = parser.parse_args()
+
+    print("🗺️ BUILDING ADM4 GAZETTEER...")
+    if args.synthetic:
+        frame, out = synthetic_frame(args.synthetic), tempfile.mkdtemp(prefix='gazetteer_')
+    else:
+        frame, out = pd.read_csv(args.source, dtype={'kode': str}), args.out
+        if args.from_bmkg:
+            frame = enrich_from_bmkg(frame)
+            frame.to_csv(args.source, index=False)
+
+    start = time.perf_counter()
+    places, names = build_gazetteer(frame, out)
+    size = sum(os.path.getsize(os.path.join(out, f)) for f in os.listdir(out))
+    print(f"✅ Gazetteer Saved to: {out} ({places:,} adm4, {names:,} nama, {size / 1024:.0f} KB, {time.perf_counter() - start:.1f} s)")
+
+    if args.bench or args.synthetic:
+        start = time.perf_counter()
+        gazetteer = Gazetteer.load(out)
+        print(f"   Load (mmap): {(time.perf_counter() - start) * 1000:.2f} ms")
+        bench(gazetteer, args.queries)
+    if args.synthetic:
+        shutil.rmtree(out)
+
+if __name__ == "__main__":
+    main()
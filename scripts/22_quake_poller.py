@@ -0,0 +1,95 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+import numpy as np
+
+# --- KONFIGURASI ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+import config
+from utils.bmkg_api import BMKGHandler
+from utils.quake_history import QuakeHistory, quake_listener, STATS_TTL
+
+def synthetic_quakes(n, years=10, seed=0):
+    """Event sintetis tersebar di wilayah Indonesia selama `years` tahun (format dict BMKGHandler)"""
+    rng = np.random.default_rng(seed)
+    end = int(time.time())
+    stamps = np.sort(rng.integers(end - years * 365 * 86400, end, n))
+    lats, lons = rng.uniform(-11, 6, n), rng.uniform(95, 141, n)
+    mags = np.round(np.clip(rng.exponential(0.6, n) + 2.5, 2.5, 9.0), 1)
+    for ts, lat, lon, mag in zip(stamps, lats, lons, mags):
+        yield {"datetime": time.strftime('%Y-%m-%dT%H:%M:%S+00:00', time.gmtime(int(ts))),
+               "koordinat": f"{lat:.4f},{lon:.4f}", "magnitudo": f"{mag:.1f}", "kedalaman": "10 km",
+               "wilayah": "Sintetis", "potensi": "Tidak berpotensi tsunami"}
+
+def bench(n, queries):
+    """Isi arsip sementara dengan n event, ukur latensi query /api/quakes yang umum"""
+    path = os.path.join(tempfile.mkdtemp(prefix='quakes_'), 'bench.sqlite')
+    history = QuakeHistory(path)
+    start = time.perf_counter()
+    batch = []
+    for q in synthetic_quakes(n):
+        batch.append(q)
+        if len(batch) == 10000:
+            history.add(batch)
+            batch = []
+    history.add(batch)
+    print(f"\n⏱️  Benchmark arsip gempa: {n:,} event, isi {time.perf_counter() - start:.1f} s, {os.path.getsize(path) / 1024 / 1024:.0f} MB")
+
+    start = time.perf_counter()
+    history.plan()
+    print(f"   Statistik planner: {(time.perf_counter() - start) * 1000:.0f} ms (di-cache {STATS_TTL} s)")
+    now = int(time.time())
+    cases = {
+        "Jawa, 30 hari, M>=4": dict(bbox=(105, -9, 115, -5), since=now - 30 * 86400, min_mag=4.0),
+        "Jawa, semua waktu": dict(bbox=(105, -9, 115, -5)),
+        "Nasional, M>=6": dict(min_mag=6.0),
+        "Nasional, 7 hari": dict(since=now - 7 * 86400),
+        "Sulawesi, 1 tahun, M>=5": dict(bbox=(118, -6, 126, 2), since=now - 365 * 86400, min_mag=5.0),
+        "Jakarta (0.1 derajat)": dict(bbox=(106.8, -6.2, 106.9, -6.1)),
+    }
+    for label, kwargs in cases.items():
+        latencies = []
+        for _ in range(queries):
+            start = time.perf_counter()
+            rows = history.query(limit=100, **kwargs)
+            latencies.append((time.perf_counter() - start) * 1000)
+        print(f"   {label:<26} [{history.plan(**kwargs):<5}] {len(rows):>3} hasil | p50 {np.percentile(latencies, 50):.2f} ms | p95 {np.percentile(latencies, 95):.2f} ms")
+    os.remove(path)
+
+def main():
+    parser = argparse.ArgumentParser(description="Poller arsip gempa BMKG (autogempa + gempaterkini -> SQLite + R-tree)")
+    parser.add_argument('--db', default=config.QUAKE_DB_PATH)
+    parser.add_argument('--once', action='store_true', help="Jalankan 1 siklus lalu keluar")
+    parser.add_argument('--interval', type=int, default=config.LIVE_FEED_POLL_SECONDS, help="Jeda polling (detik)")
+    parser.add_argument('--bench', type=int, default=0, help="Benchmark query dengan N event sintetis (tidak menyentuh --db)")
+    parser.add_argument('--queries', type=int, default=50)
+    args = parser.parse_args()
+
+    if args.bench:
+        bench(args.bench, args.queries)
+        return
+
+    print("🌋 QUAKE HISTORY POLLER")
+    history = QuakeHistory(args.db)
+    print(f"📂 Arsip: {history.stats()['events']} event ({args.db})")
+    handler = BMKGHandler(data_base_url=config.BMKG_DATA_BASE_URL, api_base_url=config.BMKG_API_BASE_URL,
+                          web_base_url=config.BMKG_WEB_BASE_URL)
+    on_poll = quake_listener(history)
+    while True:
+        on_poll(handler.get_latest_quake(), handler.get_recent_quakes())
+        if args.once:
+            print(f"✅ Selesai | {history.stats()['events']} event tersimpan")
+            return
+        try:
+            time.sleep(args.interval)
+        except KeyboardInterrupt:
+            print(f"\n🛑 Poller dihentikan | {history.stats()['events']} event tersimpan")
+            return
+
+if __name__ == "__main__":
+    main()
@@ -4,8 +4,11 @@
 
 import pandas as pd
 import os
+import sys
 from gensim.models import Word2Vec
-from gensim.utils import simple_preprocess
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.preprocessing import tokenize_series
 
 # Path setup
 data_path = os.path.join('data', 'raw', 'arsip_scraping_lengkap.csv')
@@ -17,9 +20,9 @@ output_model = os.path.join(output_dir, 'word2vec.model')
 print('Loading CSV...')
 df = pd.read_csv(data_path)
 
-# Preprocess: ambil kolom komentar, tokenisasi
+# Preprocess: cleaning + normalisasi slang bersama (sama dengan query /api/word2vec)
 print('Preprocessing...')
-sentences = [simple_preprocess(str(text)) for text in df['Komentar'].dropna()]
+sentences = tokenize_series(df['Komentar'].dropna())
 
 # Train Word2Vec
 print('Training Word2Vec...')
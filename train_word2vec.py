@@ -1,18 +1,12 @@
 import pandas as pd
 from gensim.models import Word2Vec
-import re
+from utils.preprocessing import tokenize_series
 
 # 1. Load data (ganti path sesuai data Anda)
 df = pd.read_csv('data/raw/arsip_scraping_lengkap.csv')
-texts = df['Komentar'].astype(str).tolist()
 
-# 2. Preprocessing sederhana (tokenisasi)
-def simple_tokenize(text):
-    text = text.lower()
-    text = re.sub(r'[^a-zA-Z0-9\\s]', '', text)
-    return text.split()
-
-sentences = [simple_tokenize(t) for t in texts]
+# 2. Preprocessing bersama (cleaning + normalisasi slang, sama dengan query /api/word2vec)
+sentences = tokenize_series(df['Komentar'].dropna())
 
 # 3. Training Word2Vec
 model = Word2Vec(sentences, vector_size=100, window=5, min_count=2, workers=4, sg=1)
@@ -0,0 +1,123 @@
+"""
+Publikasi Artefak Data Statis (trends_data, data_map, bug_report, model_metrics, dst)
+Tulis JSON ringkas + varian gzip/brotli + manifest content-hash, lalu sajikan
+encoding terbaik dengan ETag kuat & cache jangka panjang.
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+
+from utils.metrics import CACHE_REQUESTS
+
+try:
+    import brotli  # Opsional: tanpa brotli hanya varian .gz yang dibuat
+except ImportError:
+    brotli = None
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static')
+MANIFEST_NAME = 'manifest.json'
+
+# Urutan preferensi encoding saat negosiasi Accept-Encoding
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+
+# ==========================================
+# 1. PUBLISH (DIPANGGIL DARI SCRIPT PIPELINE)
+# ==========================================
+def _write_atomic(path, payload):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+
+def publish_artifact(name, data, out_dir=STATIC_DIR):
+    """Simpan `data` sebagai static/<name> (JSON ringkas) + .gz/.br, lalu catat hash di manifest"""
+    raw = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    digest = hashlib.sha256(raw).hexdigest()[:16]
+    path = os.path.join(out_dir, name)
+
+    _write_atomic(path, raw)
+    # mtime=0 agar file .gz deterministik (hash/ETag tidak berubah jika isi sama)
+    _write_atomic(path + '.gz', gzip.compress(raw, compresslevel=9, mtime=0))
+    entry = {"hash": digest, "size": len(raw), "gzip": os.path.getsize(path + '.gz')}
+    if brotli:
+        _write_atomic(path + '.br', brotli.compress(raw, quality=11))
+        entry["br"] = os.path.getsize(path + '.br')
+    elif os.path.exists(path + '.br'):
+        os.remove(path + '.br')  # Jangan sajikan .br basi dari versi sebelumnya
+
+    manifest_path = os.path.join(out_dir, MANIFEST_NAME)
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    manifest[name] = entry
+    _write_atomic(manifest_path, json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+    return entry
+
+
+# ==========================================
+# 2. SERVE (DIPAKAI OLEH app.py)
+# ==========================================
+def choose_encoding(accept_encoding, entry):
+    """Pilih encoding terbaik yang diterima client & tersedia di manifest"""
+    accepted = {}
+    for part in (accept_encoding or '').split(','):
+        token, _, params = part.strip().partition(';')
+        q = 1.0
+        if params.strip().startswith('q='):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token.strip().lower()] = q
+    for enc, _ in ENCODINGS:
+        if enc in entry and accepted.get(enc, accepted.get('*', 0)) > 0:
+            return enc
+    return None
+
+
+class ArtifactStore:
+    """Cache byte artefak di memori; reload otomatis saat manifest berubah (pipeline publish ulang)"""
+    def __init__(self, static_dir=STATIC_DIR):
+        self.static_dir = static_dir
+        self.manifest_path = os.path.join(static_dir, MANIFEST_NAME)
+        self.manifest = {}
+        self._mtime = None
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        try:
+            mtime = os.path.getmtime(self.manifest_path)
+        except OSError:
+            return
+        if mtime != self._mtime:
+            with open(self.manifest_path) as f:
+                manifest = json.load(f)
+            with self._lock:
+                self.manifest, self._mtime, self._cache = manifest, mtime, {}
+
+    def entry(self, name):
+        self._refresh()
+        return self.manifest.get(name)
+
+    def url(self, name):
+        """URL versi-hash: bisa di-cache selamanya karena berubah tiap isi berubah"""
+        entry = self.entry(name)
+        return f"/data/{name}?v={entry['hash']}" if entry else f"/static/{name}"
+
+    def read(self, name, encoding):
+        key = (name, encoding)
+        payload = self._cache.get(key)
+        CACHE_REQUESTS.inc(cache='artifact', result='miss' if payload is None else 'hit')
+        if payload is None:
+            suffix = dict(ENCODINGS).get(encoding, '')
+            with open(os.path.join(self.static_dir, name + suffix), 'rb') as f:
+                payload = f.read()
+            with self._lock:
+                self._cache[key] = payload
+        return payload
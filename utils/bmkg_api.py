@@ -1,16 +1,28 @@
 import requests
 import json
 import xml.etree.ElementTree as ET
-from concurrent.futures import ThreadPoolExecutor
+import time
+import contextvars
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from utils.metrics import UPSTREAM_LATENCY, UPSTREAM_ERRORS, CACHE_REQUESTS
+from utils.forecast_store import ForecastStore
+from utils.upstream_guard import (CircuitBreaker, LatencyWindow, UpstreamUnavailable, SHORT_CIRCUITS, HEDGES, CLOSED,
+                                  remaining)
 
 class BMKGHandler:
-    def __init__(self):
+    def __init__(self, data_base_url="https://data.bmkg.go.id", api_base_url="https://api.bmkg.go.id",
+                 web_base_url="https://www.bmkg.go.id", breaker_failures=5, breaker_reset=30.0,
+                 hedge_percentile=95, connect_timeout=3.05):
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
-        self.url_gempa_latest = "https://data.bmkg.go.id/DataMKG/TEWS/autogempa.json"
-        self.url_gempa_list = "https://data.bmkg.go.id/DataMKG/TEWS/gempaterkini.json"
-        self.url_warning_rss = "https://www.bmkg.go.id/alerts/nowcast/id/rss.xml"
+        # Base URL bisa diarahkan ke server replay lokal (benchmark / load test)
+        self.url_tews = f"{data_base_url}/DataMKG/TEWS/"
+        self.url_gempa_latest = self.url_tews + "autogempa.json"
+        self.url_gempa_list = self.url_tews + "gempaterkini.json"
+        self.url_weather = f"{api_base_url}/publik/prakiraan-cuaca"
+        self.url_warning_rss = f"{web_base_url}/alerts/nowcast/id/rss.xml"
 
         # --- DAFTAR KOTA REPRESENTATIF SELURUH INDONESIA (MAJOR CITIES) ---
         # Kode adm4 diambil sampel dari wilayah ibukota provinsi/kota besar
@@ -60,87 +72,199 @@ class BMKGHandler:
             {"name": "Sorong", "code": "92.71.01.1001"},
             {"name": "Merauke", "code": "93.01.01.1001"}
         ]
+        # Semua time step tiap respons prakiraan (bukan hanya step pertama) -> /api/forecast tanpa fetch ulang
+        self.forecasts = ForecastStore()
+
+        # --- PELINDUNG UPSTREAM ---
+        # Host lambat/mati -> breaker OPEN -> call gagal instan & data baik terakhir disajikan (bukan thread tertahan timeout)
+        self.breaker_failures = breaker_failures
+        self.breaker_reset = breaker_reset
+        self.hedge_percentile = hedge_percentile
+        self.connect_timeout = connect_timeout
+        self.breakers = {}   # host -> CircuitBreaker
+        self.latency = {}    # feed -> LatencyWindow (delay hedge)
+        self.last_good = {}  # feed -> (waktu, hasil parse terakhir yang sukses)
+        self._hedge_pool = ThreadPoolExecutor(max_workers=32, thread_name_prefix='bmkg-hedge')
+
+    def _breaker(self, host):
+        breaker = self.breakers.get(host)
+        if breaker is None:
+            breaker = self.breakers.setdefault(host, CircuitBreaker(host, self.breaker_failures, self.breaker_reset))
+        return breaker
+
+    def _attempt(self, feed, url, deadline, breaker, budget_cut=False):
+        """1 requests.get (timeout = sisa waktu sampai deadline) + metrik latensi & error per feed + hasil ke breaker host.
+        budget_cut=True: timeout dipotong budget route di bawah timeout normal feed, jadi timeout bukan bukti host sakit"""
+        timeout = deadline - time.monotonic()
+        if timeout <= 0:
+            breaker.release()
+            raise UpstreamUnavailable(f"Waktu {feed} habis sebelum request dikirim")
+        start = time.perf_counter()
+        try:
+            r = requests.get(url, headers=self.headers, timeout=(min(self.connect_timeout, timeout), timeout))
+        except Exception as e:
+            UPSTREAM_ERRORS.inc(feed=feed, reason=type(e).__name__)
+            if budget_cut and isinstance(e, requests.Timeout):
+                breaker.release()
+            else:
+                breaker.record(False)
+            raise
+        finally:
+            UPSTREAM_LATENCY.observe(time.perf_counter() - start, feed=feed)
+        if r.status_code != 200:
+            UPSTREAM_ERRORS.inc(feed=feed, reason=f"http_{r.status_code}")
+        # 4xx = host sehat (request kita yang salah); 5xx / 429 = host bermasalah
+        healthy = r.status_code < 500 and r.status_code != 429
+        breaker.record(healthy)
+        if healthy:
+            self.latency.setdefault(feed, LatencyWindow()).add(time.perf_counter() - start)
+        return r
+
+    def _get(self, feed, url, timeout, hedge=False):
+        """GET lewat breaker host, timeout dipotong ke sisa budget route; hedge=True -> request cadangan
+        setelah latensi melewati persentil hedge_percentile feed tsb (hasil tercepat dipakai)"""
+        host = urlparse(url).netloc
+        left = remaining()
+        if left is not None and left <= 0:
+            SHORT_CIRCUITS.inc(host=host, reason='budget')
+            raise UpstreamUnavailable(f"Budget latensi habis sebelum {feed}")
+        breaker = self._breaker(host)
+        if not breaker.allow():
+            SHORT_CIRCUITS.inc(host=host, reason='open')
+            raise UpstreamUnavailable(f"Circuit breaker {host} OPEN")
+        budget_cut = left is not None and left < timeout
+        timeout = min(timeout, left) if budget_cut else timeout
+        deadline = time.monotonic() + timeout  # Utama & cadangan berbagi 1 tenggat: total tidak melebihi timeout
+        window = self.latency.get(feed)
+        delay = window.percentile(self.hedge_percentile) if hedge and window else None
+        if delay is None or delay >= timeout:
+            return self._attempt(feed, url, deadline, breaker, budget_cut)
+
+        # Request utama & cadangan di pool terpisah agar thread pemanggil bisa menunggu yang tercepat
+        submit = lambda: self._hedge_pool.submit(contextvars.copy_context().run, self._attempt, feed, url, deadline, breaker,
+                                                  budget_cut)
+        primary = submit()
+        done, _ = wait([primary], timeout=delay)
+        if done or breaker.state != CLOSED:
+            return primary.result()
+        HEDGES.inc(feed=feed, outcome='sent')
+        backup = submit()
+        pending = [primary, backup]
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None and future.result().status_code == 200:
+                    if future is backup:
+                        HEDGES.inc(feed=feed, outcome='won')
+                    return future.result()
+        return future.result()  # Keduanya gagal: error / respons terakhir diteruskan ke pemanggil
+
+    def _fresh(self, feed, data):
+        self.last_good[feed] = (time.time(), data)
+        return data
+
+    def _stale(self, feed, error):
+        """Data baik terakhir saat upstream gagal / breaker OPEN / budget habis (None jika belum pernah sukses)"""
+        if not isinstance(error, UpstreamUnavailable):
+            print(f"⚠️ BMKG {feed} Error: {error}")
+        cached = self.last_good.get(feed)
+        return cached[1] if cached else None
+
+    def status(self):
+        """State breaker per host + umur data baik terakhir & delay hedge per feed (monitoring)"""
+        now = time.time()
+        feeds = {}
+        for feed in set(self.last_good) | set(self.latency):
+            delay = self.latency[feed].percentile(self.hedge_percentile) if feed in self.latency else None
+            fetched = self.last_good.get(feed, (None,))[0]
+            feeds[feed] = {"last_good_age_seconds": round(now - fetched, 1) if fetched else None,
+                           "hedge_delay_ms": round(delay * 1000, 1) if delay is not None else None}
+        return {"breakers": [b.snapshot() for b in list(self.breakers.values())], "feeds": feeds}
 
     # --- 1. GEMPA BUMI ---
     def get_latest_quake(self):
         """Ambil 1 Gempa Terkini + Shakemap Image"""
         try:
-            r = requests.get(self.url_gempa_latest, headers=self.headers, timeout=10)
+            r = self._get('autogempa', self.url_gempa_latest, timeout=10)
             if r.status_code == 200:
                 g = r.json()['Infogempa']['gempa']
-                return {
+                return self._fresh('autogempa', {
                     "magnitudo": g['Magnitude'],
                     "kedalaman": g['Kedalaman'],
                     "koordinat": g['Coordinates'],
                     "wilayah": g['Wilayah'],
                     "jam": f"{g['Tanggal']} - {g['Jam']}",
+                    "datetime": g.get('DateTime'),
                     "potensi": g['Potensi'],
                     "dirasakan": g.get('Dirasakan', '-'),
-                    "shakemap": "https://data.bmkg.go.id/DataMKG/TEWS/" + g['Shakemap']
-                }
+                    "shakemap": self.url_tews + g['Shakemap']
+                })
+            raise ValueError(f"HTTP {r.status_code}")
         except Exception as e:
-            print(f"Error Latest Quake: {e}")
-        return None
+            return self._stale('autogempa', e)
 
     def get_recent_quakes(self):
         """Ambil 15 Gempa Terkini"""
         try:
-            r = requests.get(self.url_gempa_list, headers=self.headers, timeout=10)
+            r = self._get('gempaterkini', self.url_gempa_list, timeout=10)
             if r.status_code == 200:
-                return [{
+                return self._fresh('gempaterkini', [{
                     "magnitudo": g['Magnitude'], "kedalaman": g['Kedalaman'],
                     "wilayah": g['Wilayah'], "koordinat": g['Coordinates'],
-                    "jam": f"{g['Tanggal']} - {g['Jam']}", "potensi": g['Potensi']
-                } for g in r.json()['Infogempa']['gempa']]
-        except: return []
+                    "jam": f"{g['Tanggal']} - {g['Jam']}", "potensi": g['Potensi'],
+                    "datetime": g.get('DateTime'), "dirasakan": g.get('Dirasakan')
+                } for g in r.json()['Infogempa']['gempa']])
+            raise ValueError(f"HTTP {r.status_code}")
+        except Exception as e:
+            return self._stale('gempaterkini', e) or []
 
     # --- 2. CUACA (MULTI KOTA) ---
     def fetch_single_weather(self, city):
-        """Helper Cuaca Per Kota"""
+        """Helper Cuaca Per Kota: respons utuh masuk ForecastStore, dikembalikan ringkasan step saat ini.
+        Upstream gagal -> prakiraan terakhir di ForecastStore (None jika lokasi belum pernah di-fetch)"""
         try:
-            url = f"https://api.bmkg.go.id/publik/prakiraan-cuaca?adm4={city['code']}"
-            r = requests.get(url, headers=self.headers, timeout=5)
+            url = f"{self.url_weather}?adm4={city['code']}"
+            r = self._get('prakiraan_cuaca', url, timeout=5, hedge=True)
             if r.status_code == 200:
-                d = r.json()['data'][0]['cuaca'][0][0]
-                loc = r.json()['lokasi']
-                return {
-                    "kota": city['name'], 
-                    "provinsi": loc['provinsi'],
-                    "lat": loc['lat'], 
-                    "lon": loc['lon'],
-                    "desc": d['weather_desc'], 
-                    "suhu": d['t'],
-                    "humid": d['hu'], 
-                    "angin": d['ws'], 
-                    "angin_dir": d['wd'],
-                    "icon": d['image']
-                }
-        except Exception as e:
-            # print(f"⚠️ Weather Error ({city['name']}): {e}") # Silent error agar console bersih
-            return None
+                self.forecasts.ingest(city['code'], r.json())
+                self._fresh('prakiraan_cuaca', None)  # Data per lokasi ada di ForecastStore; di sini hanya waktu sukses
+        except Exception:
+            pass  # Silent error agar console bersih (33 kota per polling)
+        return self.forecasts.current(city['code'], name=city['name'])
+
+    def get_weather(self, code, name, max_age=600):
+        """Cuaca 1 adm4 mana pun; dari ForecastStore jika fetch terakhir belum lewat max_age detik"""
+        age = self.forecasts.age(code)
+        if age is not None and age < max_age:
+            CACHE_REQUESTS.inc(cache='forecast', result='hit')
+            return self.forecasts.current(code, name=name)
+        CACHE_REQUESTS.inc(cache='forecast', result='miss')
+        return self.fetch_single_weather({"name": name, "code": code})
 
     def get_all_weather(self):
         """Ambil Cuaca Multi-Kota (Parallel Processing)"""
-        # Gunakan max_workers=10 agar pengambilan 30+ kota lebih cepat
+        # Gunakan max_workers=10 agar pengambilan 30+ kota lebih cepat; copy_context -> budget route ikut ke thread worker
         with ThreadPoolExecutor(max_workers=10) as ex:
-            return [d for d in list(ex.map(self.fetch_single_weather, self.cities)) if d]
+            futures = [ex.submit(contextvars.copy_context().run, self.fetch_single_weather, c) for c in self.cities]
+            return [d for d in (f.result() for f in futures) if d]
 
     # --- 3. WARNING (PERINGATAN DINI) ---
     def get_weather_warning(self):
-        """Ambil Peringatan Dini Cuaca (RSS XML)"""
+        """Ambil Peringatan Dini Cuaca (RSS XML); [] = sukses tanpa peringatan, None = gagal & belum pernah sukses"""
         warnings = []
         try:
-            r = requests.get(self.url_warning_rss, headers=self.headers, timeout=10)
-            if r.status_code == 200:
-                root = ET.fromstring(r.content)
-                channel = root.find('channel')
-                for item in channel.findall('item')[:5]:
-                    warnings.append({
-                        "judul": item.find('title').text,
-                        "link": item.find('link').text,
-                        "waktu": item.find('pubDate').text,
-                        "deskripsi": item.find('description').text
-                    })
+            r = self._get('nowcast_rss', self.url_warning_rss, timeout=10)
+            if r.status_code != 200:
+                raise ValueError(f"HTTP {r.status_code}")
+            root = ET.fromstring(r.content)
+            channel = root.find('channel')
+            for item in channel.findall('item')[:5]:
+                warnings.append({
+                    "judul": item.find('title').text,
+                    "link": item.find('link').text,
+                    "waktu": item.find('pubDate').text,
+                    "deskripsi": item.find('description').text
+                })
+            return self._fresh('nowcast_rss', warnings)
         except Exception as e:
-            print(f"⚠️ Warning Feed Error: {e}")
-        return warnings
\ No newline at end of file
+            return self._stale('nowcast_rss', e)
\ No newline at end of file
@@ -0,0 +1,162 @@
+"""
+Server Stand-in BMKG Lokal (untuk benchmark & load test)
+Meniru endpoint autogempa.json, gempaterkini.json, prakiraan-cuaca & nowcast RSS
+dengan latensi & error rate yang bisa diatur, sehingga BMKGHandler bisa diukur tanpa menyentuh server asli.
+
+Jika `fixtures_dir` diisi, respons diambil dari rekaman asli (lihat scripts/13_load_test.py record):
+    autogempa.json, gempaterkini.json, nowcast_rss.xml,
+    prakiraan-cuaca/<adm4>.json (fallback prakiraan-cuaca/default.json)
+File yang tidak ada digantikan payload sintetis.
+"""
+import json
+import os
+import random
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+
+# ==========================================
+# 1. PAYLOAD SINTETIS (BENTUK SAMA DENGAN BMKG)
+# ==========================================
+def _quake(i):
+    return {
+        "Tanggal": "19 Okt 2026", "Jam": f"{10 + i % 12:02d}:{i % 60:02d}:00 WIB",
+        "DateTime": f"2026-10-19T{3 + i % 12:02d}:{i % 60:02d}:00+00:00",
+        "Coordinates": f"{-2.0 - i * 0.3:.2f},{100.0 + i * 1.7:.2f}",
+        "Lintang": f"{2.0 + i * 0.3:.2f} LS", "Bujur": f"{100.0 + i * 1.7:.2f} BT",
+        "Magnitude": f"{4.0 + (i % 20) / 10:.1f}", "Kedalaman": f"{10 + i * 5} km",
+        "Wilayah": f"Pusat gempa berada di laut {i + 10} km BaratDaya Kota Replay",
+        "Potensi": "Tidak berpotensi tsunami", "Dirasakan": "II Replay",
+        "Shakemap": f"replay{i}.mmi.jpg"
+    }
+
+
+def synthetic_autogempa():
+    return {"Infogempa": {"gempa": _quake(0)}}
+
+
+def synthetic_gempaterkini():
+    return {"Infogempa": {"gempa": [_quake(i) for i in range(15)]}}
+
+
+def synthetic_forecast(adm4):
+    steps = []
+    for day in range(3):
+        steps.append([{
+            "datetime": f"2026-10-{19 + day}T{h:02d}:00:00Z",
+            "local_datetime": f"2026-10-{19 + day} {h + 7:02d}:00:00",
+            "t": 24 + h % 8, "hu": 70 + h % 20, "ws": 3.5, "wd": "SE", "tcc": 50, "tp": 0.0,
+            "weather": 3, "weather_desc": "Berawan", "weather_desc_en": "Mostly Cloudy",
+            "image": "https://api-apps.bmkg.go.id/storage/icon/cuaca/berawan-am.svg"
+        } for h in range(0, 24, 3)])
+    lokasi = {"adm4": adm4, "provinsi": "Replay", "kotkab": "Kota Replay", "desa": "Replay",
+              "lat": -6.2, "lon": 106.8, "timezone": "Asia/Jakarta"}
+    return {"lokasi": lokasi, "data": [{"lokasi": lokasi, "cuaca": steps}]}
+
+
+def synthetic_rss():
+    items = "".join(
+        f"<item><title>Peringatan Dini Cuaca Replay {i}</title><link>https://www.bmkg.go.id/replay/{i}</link>"
+        f"<pubDate>Mon, 19 Oct 2026 0{i}:00:00 +0700</pubDate>"
+        f"<description>Hujan sedang-lebat disertai petir di wilayah replay {i}.</description></item>"
+        for i in range(5))
+    return f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>{items}</channel></rss>'.encode()
+
+
+# ==========================================
+# 2. HTTP SERVER
+# ==========================================
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256  # Default 5: koneksi paralel BMKGHandler/load test akan kena SYN retry 1 detik
+
+
+class ReplayServer:
+    def __init__(self, host='127.0.0.1', port=0, latency_ms=0, jitter_ms=0, error_rate=0.0,
+                 fixtures_dir=None, seed=None, tail_rate=0.0, tail_ms=0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.tail_rate = tail_rate  # Sebagian kecil request ekstra lambat (ekor latensi, mis. uji hedged request)
+        self.tail_ms = tail_ms
+        self.error_rate = error_rate
+        self.fixtures_dir = fixtures_dir
+        self.hits = 0
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self._fixture_cache = {}
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server.hits += 1
+                delay_ms = server.latency_ms + server._rng.uniform(0, server.jitter_ms)
+                if server._rng.random() < server.tail_rate:
+                    delay_ms += server.tail_ms
+                if server._rng.random() < server.error_rate:
+                    server.errors += 1
+                    status, body, ctype = 503, b'{"error": "injected"}', 'application/json'
+                else:
+                    status, body, ctype = server.respond(self.path)
+                if delay_ms:
+                    time.sleep(delay_ms / 1000)
+                try:
+                    self.send_response(status)
+                    self.send_header('Content-Type', ctype)
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # Client sudah menyerah (timeout / budget habis)
+
+        self.httpd = _HTTPServer((host, port), Handler)
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def fixture(self, *names):
+        """Byte fixture pertama yang ada (di-cache di memori), None jika tidak ada"""
+        if not self.fixtures_dir:
+            return None
+        for name in names:
+            if name not in self._fixture_cache:
+                path = os.path.join(self.fixtures_dir, name)
+                self._fixture_cache[name] = open(path, 'rb').read() if os.path.exists(path) else None
+            if self._fixture_cache[name] is not None:
+                return self._fixture_cache[name]
+        return None
+
+    def respond(self, raw_path):
+        """(status, body, content-type) untuk path request"""
+        url = urlparse(raw_path)
+        if url.path.endswith('/autogempa.json'):
+            body = self.fixture('autogempa.json') or json.dumps(synthetic_autogempa()).encode()
+            return 200, body, 'application/json'
+        if url.path.endswith('/gempaterkini.json'):
+            body = self.fixture('gempaterkini.json') or json.dumps(synthetic_gempaterkini()).encode()
+            return 200, body, 'application/json'
+        if url.path.endswith('/prakiraan-cuaca'):
+            adm4 = parse_qs(url.query).get('adm4', [''])[0]
+            body = (self.fixture(os.path.join('prakiraan-cuaca', f'{adm4}.json'),
+                                 os.path.join('prakiraan-cuaca', 'default.json'))
+                    or json.dumps(synthetic_forecast(adm4)).encode())
+            return 200, body, 'application/json'
+        if url.path.endswith('/rss.xml'):
+            return 200, self.fixture('nowcast_rss.xml') or synthetic_rss(), 'application/xml'
+        return 404, b'{"error": "not found"}', 'application/json'
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
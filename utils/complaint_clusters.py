@@ -0,0 +1,218 @@
+"""
+Klaster Keluhan Otomatis (melengkapi 12 kategori rule-based categorize_issue)
+- Vektor : HashingVectorizer unigram+bigram (dimensi tetap, tanpa kosakata yang tumbuh) x IDF dari hitungan
+           dokumen streaming, normalisasi L2
+- Klaster: MiniBatchKMeans.partial_fit per chunk review Negatif BARU (cursor = baris arsip berlabel yang sudah diproses,
+           sah selama hash isi bagian yang sudah dibaca tidak berubah)
+- Laporan: top term (peta bucket hash -> kata mayoritas), contoh review terdekat centroid, irisan dengan kategori rule-based
+Memori tetap berapa pun ukuran arsip: centroid k x n_features, df n_features, peta term <= n_features, contoh k x 2E.
+"""
+import hashlib
+import os
+import pickle
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+from sklearn.utils import murmurhash3_32
+
+from utils.issue_categories import categorize_issue
+from utils.preprocessing import clean_text
+from utils.term_index import STOPWORDS, MIN_TERM_LEN, DIGITS_RE
+
+BATCH_SIZE = 1024  # Mini-batch k-means; chunk baru dilewati beberapa kali (passes) dalam potongan seukuran ini
+HASH_BLOCK = 1 << 20
+
+
+def prefix_digest(path, size):
+    """SHA-1 `size` byte pertama file (bagian arsip yang sudah dibaca cursor)"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        while size > 0:
+            block = f.read(min(HASH_BLOCK, size))
+            if not block:
+                break
+            digest.update(block)
+            size -= len(block)
+    return digest.hexdigest()
+
+
+def complaint_tokens(text):
+    """Kata bermakna berurutan (urutan dipertahankan agar bigram tetap benar)"""
+    return [w for w in clean_text(text, slang=True).split()
+            if len(w) >= MIN_TERM_LEN and w not in STOPWORDS and not DIGITS_RE.match(w)]
+
+
+class ComplaintClusterer:
+    def __init__(self, n_clusters=20, n_features=2 ** 16, exemplars=5, passes=5, seed=42):
+        self.n_clusters = n_clusters
+        self.n_features = n_features
+        self.exemplars = exemplars
+        self.passes = passes
+        self.seed = seed
+        self.vectorizer = HashingVectorizer(n_features=n_features, alternate_sign=False, norm=None,
+                                            ngram_range=(1, 2), token_pattern=r'\S+', lowercase=False)
+        # reassignment_ratio=0: id klaster harus stabil antar update (hitungan, kategori & contoh terakumulasi per id)
+        self.kmeans = MiniBatchKMeans(n_clusters=n_clusters, batch_size=BATCH_SIZE, n_init=3,
+                                      reassignment_ratio=0.0, random_state=seed)
+        self.rng = np.random.default_rng(seed)
+        self.fitted = False
+        self.df = np.zeros(n_features, dtype=np.int64)
+        self.n_docs = 0
+        self.terms = {}        # bucket -> [term mayoritas, suara] (maks n_features entri)
+        self.counts = np.zeros(n_clusters, dtype=np.int64)
+        self.rules = [Counter() for _ in range(n_clusters)]  # Kategori rule-based per klaster (None = tidak tertangkap)
+        self.candidates = [[] for _ in range(n_clusters)]    # Teks calon contoh, maks 2 x exemplars per klaster
+        self.pending = []      # Review sebelum fit pertama (partial_fit butuh >= n_clusters sampel)
+        self.cursor = 0        # Baris arsip yang sudah dibaca
+        self.source_size = 0   # Ukuran file arsip saat pembacaan terakhir
+        self.source_hash = None  # prefix_digest(arsip, source_size): cursor hanya sah jika isi ini tidak berubah
+
+    # ==========================================
+    # 1. VEKTOR (HASHING + IDF STREAMING)
+    # ==========================================
+    def _bucket(self, term):
+        """Indeks kolom yang sama dengan HashingVectorizer (murmurhash3 seed 0, nilai absolut mod n_features)"""
+        return abs(murmurhash3_32(term, seed=0)) % self.n_features
+
+    def _vectorize(self, docs, counts=None):
+        """Dokumen (token dipisah spasi) -> TF-IDF L2 sparse; counts = hasil hashing yang sudah ada (tidak di-hash ulang)"""
+        X = self.vectorizer.transform(docs) if counts is None else counts
+        idf = np.log((1 + self.n_docs) / (1 + self.df)) + 1
+        return normalize(X.multiply(idf).tocsr())
+
+    def _observe(self, docs, counts):
+        """Update df & peta term dari dokumen baru (sebelum vektorisasi)"""
+        self.df += np.bincount(counts.indices, minlength=self.n_features)
+        self.n_docs += len(docs)
+        # Voting mayoritas Boyer-Moore per bucket: term yang mendominasi bucket menang atas tabrakan hash jarang
+        for doc in docs:
+            for term in set(self._grams(doc)):
+                slot = self.terms.setdefault(self._bucket(term), [term, 0])
+                if slot[0] == term:
+                    slot[1] += 1
+                elif slot[1]:
+                    slot[1] -= 1
+                else:
+                    slot[0], slot[1] = term, 1
+
+    @staticmethod
+    def _grams(doc):
+        words = doc.split()
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    # ==========================================
+    # 2. UPDATE STREAMING
+    # ==========================================
+    def partial_fit(self, texts):
+        """Review negatif mentah baru -> update IDF, centroid, hitungan & calon contoh per klaster"""
+        items = [(str(t), ' '.join(complaint_tokens(t))) for t in texts]
+        items = self.pending + [(text, doc) for text, doc in items if doc]
+        if not items or (len(items) < self.n_clusters and not self.fitted):
+            self.pending = items
+            return
+        self.pending = []
+        texts, docs = [text for text, _ in items], [doc for _, doc in items]
+
+        counts = self.vectorizer.transform(docs)
+        self._observe(docs, counts)
+        X = self._vectorize(docs, counts)
+        for _ in range(self.passes):
+            order = self.rng.permutation(X.shape[0])
+            for i in range(0, len(order), BATCH_SIZE):
+                batch = order[i:i + BATCH_SIZE]
+                if not self.fitted and len(batch) < self.n_clusters:
+                    batch = order[:max(self.n_clusters, BATCH_SIZE)]  # Inisialisasi k-means++ butuh >= k sampel
+                self.kmeans.partial_fit(X[batch])
+                self.fitted = True
+
+        labels = self.kmeans.predict(X)
+        self.counts += np.bincount(labels, minlength=self.n_clusters)
+        similarity = (X @ self.kmeans.cluster_centers_.T)[np.arange(X.shape[0]), labels]
+        for cluster in np.unique(labels):
+            members = np.flatnonzero(labels == cluster)
+            self.rules[cluster].update(categorize_issue(texts[i]) for i in members)
+            best = members[np.argsort(-similarity[members])[:self.exemplars]]
+            pool = list(dict.fromkeys(self.candidates[cluster] + [texts[i] for i in best]))
+            self.candidates[cluster] = self._closest(cluster, pool)[:2 * self.exemplars]
+
+    def _closest(self, cluster, texts):
+        """Urutkan teks berdasarkan kemiripan ke centroid SAAT INI (centroid bergeser tiap partial_fit)"""
+        if not texts:
+            return []
+        X = self._vectorize([' '.join(complaint_tokens(t)) for t in texts])
+        scores = X @ self.kmeans.cluster_centers_[cluster]
+        return [texts[i] for i in np.argsort(-scores, kind='stable')]
+
+    def update_from_csv(self, csv_path, chunksize=5000):
+        """Baca hanya baris arsip berlabel setelah cursor, per chunk (memori tetap) -> jumlah review negatif baru.
+        Bagian yang sudah dibaca berubah (01 menulis ulang seluruh file saat labeling ulang, ukuran bisa sama/lebih
+        besar) -> klaster dibangun dari awal; hanya file yang bertambah di ujung (append) yang dibaca inkremental."""
+        size = os.path.getsize(csv_path)
+        if self.cursor and (size < self.source_size or
+                            prefix_digest(csv_path, self.source_size) != getattr(self, 'source_hash', None)):
+            print("⚠️ Arsip berlabel ditulis ulang sejak pembacaan terakhir, klaster dibangun ulang dari awal")
+            self.__init__(self.n_clusters, self.n_features, self.exemplars, self.passes, self.seed)
+        new = 0
+        for chunk in pd.read_csv(csv_path, usecols=['Komentar', 'Sentimen'], chunksize=chunksize,
+                                 skiprows=range(1, self.cursor + 1)):
+            self.cursor += len(chunk)
+            negative = chunk[(chunk['Sentimen'] == 'Negatif') & chunk['Komentar'].notna()]
+            self.partial_fit(negative['Komentar'].tolist())
+            new += len(negative)
+        self.source_size = size
+        self.source_hash = prefix_digest(csv_path, size)
+        return new
+
+    # ==========================================
+    # 3. LAPORAN
+    # ==========================================
+    def report(self, top_terms=8):
+        """Klaster terurut jumlah review: label = 3 term teratas, contoh terdekat centroid, kategori rule dominan"""
+        if not self.fitted:
+            return []
+        clusters = []
+        for cluster in np.argsort(-self.counts):
+            count = int(self.counts[cluster])
+            if not count:
+                continue
+            center = self.kmeans.cluster_centers_[cluster]
+            buckets = [b for b in np.argsort(-center)[:top_terms * 2] if center[b] > 0 and b in self.terms]
+            terms = list(dict.fromkeys(self.terms[b][0] for b in buckets))[:top_terms]
+            rules = self.rules[cluster]
+            categorized = {k: v for k, v in rules.items() if k}
+            clusters.append({
+                "id": int(cluster),
+                "label": " / ".join(terms[:3]),
+                "count": count,
+                "top_terms": terms,
+                "exemplars": self._closest(cluster, self.candidates[cluster])[:self.exemplars],
+                "rule_category": max(categorized, key=categorized.get) if categorized else None,
+                "uncategorized_share": round(rules.get(None, 0) / max(sum(rules.values()), 1), 3)
+            })
+        return clusters
+
+    def memory_bytes(self):
+        centers = self.kmeans.cluster_centers_.nbytes if self.fitted else 0
+        return centers + self.df.nbytes
+
+    # --- PERSISTENSI ---
+    def save(self, path):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(self, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        """State tersimpan; baru jika belum ada atau parameter (jumlah klaster / dimensi) berubah"""
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                state = pickle.load(f)
+            if all(getattr(state, k) == v for k, v in kwargs.items()):
+                return state
+            print("⚠️ Parameter klaster berubah, state lama diabaikan (mulai dari awal arsip)")
+        return cls(**kwargs)
@@ -0,0 +1,273 @@
+"""
+Pencarian "Keluhan Serupa" (Embedding Kalimat IndoBERT + Index Nearest-Neighbour)
+File di SIMILAR_INDEX_DIR, semuanya append-only & dibaca via mmap:
+- vectors.f16   : matriks float16 n x dim, embedding ter-normalisasi L2 (cosine = dot product)
+- stars.u8      : Bintang per baris (filter)
+- reviews.jsonl : review per baris (ditampilkan di hasil; offset baris dipetakan saat load)
+- ivf.npz       : index IVF = centroid k-means + daftar baris per cluster. Baris >= n_indexed (delta) di-scan penuh
+- meta.json     : dim & versi encoder (embedding dari versi model lain tidak sebanding)
+1 penulis dalam satu waktu (scripts/20_build_embeddings.py ATAU worker ingest); proses lain cukup refresh().
+"""
+import json
+import os
+import shutil
+import threading
+from datetime import datetime
+
+import numpy as np
+
+VECTOR_FILE = 'vectors.f16'
+STARS_FILE = 'stars.u8'
+REVIEWS_FILE = 'reviews.jsonl'
+IVF_FILE = 'ivf.npz'
+META_FILE = 'meta.json'
+SCAN_CHUNK = 32768       # Baris per blok saat scan penuh (float16 -> float32 per blok, memori tetap)
+EXACT_BELOW = 20000      # Di bawah ini scan penuh sudah ~ms, IVF tidak dibangun
+IVF_REBUILD_RATIO = 0.2  # Latih ulang IVF jika delta > 20% baris ter-index
+
+
+def review_record(r):
+    """Field review yang disimpan per baris (label NaN -> null)"""
+    entry = {"Komentar": str(r['Komentar']), "Tanggal": str(r['Tanggal']), "Bintang": int(r['Bintang'])}
+    for key in ('Aspek_Terdeteksi', 'Emosi'):
+        value = r.get(key)
+        entry[key] = None if value is None or value != value else str(value)
+    return entry
+
+
+class EmbeddingStore:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self.meta = {}
+        self.n = 0
+        self.vectors = np.zeros((0, 0), dtype=np.float16)
+        self.stars = np.zeros(0, dtype=np.uint8)
+        self.line_offsets = np.zeros(1, dtype=np.int64)
+        self.centroids = None
+        self.list_offsets = None
+        self.list_rows = None
+        self.n_indexed = 0
+        self._ivf_mtime = None
+
+    @property
+    def dim(self):
+        return self.meta.get('dim', 0)
+
+    @property
+    def model_version(self):
+        return self.meta.get('model_version')
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    # ==========================================
+    # 1. MUAT / IKUTI APPEND PROSES LAIN
+    # ==========================================
+    def refresh(self):
+        """Petakan ulang jika file bertambah (append dari scripts/08 / 20) atau IVF dilatih ulang"""
+        with self._lock:
+            try:
+                with open(self._file(META_FILE), encoding='utf-8') as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                self._reset()
+                return
+            if meta.get('created') != self.meta.get('created'):  # Dibangun ulang (--rebuild)
+                self._reset()
+            self.meta = meta
+
+            # Baris review baru: offset dihitung dari posisi "\n" (vektor numpy, tanpa parse JSON)
+            start = self.line_offsets[-1]
+            if os.path.exists(self._file(REVIEWS_FILE)) and os.path.getsize(self._file(REVIEWS_FILE)) > start:
+                with open(self._file(REVIEWS_FILE), 'rb') as f:
+                    f.seek(start)
+                    tail = np.frombuffer(f.read(), dtype=np.uint8)
+                ends = start + np.flatnonzero(tail == 10) + 1
+                self.line_offsets = np.concatenate([self.line_offsets, ends])
+
+            # Baris lengkap = minimum ketiga file (append terpotong di tengah tidak ikut terbaca)
+            n_vectors = os.path.getsize(self._file(VECTOR_FILE)) // (2 * self.dim) if os.path.exists(self._file(VECTOR_FILE)) else 0
+            n_stars = os.path.getsize(self._file(STARS_FILE)) if os.path.exists(self._file(STARS_FILE)) else 0
+            n = min(n_vectors, n_stars, len(self.line_offsets) - 1)
+            if n != self.n:
+                self.n = n
+                self.vectors = (np.memmap(self._file(VECTOR_FILE), dtype=np.float16, mode='r', shape=(n, self.dim))
+                                if n else np.zeros((0, self.dim), dtype=np.float16))
+                self.stars = np.memmap(self._file(STARS_FILE), dtype=np.uint8, mode='r', shape=(n,)) if n else np.zeros(0, dtype=np.uint8)
+
+            ivf_mtime = os.path.getmtime(self._file(IVF_FILE)) if os.path.exists(self._file(IVF_FILE)) else None
+            if ivf_mtime != self._ivf_mtime:
+                self._ivf_mtime = ivf_mtime
+                self.centroids = self.list_offsets = self.list_rows = None
+                self.n_indexed = 0
+                if ivf_mtime is not None:
+                    with np.load(self._file(IVF_FILE)) as ivf:
+                        self.centroids = ivf['centroids']
+                        self.list_offsets = ivf['list_offsets']
+                        self.list_rows = ivf['list_rows']
+                    self.n_indexed = len(self.list_rows)
+
+    @classmethod
+    def load(cls, path):
+        """Store kosong jika belum dibangun (scripts/20_build_embeddings.py)"""
+        store = cls(path)
+        store.refresh()
+        return store
+
+    def clear(self):
+        """Hapus semua embedding (encoder berganti versi -> bangun ulang dari nol)"""
+        with self._lock:
+            shutil.rmtree(self.path, ignore_errors=True)
+            self._reset()
+
+    def review(self, row):
+        with open(self._file(REVIEWS_FILE), 'rb') as f:
+            f.seek(self.line_offsets[row])
+            return json.loads(f.readline())
+
+    def reviews(self):
+        """Iterasi semua review tersimpan (dedupe di script build)"""
+        if not self.n:
+            return
+        with open(self._file(REVIEWS_FILE), encoding='utf-8') as f:
+            for _, line in zip(range(self.n), f):
+                yield json.loads(line)
+
+    def vector(self, row):
+        return np.asarray(self.vectors[row], dtype=np.float32)
+
+    # ==========================================
+    # 2. APPEND
+    # ==========================================
+    def append(self, records, vectors, model_version):
+        """Tambah review + embedding-nya. Versi encoder harus sama dengan isi store (ValueError jika beda)"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if len(records) != len(vectors):
+            raise ValueError(f"{len(records)} review vs {len(vectors)} embedding")
+        if not len(records):
+            return
+        with self._lock:
+            self.refresh()
+            if self.meta and self.model_version != model_version:
+                raise ValueError(f"Store berisi embedding encoder versi {self.model_version}, bukan {model_version} "
+                                 "(jalankan scripts/20_build_embeddings.py --rebuild)")
+            if self.meta and vectors.shape[1] != self.dim:
+                raise ValueError(f"Dimensi embedding {vectors.shape[1]} != {self.dim}")
+            if not self.meta:
+                os.makedirs(self.path, exist_ok=True)
+                self.meta = {"dim": int(vectors.shape[1]), "model_version": model_version,
+                             "created": datetime.now().isoformat()}
+                with open(self._file(META_FILE), 'w', encoding='utf-8') as f:
+                    json.dump(self.meta, f)
+
+            # Potong sisa append yang gagal di tengah agar ketiga file kembali sejajar
+            for name, size in ((REVIEWS_FILE, self.line_offsets[self.n]), (STARS_FILE, self.n),
+                               (VECTOR_FILE, self.n * self.dim * 2)):
+                if os.path.exists(self._file(name)) and os.path.getsize(self._file(name)) != size:
+                    os.truncate(self._file(name), size)
+            self.line_offsets = self.line_offsets[:self.n + 1]
+
+            with open(self._file(REVIEWS_FILE), 'ab') as f:
+                f.write(b''.join(json.dumps(review_record(r), ensure_ascii=False).encode('utf-8') + b'\n' for r in records))
+            with open(self._file(STARS_FILE), 'ab') as f:
+                f.write(np.array([int(r['Bintang']) for r in records], dtype=np.uint8).tobytes())
+            with open(self._file(VECTOR_FILE), 'ab') as f:
+                f.write(vectors.astype(np.float16).tobytes())
+            self.refresh()
+
+    # ==========================================
+    # 3. INDEX IVF (K-MEANS)
+    # ==========================================
+    def _scores(self, rows, q):
+        """Dot product baris terpilih (urut naik -> akses mmap berurutan) dengan query"""
+        return np.asarray(self.vectors[rows], dtype=np.float32) @ q
+
+    def _assign(self, centroids):
+        return np.concatenate([(np.asarray(self.vectors[s:s + SCAN_CHUNK], dtype=np.float32) @ centroids.T).argmax(axis=1)
+                               for s in range(0, self.n, SCAN_CHUNK)])
+
+    def build_ivf(self, nlist=None, sample_per_list=64, seed=42):
+        """Spherical k-means (MiniBatchKMeans di sampel, centroid dinormalisasi) lalu semua baris ditempatkan
+        ke centroid terdekat. Daftar baris per cluster disimpan berurutan seperti postings."""
+        from sklearn.cluster import MiniBatchKMeans
+
+        with self._lock:
+            self.refresh()
+            n = self.n
+            nlist = min(nlist or max(1, int(np.sqrt(n))), n)
+            rng = np.random.default_rng(seed)
+            idx = np.sort(rng.choice(n, size=min(sample_per_list * nlist, n), replace=False))
+            km = MiniBatchKMeans(n_clusters=nlist, batch_size=4096, n_init=1, random_state=seed)
+            km.fit(np.asarray(self.vectors[idx], dtype=np.float32))
+            centroids = km.cluster_centers_.astype(np.float32)
+            centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+
+            assign = self._assign(centroids)
+            list_rows = np.argsort(assign, kind='stable').astype(np.int32)  # Stabil: baris dalam cluster tetap urut
+            list_offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=nlist))]).astype(np.int64)
+            tmp_path = self._file(f"ivf.{os.getpid()}.tmp.npz")
+            np.savez(tmp_path, centroids=centroids, list_offsets=list_offsets, list_rows=list_rows)
+            os.replace(tmp_path, self._file(IVF_FILE))
+            self.refresh()
+        return nlist
+
+    def needs_ivf(self):
+        """IVF perlu (dilatih ulang) jika store sudah besar & delta terlalu banyak"""
+        return self.n >= EXACT_BELOW and self.n - self.n_indexed > IVF_REBUILD_RATIO * self.n_indexed
+
+    # ==========================================
+    # 4. QUERY
+    # ==========================================
+    def search(self, vector, top=20, nprobe=8, bintang=None, exclude=None, exact=False):
+        """Top-k cosine; IVF: nprobe cluster terdekat + seluruh delta, tanpa IVF/exact: scan penuh per blok"""
+        q = np.asarray(vector, dtype=np.float32).ravel()
+        q = q / max(float(np.linalg.norm(q)), 1e-12)
+        with self._lock:
+            n = self.n
+            if not n:
+                return []
+            if self.centroids is not None and not exact:
+                probe = np.argsort(-(self.centroids @ q))[:nprobe]
+                parts = [self.list_rows[self.list_offsets[c]:self.list_offsets[c + 1]] for c in probe]
+                parts.append(np.arange(self.n_indexed, n, dtype=np.int32))
+                rows = np.sort(np.concatenate(parts))
+                scores = self._scores(rows, q)
+            else:
+                rows = np.arange(n, dtype=np.int32)
+                scores = np.concatenate([np.asarray(self.vectors[s:s + SCAN_CHUNK], dtype=np.float32) @ q
+                                         for s in range(0, n, SCAN_CHUNK)])
+
+            mask = np.ones(len(rows), dtype=bool)
+            if bintang:
+                mask &= np.isin(self.stars[rows], bintang)
+            if exclude is not None:
+                mask &= rows != exclude
+            rows, scores = rows[mask], scores[mask]
+            k = min(top, len(rows))
+            if k == 0:
+                return []
+            best = np.argpartition(-scores, k - 1)[:k] if k < len(rows) else np.arange(len(rows))
+            best = best[np.argsort(-scores[best], kind='stable')]
+            results = []
+            for i in best:
+                r = self.review(int(rows[i]))
+                results.append({"id": int(rows[i]), "komentar": r['Komentar'], "tanggal": r['Tanggal'],
+                                "bintang": r['Bintang'], "aspek": r.get('Aspek_Terdeteksi'), "emosi": r.get('Emosi'),
+                                "similarity": round(float(scores[i]), 4)})
+        return results
+
+    def size_bytes(self):
+        return sum(os.path.getsize(self._file(name)) for name in (VECTOR_FILE, STARS_FILE, REVIEWS_FILE, IVF_FILE)
+                   if os.path.exists(self._file(name)))
+
+
+def embedding_listener(store, encoder, batch_size=32):
+    """Listener ingest: embedding review baru langsung di-append (encoder = ModelHandler / InferenceClient)"""
+    def _update(records):
+        version, vectors = encoder.embed_batch([r['Komentar'] for r in records], batch_size=batch_size)
+        store.append(records, vectors, version)
+    return _update
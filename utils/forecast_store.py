@@ -0,0 +1,166 @@
+"""
+Penyimpanan Prakiraan Cuaca Kolumnar (semua time step per lokasi adm4)
+- Kolom numpy 2D [lokasi, step] per field (suhu, kelembapan, angin, awan, hujan, kode cuaca, ...);
+  teks berulang (arah angin, deskripsi, ikon) disimpan sebagai kode kosakata uint16
+- 1 baris = 1 lokasi; respons baru menimpa barisnya (prakiraan BMKG selalu dikirim utuh 3 hari)
+- Slice waktu: searchsorted atas kolom ts (UTC) baris lokasi; filter dari/sampai dalam waktu lokal lokasi
+1 fetch upstream menjawab semua query prakiraan lokasi tsb sampai datanya dianggap basi (TTL).
+"""
+import threading
+import time
+
+import numpy as np
+
+MAX_STEPS = 32  # BMKG: 3 hari x 8 step (3 jam); kolom melebar otomatis bila respons lebih panjang
+NUMERIC_FIELDS = {'t': np.float32, 'hu': np.float32, 'ws': np.float32, 'tcc': np.float32, 'tp': np.float32,
+                  'weather': np.int16}
+TEXT_FIELDS = ('wd', 'weather_desc', 'image')
+NO_TIME = np.iinfo(np.int64).max  # Step kosong diletakkan di akhir baris (searchsorted tetap valid)
+
+
+def _number(value):
+    """float32 kolom -> angka JSON seperti payload asli (24.0 -> 24); NaN -> None"""
+    value = float(value)
+    if value != value:
+        return None
+    return int(value) if value.is_integer() else round(value, 2)
+
+
+class ForecastStore:
+    def __init__(self, capacity=64, steps=MAX_STEPS):
+        self._lock = threading.Lock()
+        self.rows = {}         # kode adm4 -> baris
+        self.locations = []    # Metadata 'lokasi' BMKG per baris
+        self.fetched_at = np.zeros(capacity, dtype=np.float64)
+        self.utc_offset = np.zeros(capacity, dtype=np.int32)   # Detik; waktu lokal = UTC + offset (WIB/WITA/WIT)
+        self.n_steps = np.zeros(capacity, dtype=np.int16)
+        self.ts = np.full((capacity, steps), NO_TIME, dtype=np.int64)
+        self.columns = {f: np.zeros((capacity, steps), dtype=dt) for f, dt in NUMERIC_FIELDS.items()}
+        self.columns.update({f: np.zeros((capacity, steps), dtype=np.uint16) for f in TEXT_FIELDS})
+        self.vocab = ['']      # Kode 0 = kosong
+        self._codes = {'': 0}
+
+    def __len__(self):
+        return len(self.locations)
+
+    # ==========================================
+    # 1. INGEST RESPONS BMKG
+    # ==========================================
+    def _code(self, text):
+        text = '' if text is None else str(text)
+        code = self._codes.get(text)
+        if code is None:
+            code = self._codes[text] = len(self.vocab)
+            self.vocab.append(text)
+        return code
+
+    def _grow(self, rows, steps):
+        """Kapasitas ganda (baris) / pelebaran kolom (step); pemanggil memegang lock"""
+        capacity, width = self.ts.shape
+        if rows <= capacity and steps <= width:
+            return
+        capacity, width = max(capacity * 2 if rows > capacity else capacity, rows), max(width, steps)
+
+        def resized(arr, fill):
+            grown = np.full((capacity,) + ((width,) if arr.ndim == 2 else ()), fill, dtype=arr.dtype)
+            grown[tuple(slice(0, s) for s in arr.shape)] = arr
+            return grown
+        self.ts = resized(self.ts, NO_TIME)
+        self.columns = {f: resized(arr, 0) for f, arr in self.columns.items()}
+        self.fetched_at, self.utc_offset, self.n_steps = (resized(a, 0) for a in (self.fetched_at, self.utc_offset, self.n_steps))
+
+    def ingest(self, code, payload, fetched_at=None):
+        """Respons prakiraan-cuaca utuh (data[0].cuaca = list hari x list step) -> timpa baris lokasi; -> jumlah step"""
+        block = payload['data'][0]
+        steps = [s for day in block['cuaca'] for s in day]
+        utc = np.array([s['datetime'].rstrip('Z') for s in steps], dtype='datetime64[s]').astype(np.int64)
+        order = np.argsort(utc, kind='stable')
+        steps, utc = [steps[i] for i in order], utc[order]
+        offset = 0
+        if steps and steps[0].get('local_datetime'):
+            local = np.datetime64(steps[0]['local_datetime'].replace(' ', 'T'), 's').astype(np.int64)
+            offset = int(local - utc[0])
+
+        with self._lock:
+            row = self.rows.get(code)
+            if row is None:
+                row = self.rows[code] = len(self.locations)
+                self.locations.append(None)
+            self._grow(row + 1, len(steps))
+            n = len(steps)
+            self.locations[row] = dict(payload.get('lokasi') or block.get('lokasi') or {}, adm4=code)
+            self.fetched_at[row] = time.time() if fetched_at is None else fetched_at
+            self.utc_offset[row] = offset
+            self.n_steps[row] = n
+            self.ts[row] = NO_TIME
+            self.ts[row, :n] = utc
+            for field, dtype in NUMERIC_FIELDS.items():
+                values = [s.get(field) for s in steps]
+                self.columns[field][row] = 0
+                self.columns[field][row, :n] = np.array([np.nan if v is None else v for v in values], dtype=np.float64).astype(dtype)
+            for field in TEXT_FIELDS:
+                self.columns[field][row] = 0
+                self.columns[field][row, :n] = [self._code(s.get(field)) for s in steps]
+        return n
+
+    def age(self, code, now=None):
+        """Detik sejak fetch terakhir lokasi; None jika belum pernah"""
+        row = self.rows.get(code)
+        return None if row is None else (now or time.time()) - self.fetched_at[row]
+
+    # ==========================================
+    # 2. QUERY
+    # ==========================================
+    def _step(self, row, i):
+        c = self.columns
+        utc = int(self.ts[row, i])
+        return {
+            "datetime": str(np.datetime64(utc, 's')) + 'Z',
+            "local_datetime": str(np.datetime64(utc + int(self.utc_offset[row]), 's')).replace('T', ' '),
+            "t": _number(c['t'][row, i]), "hu": _number(c['hu'][row, i]),
+            "ws": _number(c['ws'][row, i]), "wd": self.vocab[c['wd'][row, i]],
+            "tcc": _number(c['tcc'][row, i]), "tp": _number(c['tp'][row, i]),
+            "weather": int(c['weather'][row, i]), "weather_desc": self.vocab[c['weather_desc'][row, i]],
+            "image": self.vocab[c['image'][row, i]]
+        }
+
+    def current(self, code, name=None, now=None):
+        """Ringkasan step yang sedang berlaku (step terakhir <= sekarang, atau step pertama) -> format kartu cuaca"""
+        with self._lock:
+            row = self.rows.get(code)
+            if row is None or not self.n_steps[row]:
+                return None
+            n = int(self.n_steps[row])
+            i = max(int(np.searchsorted(self.ts[row, :n], int(now or time.time()), side='right')) - 1, 0)
+            step, loc = self._step(row, i), self.locations[row]
+        return {
+            "kota": name or loc.get('desa'),
+            "provinsi": loc.get('provinsi'),
+            "lat": loc.get('lat'),
+            "lon": loc.get('lon'),
+            "desc": step['weather_desc'],
+            "suhu": step['t'],
+            "humid": step['hu'],
+            "angin": step['ws'],
+            "angin_dir": step['wd'],
+            "icon": step['image']
+        }
+
+    def query(self, code, start=None, end=None):
+        """Step lokasi dalam [start, end] (epoch detik WAKTU LOKAL lokasi, None = terbuka) -> dict atau None"""
+        with self._lock:
+            row = self.rows.get(code)
+            if row is None:
+                return None
+            n, offset = int(self.n_steps[row]), int(self.utc_offset[row])
+            ts = self.ts[row, :n]
+            lo = 0 if start is None else int(np.searchsorted(ts, start - offset, side='left'))
+            hi = n if end is None else int(np.searchsorted(ts, end - offset, side='right'))
+            return {
+                "lokasi": dict(self.locations[row]),
+                "fetched_at": float(self.fetched_at[row]),
+                "steps": [self._step(row, i) for i in range(lo, hi)]
+            }
+
+    def memory_bytes(self):
+        return self.ts.nbytes + sum(arr.nbytes for arr in self.columns.values())
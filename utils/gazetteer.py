@@ -0,0 +1,242 @@
+"""
+Gazetteer Wilayah adm4 (Desa/Kelurahan) Seluruh Indonesia
+Format di disk (dibaca via mmap, tidak dimuat utuh ke RAM -> start aplikasi tidak melambat):
+- places  : kode adm4 (uint64 tanpa titik), lat, lon (float32), offset label, urut kode
+- labels  : 1 blob UTF-8 "desa|kecamatan|kotkab|provinsi" per baris
+- names   : kunci nama ter-normalisasi (bytes lebar tetap, terurut) -> postings (baris, level) via searchsorted
+KD-tree koordinat (titik di bola satuan, jarak chord -> km) dibangun malas saat lookup lat/lon pertama.
+Bangun dari data wilayah Kemendagri: python scripts/21_build_gazetteer.py --source <wilayah.csv>
+"""
+import json
+import os
+import re
+import threading
+from bisect import bisect_left
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from utils.term_index import STOPWORDS
+
+EARTH_RADIUS_KM = 6371.0
+LEVELS = {1: 'provinsi', 2: 'kotkab', 3: 'kecamatan', 4: 'desa'}
+CODE_LEVELS = {2: 1, 5: 2, 8: 3, 13: 4}  # Panjang kode bertitik -> level ("31" .. "31.71.01.1002")
+PLACE_DTYPE = np.dtype([('code', '<u8'), ('lat', '<f4'), ('lon', '<f4'), ('label', '<u4')])
+ADMIN_PREFIX_RE = re.compile(r'^(kota administrasi|kota adm\.?|kabupaten administrasi|kabupaten|kab\.?|kota|desa|kelurahan|kecamatan|provinsi)\s+')
+NON_WORD_RE = re.compile(r'[^a-z0-9 ]+')
+MAX_NGRAM = 4
+# Kata pertanyaan cuaca yang tidak boleh dianggap nama tempat (ada desa bernama "Hujan", "Baru", dst)
+QUERY_WORDS = STOPWORDS | {'cuaca', 'hujan', 'panas', 'cerah', 'prakiraan', 'suhu', 'besok', 'hari', 'ini', 'sekarang', 'nanti',
+                           'malam', 'pagi', 'siang', 'sore', 'bagaimana', 'gimana', 'berapa', 'info', 'di', 'ke', 'daerah'}
+FILES = ('places', 'labels', 'name_keys', 'name_offsets', 'name_rows', 'name_levels')
+
+
+def normalize_name(name):
+    """"Kota Adm. Jakarta Pusat" -> "jakarta pusat"; "KAB. BANDUNG" -> "bandung" """
+    name = NON_WORD_RE.sub(' ', ADMIN_PREFIX_RE.sub('', str(name).lower().strip()).replace('-', ' '))
+    return ' '.join(name.split())
+
+
+def pack_code(code):
+    """"31.71.01.1002" -> 3171011002 (uint64); kebalikan format_code"""
+    return int(code.replace('.', ''))
+
+
+def format_code(value):
+    digits = f"{int(value):010d}"
+    return f"{digits[:2]}.{digits[2:4]}.{digits[4:6]}.{digits[6:]}"
+
+
+class Gazetteer:
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        arrays = {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r') for name in FILES}
+        self.places = arrays['places']
+        self.labels = arrays['labels']
+        self.name_keys = arrays['name_keys']
+        self.name_offsets = arrays['name_offsets']
+        self.name_rows = arrays['name_rows']
+        self.name_levels = arrays['name_levels']
+        self._tree = None
+        self._city_level = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path):
+        return cls(path)
+
+    def __len__(self):
+        return len(self.places)
+
+    @property
+    def city_level(self):
+        """True jika tiap kota/kabupaten hanya punya 1 adm4 (seed 33 kota): hasil lookup = fallback tingkat kota"""
+        if self._city_level is None:
+            self._city_level = len(np.unique(self.places['code'] // 10 ** 6)) == len(self.places)
+        return self._city_level
+
+    # ==========================================
+    # 1. BARIS -> TEMPAT
+    # ==========================================
+    def place(self, row, distance_km=None):
+        p = self.places[row]
+        start = int(p['label'])
+        end = int(self.places[row + 1]['label']) if row + 1 < len(self.places) else len(self.labels)
+        desa, kecamatan, kotkab, provinsi = bytes(self.labels[start:end]).decode('utf-8').split('|')
+        place = {"code": format_code(p['code']), "desa": desa, "kecamatan": kecamatan, "kotkab": kotkab,
+                 "provinsi": provinsi, "lat": round(float(p['lat']), 5), "lon": round(float(p['lon']), 5)}
+        if distance_km is not None:
+            place["distance_km"] = round(float(distance_km), 2)
+        return place
+
+    def by_code(self, code):
+        """Kode adm4 bertitik -> baris (binary search atas kolom kode terurut) atau None"""
+        try:
+            value = pack_code(code)
+        except ValueError:
+            return None
+        row = int(np.searchsorted(self.places['code'], value))
+        return row if row < len(self.places) and self.places[row]['code'] == value else None
+
+    # ==========================================
+    # 2. KOORDINAT -> TEMPAT TERDEKAT (KD-TREE)
+    # ==========================================
+    @staticmethod
+    def _unit(lat, lon):
+        lat, lon = np.radians(np.asarray(lat, dtype=np.float64)), np.radians(np.asarray(lon, dtype=np.float64))
+        return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+
+    def _kdtree(self):
+        if self._tree is None:
+            with self._lock:
+                if self._tree is None:
+                    self._tree = cKDTree(self._unit(self.places['lat'], self.places['lon']))
+        return self._tree
+
+    def nearest(self, lat, lon, k=1):
+        """-> [(baris, jarak km)] terdekat; jarak chord di bola satuan dikonversi ke jarak lingkaran besar"""
+        chord, rows = self._kdtree().query(self._unit(lat, lon), k=min(k, len(self.places)))
+        chord, rows = np.atleast_1d(chord), np.atleast_1d(rows)
+        km = 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(chord / 2, 1.0))
+        return list(zip(rows.tolist(), km.tolist()))
+
+    # ==========================================
+    # 3. TEKS BEBAS -> TEMPAT (INDEX NAMA)
+    # ==========================================
+    def _lookup(self, key):
+        """Kunci ter-normalisasi -> (baris, level) postings; searchsorted atas kunci terurut di mmap"""
+        probe = key.encode('utf-8')
+        if len(probe) > self.name_keys.dtype.itemsize:
+            return []
+        i = int(np.searchsorted(self.name_keys, probe))
+        if i >= len(self.name_keys) or self.name_keys[i] != probe:
+            return []
+        start, end = int(self.name_offsets[i]), int(self.name_offsets[i + 1])
+        return list(zip(self.name_rows[start:end].tolist(), self.name_levels[start:end].tolist()))
+
+    def _matches(self, text):
+        """Semua n-gram (maks MAX_NGRAM kata) teks yang merupakan nama wilayah; n-gram terpanjang menang bila tumpang tindih"""
+        words = normalize_name(text).split()
+        found, taken = [], set()
+        for n in range(min(MAX_NGRAM, len(words)), 0, -1):
+            for i in range(len(words) - n + 1):
+                span = set(range(i, i + n))
+                gram = words[i:i + n]
+                if span & taken or gram[0] in QUERY_WORDS or gram[-1] in QUERY_WORDS:
+                    continue
+                postings = self._lookup(' '.join(gram))
+                if postings:
+                    found.append(postings)
+                    taken |= span
+        return found
+
+    def resolve(self, text):
+        """Teks bebas ("cuaca di kemang jakarta selatan") -> baris adm4 atau None.
+        1 nama = level terluasnya ("Bandung" = Kota Bandung, bukan desa bernama Bandung); nama lain yang lebih luas
+        di teks mempersempit nama paling spesifik (Kemang di Jakarta Selatan, bukan Kemang di Bogor)."""
+        matches = []
+        for postings in self._matches(text):
+            level = min(lv for _, lv in postings)
+            matches.append((level, [row for row, lv in postings if lv == level]))
+        if not matches:
+            return None
+        level, candidates = max(matches, key=lambda m: m[0])
+        for broader, rows in matches:
+            if broader < level:
+                prefixes = {self._prefix(row, broader) for row in rows}
+                candidates = [row for row in candidates if self._prefix(row, broader) in prefixes] or candidates
+        return candidates[0]
+
+    def _prefix(self, row, level):
+        """Kode wilayah induk level tertentu dari baris adm4 (provinsi = 2 digit, kotkab 4, kecamatan 6)"""
+        return int(self.places[row]['code']) // 10 ** (10 - 2 * level)
+
+    def search(self, text, k=5):
+        """Semua kandidat nama (untuk autocomplete/debug): tempat + level kecocokan"""
+        results = []
+        for postings in self._matches(text):
+            results += [dict(self.place(row), match=LEVELS[level]) for row, level in postings[:k]]
+        return results[:k]
+
+
+# ==========================================
+# 4. BUILD (scripts/21_build_gazetteer.py)
+# ==========================================
+def build_gazetteer(frame, path):
+    """DataFrame wilayah berjenjang (kode bertitik, nama, lat, lon; level dari panjang kode) -> direktori gazetteer.
+    Baris adm4 tanpa koordinat dilewati. Nama provinsi/kotkab/kecamatan diwakili 1 desa terdekat titik wilayahnya
+    (atau rata-rata koordinat desanya bila wilayah induk tidak berkoordinat)."""
+    frame = frame.assign(kode=frame['kode'].astype(str).str.strip(), nama=frame['nama'].astype(str).str.strip())
+    frame = frame.assign(level=frame['kode'].str.len().map(CODE_LEVELS))
+    names = dict(zip(frame['kode'], frame['nama']))
+    adm4 = frame[(frame['level'] == 4) & frame['lat'].notna() & frame['lon'].notna()]
+    adm4 = adm4.assign(packed=adm4['kode'].map(pack_code)).sort_values('packed').drop_duplicates('packed')
+
+    labels = ['|'.join([r.nama, names.get(r.kode[:8], ''), names.get(r.kode[:5], ''), names.get(r.kode[:2], '')])
+              for r in adm4.itertuples()]
+    encoded = [label.encode('utf-8') for label in labels]
+    places = np.zeros(len(adm4), dtype=PLACE_DTYPE)
+    places['code'] = adm4['packed'].values
+    places['lat'] = adm4['lat'].values
+    places['lon'] = adm4['lon'].values
+    places['label'] = np.concatenate([[0], np.cumsum([len(e) for e in encoded])[:-1]]) if encoded else []
+    blob = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+
+    # Postings nama: desa -> semua barisnya; wilayah induk -> 1 baris wakil
+    postings = {}
+    codes = adm4['kode'].tolist()
+    unit = Gazetteer._unit(places['lat'], places['lon'])
+    for row, r in enumerate(adm4.itertuples()):
+        postings.setdefault(normalize_name(r.nama), []).append((4, 1, r.packed, row))
+    parents = frame[frame['level'].isin([1, 2, 3])]
+    for r in parents.itertuples():
+        # Kode bertitik lebar tetap -> urutan string = urutan kode; anak wilayah = 1 rentang (bisect)
+        lo, hi = bisect_left(codes, r.kode + '.'), bisect_left(codes, r.kode + '/')
+        if lo == hi:
+            continue
+        center = Gazetteer._unit(r.lat, r.lon) if r.lat == r.lat and r.lon == r.lon else unit[lo:hi].mean(axis=0)
+        best = lo + int(np.argmax(unit[lo:hi] @ center))
+        is_kota = 0 if r.nama.lower().startswith('kota') else 1  # "Bandung" -> Kota Bandung sebelum Kab. Bandung
+        postings.setdefault(normalize_name(r.nama), []).append((int(r.level), is_kota, int(r.kode.replace('.', '')), best))
+
+    keys = sorted(k for k in postings if k)
+    name_rows, name_levels, offsets = [], [], [0]
+    for key in keys:
+        entries = sorted(postings[key])
+        name_rows += [row for *_, row in entries]
+        name_levels += [level for level, *_ in entries]
+        offsets.append(len(name_rows))
+
+    os.makedirs(path, exist_ok=True)
+    arrays = {'places': places, 'labels': blob,
+              'name_keys': np.array([k.encode('utf-8') for k in keys], dtype=bytes),
+              'name_offsets': np.array(offsets, dtype=np.int64),
+              'name_rows': np.array(name_rows, dtype=np.uint32),
+              'name_levels': np.array(name_levels, dtype=np.uint8)}
+    for name, arr in arrays.items():
+        np.save(os.path.join(path, f'{name}.npy'), arr)
+    with open(os.path.join(path, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump({"places": len(places), "names": len(keys)}, f)
+    return len(places), len(keys)
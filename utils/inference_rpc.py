@@ -0,0 +1,366 @@
+"""
+Inference Server Terpisah (IPC biner lewat Unix socket / TCP)
+Web worker Flask tidak lagi memuat IndoBERT: InferenceClient mengirim teks ke 1 proses InferenceServer
+yang menggabungkan request dari SEMUA web worker menjadi satu batch (micro-batching lintas client).
+Kapasitas web (gunicorn) & inferensi bisa diskalakan terpisah, di 1 mesin (unix:) atau lintas node (host:port).
+
+Frame  : [u32 panjang payload][payload]                          (big-endian)
+Request: [u32 request_id][u8 op][u16 n] + n x ([u32 len][utf-8])  (OP_PREDICT, OP_EMBED)
+         [u32 request_id][u8 op][u16 0] + JSON                    (OP_INFO, OP_ACTIVATE)
+Respon : [u32 request_id][u8 status][u16 n] + n x ITEM            (STATUS_OK untuk OP_PREDICT)
+         [u32 request_id][u8 status][u16 n] + VECTORS             (STATUS_OK untuk OP_EMBED)
+         [u32 request_id][u8 status][u16 0] + JSON / pesan error
+ITEM   : [u8 aspek][f32 conf][u8 tier][u8 emosi][f32 conf][u8 tier] = 12 byte per teks
+VECTORS: [u16 dim][u16 len][utf-8 versi encoder] + n x dim float16
+"""
+import json
+import os
+import queue
+import socket
+import struct
+import threading
+import time
+
+import numpy as np
+
+from utils.metrics import REGISTRY, BATCH_BUCKETS
+from utils.recommendations import generate_recommendations
+
+# Urutan id label identik dengan ModelHandler.absa_labels / emotion_labels
+ASPEK_LABELS = ("Akurasi", "UI/UX", "Performa", "Lainnya")
+EMOSI_LABELS = ("Marah", "Takut", "Bahagia", "Sedih")
+TIERS = ("fast", "indobert")
+
+OP_PREDICT, OP_INFO, OP_ACTIVATE, OP_EMBED = 1, 2, 3, 4
+STATUS_OK, STATUS_ERROR, STATUS_NOT_FOUND = 0, 1, 2
+
+_FRAME = struct.Struct('!I')
+_HEADER = struct.Struct('!IBH')
+_ITEM = struct.Struct('!BfBBfB')
+_VECTORS = struct.Struct('!HH')
+_F16 = np.dtype('>f2')
+MAX_FRAME = 16 * 1024 * 1024
+
+RPC_BATCH = REGISTRY.histogram(
+    'bmkg_inference_rpc_batch_requests', 'Jumlah request client yang tergabung dalam 1 batch inference server',
+    buckets=BATCH_BUCKETS)
+RPC_QUEUE_WAIT = REGISTRY.histogram(
+    'bmkg_inference_rpc_queue_seconds', 'Waktu tunggu request di antrean inference server')
+
+
+class InferenceUnavailable(Exception):
+    """Inference server tidak bisa dihubungi / timeout (app menjawab 503)"""
+
+
+# ==========================================
+# 1. PROTOKOL
+# ==========================================
+def parse_address(address):
+    """'unix:/run/bmkg-infer.sock' -> AF_UNIX, 'host:port' -> AF_INET"""
+    if address.startswith('unix:'):
+        return socket.AF_UNIX, address[len('unix:'):]
+    host, _, port = address.rpartition(':')
+    return socket.AF_INET, (host or '127.0.0.1', int(port))
+
+
+def _recv_exact(sock, n):
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            raise ConnectionError("Koneksi ditutup")
+        buf += chunk
+    return bytes(buf)
+
+
+def recv_frame(sock):
+    (size,) = _FRAME.unpack(_recv_exact(sock, _FRAME.size))
+    if size > MAX_FRAME:
+        raise ConnectionError(f"Frame terlalu besar: {size} byte")
+    return _recv_exact(sock, size)
+
+
+def send_frame(sock, payload):
+    sock.sendall(_FRAME.pack(len(payload)) + payload)
+
+
+def encode_texts(request_id, texts, op=OP_PREDICT):
+    parts = [_HEADER.pack(request_id, op, len(texts))]
+    for text in texts:
+        raw = str(text).encode('utf-8')
+        parts += [_FRAME.pack(len(raw)), raw]
+    return b''.join(parts)
+
+
+def decode_texts(payload, n):
+    texts, offset = [], _HEADER.size
+    for _ in range(n):
+        (size,) = _FRAME.unpack_from(payload, offset)
+        offset += _FRAME.size
+        texts.append(payload[offset:offset + size].decode('utf-8'))
+        offset += size
+    return texts
+
+
+def encode_results(request_id, results):
+    parts = [_HEADER.pack(request_id, STATUS_OK, len(results))]
+    for r in results:
+        parts.append(_ITEM.pack(ASPEK_LABELS.index(r['aspek']), r['aspek_conf'], TIERS.index(r['aspek_tier']),
+                                EMOSI_LABELS.index(r['emosi']), r['emosi_conf'], TIERS.index(r['emosi_tier'])))
+    return b''.join(parts)
+
+
+def decode_results(payload, n):
+    results = []
+    for i in range(n):
+        a, ac, at, e, ec, et = _ITEM.unpack_from(payload, _HEADER.size + i * _ITEM.size)
+        results.append({"aspek": ASPEK_LABELS[a], "aspek_conf": round(ac, 1), "aspek_tier": TIERS[at],
+                        "emosi": EMOSI_LABELS[e], "emosi_conf": round(ec, 1), "emosi_tier": TIERS[et]})
+    return results
+
+
+def encode_vectors(request_id, version, vectors):
+    raw = version.encode('utf-8')
+    return (_HEADER.pack(request_id, STATUS_OK, len(vectors)) + _VECTORS.pack(vectors.shape[1], len(raw)) + raw
+            + np.asarray(vectors, dtype=_F16).tobytes())
+
+
+def decode_vectors(payload, n):
+    dim, size = _VECTORS.unpack_from(payload, _HEADER.size)
+    offset = _HEADER.size + _VECTORS.size
+    version = payload[offset:offset + size].decode('utf-8')
+    vectors = np.frombuffer(payload, dtype=_F16, count=n * dim, offset=offset + size)
+    return version, vectors.astype(np.float32).reshape(n, dim)
+
+
+def encode_json(request_id, status, data):
+    return _HEADER.pack(request_id, status, 0) + json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+
+# ==========================================
+# 2. SERVER (1 PROSES, MEMEGANG ModelHandler)
+# ==========================================
+class _Job:
+    __slots__ = ('conn', 'send_lock', 'request_id', 'texts', 'enqueued')
+
+    def __init__(self, conn, send_lock, request_id, texts):
+        self.conn, self.send_lock, self.request_id, self.texts = conn, send_lock, request_id, texts
+        self.enqueued = time.perf_counter()
+
+
+class InferenceServer:
+    """Antrean bersama semua koneksi -> 1 thread model yang membentuk batch s/d max_batch teks atau max_wait"""
+    def __init__(self, handler, address, max_batch=32, max_wait_ms=5):
+        self.handler = handler
+        self.address = address
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.queue = queue.Queue()
+        self.sock = None
+
+    def start(self):
+        family, addr = parse_address(self.address)
+        if family == socket.AF_UNIX and os.path.exists(addr):
+            os.remove(addr)  # Socket basi dari proses sebelumnya
+        self.sock = socket.socket(family, socket.SOCK_STREAM)
+        if family == socket.AF_INET:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(addr)
+        self.sock.listen(128)
+        threading.Thread(target=self._accept_loop, daemon=True, name="rpc-accept").start()
+        threading.Thread(target=self._batch_loop, daemon=True, name="rpc-batch").start()
+        return self
+
+    def _accept_loop(self):
+        while True:
+            conn, _ = self.sock.accept()
+            threading.Thread(target=self._read_loop, args=(conn,), daemon=True).start()
+
+    def _reply(self, conn, send_lock, payload):
+        try:
+            with send_lock:
+                send_frame(conn, payload)
+        except OSError:
+            pass  # Client sudah pergi (timeout di sisi web); hasil dibuang
+
+    def _read_loop(self, conn):
+        """1 thread per koneksi: baca request; predict masuk antrean, op kontrol dijawab langsung"""
+        send_lock = threading.Lock()
+        try:
+            while True:
+                payload = recv_frame(conn)
+                request_id, op, n = _HEADER.unpack_from(payload)
+                if op == OP_PREDICT:
+                    self.queue.put(_Job(conn, send_lock, request_id, decode_texts(payload, n)))
+                elif op == OP_EMBED:
+                    # Embedding (triase / ingest) jarang: dijawab di thread koneksi, tidak ikut antrean batch klasifikasi
+                    self._reply(conn, send_lock, self._embed(request_id, decode_texts(payload, n)))
+                else:
+                    self._reply(conn, send_lock, self._control(request_id, op, payload[_HEADER.size:]))
+        except (ConnectionError, OSError, struct.error, ValueError):
+            conn.close()  # Putus / frame rusak: tutup koneksi ini saja
+
+    def _control(self, request_id, op, body):
+        try:
+            if op == OP_INFO:
+                return encode_json(request_id, STATUS_OK, self.handler.get_model_metadata())
+            if op == OP_ACTIVATE:
+                args = json.loads(body)
+                return encode_json(request_id, STATUS_OK, self.handler.activate(args['head'], args.get('version')))
+            return encode_json(request_id, STATUS_ERROR, f"Op tidak dikenal: {op}")
+        except KeyError as e:
+            return encode_json(request_id, STATUS_NOT_FOUND, e.args[0] if e.args else str(e))
+        except Exception as e:
+            return encode_json(request_id, STATUS_ERROR, str(e))
+
+    def _embed(self, request_id, texts):
+        try:
+            version, vectors = self.handler.embed_batch(texts, batch_size=self.max_batch)
+            return encode_vectors(request_id, version, vectors)
+        except Exception as e:
+            return encode_json(request_id, STATUS_ERROR, str(e))
+
+    def _batch_loop(self):
+        while True:
+            jobs = [self.queue.get()]
+            n_texts = len(jobs[0].texts)
+            deadline = time.perf_counter() + self.max_wait
+            # Kumpulkan request client lain yang datang dalam jendela max_wait
+            while n_texts < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    job = self.queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                jobs.append(job)
+                n_texts += len(job.texts)
+
+            now = time.perf_counter()
+            for job in jobs:
+                RPC_QUEUE_WAIT.observe(now - job.enqueued)
+            RPC_BATCH.observe(len(jobs))
+            try:
+                results = self.handler.predict_batch([t for job in jobs for t in job.texts], batch_size=self.max_batch)
+            except Exception as e:
+                for job in jobs:
+                    self._reply(job.conn, job.send_lock, encode_json(job.request_id, STATUS_ERROR, str(e)))
+                continue
+            offset = 0
+            for job in jobs:
+                chunk = results[offset:offset + len(job.texts)]
+                offset += len(job.texts)
+                self._reply(job.conn, job.send_lock, encode_results(job.request_id, chunk))
+
+    def serve_forever(self):
+        self.start()
+        while True:
+            time.sleep(3600)
+
+
+# ==========================================
+# 3. CLIENT TIPIS (DIPAKAI app.py, PENGGANTI ModelHandler)
+# ==========================================
+class InferenceClient:
+    """Antarmuka sama dengan ModelHandler (predict, predict_batch, embed_batch, get_model_metadata, activate).
+    Pool koneksi: tiap thread gunicorn meminjam 1 socket, jadi tidak perlu multiplexing di client."""
+    backend = 'remote'
+
+    def __init__(self, address, timeout=5.0, pool_size=8):
+        self.address = address
+        self.timeout = timeout
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        self._ids = iter(range(1, 2 ** 32))
+        self._id_lock = threading.Lock()
+
+    def _connect(self):
+        family, addr = parse_address(self.address)
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(addr)
+        except OSError:
+            sock.close()
+            raise
+        if family == socket.AF_INET:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock
+
+    def _call(self, build):
+        with self._id_lock:
+            request_id = next(self._ids)
+        try:
+            sock = self._pool.get_nowait()
+        except queue.Empty:
+            sock = None
+        try:
+            sock = sock or self._connect()
+            send_frame(sock, build(request_id))
+            payload = recv_frame(sock)
+        except (OSError, ConnectionError) as e:
+            # Timeout / putus: status stream tidak diketahui -> socket dibuang, bukan dikembalikan ke pool
+            if sock:
+                sock.close()
+            raise InferenceUnavailable(f"Inference server {self.address}: {e}") from e
+        rid, status, n = _HEADER.unpack_from(payload)
+        if rid != request_id:
+            sock.close()
+            raise InferenceUnavailable(f"Respon request {rid} tidak cocok dengan {request_id}")
+        try:
+            self._pool.put_nowait(sock)
+        except queue.Full:
+            sock.close()
+        if status == STATUS_OK:
+            return payload, n
+        message = json.loads(payload[_HEADER.size:])
+        raise KeyError(message) if status == STATUS_NOT_FOUND else RuntimeError(message)
+
+    def predict_batch(self, texts, batch_size=32):
+        results = []
+        # Batas u16 per frame; batching sebenarnya diatur server
+        for i in range(0, len(texts), 1024):
+            payload, n = self._call(lambda rid: encode_texts(rid, texts[i:i + 1024]))
+            results.extend(decode_results(payload, n))
+        return results
+
+    def embed_batch(self, texts, batch_size=32):
+        version, chunks = None, []
+        for i in range(0, len(texts), 1024):
+            payload, n = self._call(lambda rid: encode_texts(rid, texts[i:i + 1024], OP_EMBED))
+            version, vectors = decode_vectors(payload, n)
+            chunks.append(vectors)
+        return version, np.concatenate(chunks) if chunks else np.zeros((0, 0), dtype=np.float32)
+
+    def predict(self, text):
+        result = self.predict_batch([text])[0]
+        result["recommendations"] = generate_recommendations(text, result["aspek"], result["emosi"])
+        return result
+
+    def get_model_metadata(self):
+        payload, _ = self._call(lambda rid: _HEADER.pack(rid, OP_INFO, 0))
+        return dict(json.loads(payload[_HEADER.size:]), server=self.address)
+
+    def activate(self, head, version=None):
+        body = json.dumps({"head": head, "version": version}).encode('utf-8')
+        payload, _ = self._call(lambda rid: _HEADER.pack(rid, OP_ACTIVATE, 0) + body)
+        return json.loads(payload[_HEADER.size:])
+
+
+# ==========================================
+# 4. FACTORY CLASSIFIER (app.py, scripts/08, scripts/18)
+# ==========================================
+def local_model_handler(settings):
+    """ModelHandler dengan backend / student / cascade dari modul konfigurasi (settings = config)"""
+    from utils.model_handler import ModelHandler  # torch hanya dimuat jika model berjalan di proses ini
+    return ModelHandler(backend=settings.MODEL_BACKEND, student_dir=settings.STUDENT_MODEL_DIR,
+                        cascade=settings.CASCADE_ENABLED, cascade_threshold=settings.CASCADE_THRESHOLD,
+                        fast_model_path=settings.FAST_MODEL_PATH)
+
+
+def build_classifier(settings):
+    """Classifier serving: InferenceClient jika INFERENCE_SERVER diisi, selain itu ModelHandler lokal.
+    Dipakai app & worker ingest agar label review live berasal dari model & tier yang sama"""
+    if settings.INFERENCE_SERVER:
+        return InferenceClient(settings.INFERENCE_SERVER, timeout=settings.INFERENCE_TIMEOUT)
+    return local_model_handler(settings)
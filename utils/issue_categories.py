@@ -0,0 +1,73 @@
+"""
+Kategori Masalah (Rule-Based) untuk keluhan pengguna aplikasi Info BMKG.
+Dipakai bersama oleh scripts/07_bug_extraction.py dan deteksi lonjakan live.
+"""
+
+# Kategori yang dianggap Critical (Teknis), sisanya masuk UX Issues
+CRITICAL_KEYWORDS = ['Lambat', 'Crash', 'Login', 'Server', 'Notifikasi', 'Akurasi']
+
+
+def categorize_issue(text):
+    """
+    Mengelompokkan teks keluhan ke dalam kategori masalah spesifik.
+    Ini membuat laporan lebih mudah dibaca manusia daripada sekadar n-gram.
+    """
+    text = str(text).lower()
+    
+    # 1. Kategori Performa / Teknis
+    if any(x in text for x in ['lemot', 'lambat', 'berat', 'lag', 'macet', 'stuck']):
+        return "Aplikasi Lambat / Berat"
+    if any(x in text for x in ['keluar sendiri', 'force close', 'fc', 'crash', 'tutup']):
+        return "Force Close / Crash"
+    if any(x in text for x in ['gagal login', 'masuk', 'daftar', 'otp']):
+        return "Masalah Login / Akun"
+    if any(x in text for x in ['koneksi', 'jaringan', 'internet', 'server', 'down']):
+        return "Koneksi / Server Down"
+    
+    # 2. Kategori Fitur Gempa
+    if 'gempa' in text:
+        if any(x in text for x in ['notif', 'bunyi', 'suara', 'alarm', 'telat']):
+            return "Notifikasi Gempa Terlambat/Mati"
+        if any(x in text for x in ['lokasi', 'titik', 'peta', 'koordinat']):
+            return "Akurasi Lokasi Gempa"
+        return "Info Gempa Tidak Update"
+
+    # 3. Kategori Cuaca
+    if any(x in text for x in ['cuaca', 'hujan', 'panas', 'mendung']):
+        if any(x in text for x in ['salah', 'beda', 'ngaco', 'tidak sesuai']):
+            return "Prediksi Cuaca Tidak Akurat"
+        if any(x in text for x in ['widget', 'tampilan']):
+            return "Widget Cuaca Bermasalah"
+    
+    # 4. Kategori UI/UX
+    if any(x in text for x in ['iklan', 'banyak iklan']):
+        return "Terlalu Banyak Iklan"
+    if any(x in text for x in ['update', 'versi baru']):
+        return "Bug Setelah Update Aplikasi"
+    if any(x in text for x in ['gelap', 'mode malam', 'tulisan', 'huruf']):
+        return "Masalah Tampilan / UI"
+
+    return None # Tidak masuk kategori utama
+
+def get_recommendation(issue):
+    """Memberikan saran teknis berdasarkan kategori masalah"""
+    recs = {
+        "Aplikasi Lambat / Berat": "Lakukan profiling memori & optimasi query database lokal.",
+        "Force Close / Crash": "Cek log 'Fatal Exception' pada Android Vitals & perbaiki NullPointer.",
+        "Masalah Login / Akun": "Periksa API Gateway & layanan OTP provider.",
+        "Koneksi / Server Down": "Scale-up kapasitas server saat traffic tinggi & cek CDN.",
+        "Notifikasi Gempa Terlambat/Mati": "Prioritaskan push notification channel 'High Importance' di Firebase.",
+        "Akurasi Lokasi Gempa": "Validasi koordinat sensor seismograf dengan peta digital.",
+        "Info Gempa Tidak Update": "Pastikan sinkronisasi data background berjalan real-time.",
+        "Prediksi Cuaca Tidak Akurat": "Kalibrasi model prediksi dengan data stasiun pengamatan terdekat.",
+        "Widget Cuaca Bermasalah": "Perbaiki service widget agar auto-refresh di background.",
+        "Terlalu Banyak Iklan": "Kurangi frekuensi iklan interstitial agar tidak mengganggu UX.",
+        "Bug Setelah Update Aplikasi": "Rollback fitur bermasalah atau rilis hotfix secepatnya.",
+        "Masalah Tampilan / UI": "Evaluasi kontras warna & ukuran font untuk aksesibilitas."
+    }
+    return recs.get(issue, "Lakukan investigasi log lebih lanjut.")
+
+
+def is_critical(issue):
+    """True jika kategori masalah termasuk Critical (Teknis)"""
+    return any(x in issue for x in CRITICAL_KEYWORDS)
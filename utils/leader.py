@@ -0,0 +1,73 @@
+"""
+Leader Antar-Proses (lock file)
+Gunicorn menjalankan N worker; layanan tunggal (poller live feed upstream, worker ingest, arsip gempa)
+hanya boleh berjalan di 1 proses. Proses pertama yang mendapat flock eksklusif menjadi leader; lock
+otomatis lepas saat proses itu mati, dan follower yang mencoba ulang mengambil alih.
+"""
+import fcntl
+import os
+import threading
+
+
+class LeaderLock:
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    @property
+    def held(self):
+        return self._fd is not None
+
+    def try_acquire(self):
+        """True jika proses ini (sekarang) leader; fd dibiarkan terbuka selama proses hidup"""
+        if self._fd is not None:
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        return True
+
+    def wait_async(self, on_acquired, interval=30):
+        """Follower: coba ulang tiap `interval` detik di thread daemon; on_acquired() dipanggil sekali saat jadi leader"""
+        def run():
+            stop = threading.Event()
+            while not self.try_acquire():
+                stop.wait(interval)
+            on_acquired()
+        threading.Thread(target=run, daemon=True).start()
+
+
+class SharedState:
+    """State yang ditulis leader ke file dan dibaca follower: get() memuat ulang jika file berubah.
+    Di leader objek di memori adalah sumber kebenaran (di-update listener ingest) sehingga tidak dimuat ulang."""
+    def __init__(self, path, loader, is_owner):
+        self.path = path
+        self.loader = loader
+        self.is_owner = is_owner   # fn() -> bool (status leader bisa berubah saat failover)
+        self.value = None
+        self.mtime = None
+
+    def _mtime(self):
+        try:
+            return os.path.getmtime(self.path)
+        except OSError:
+            return None
+
+    def get(self):
+        mtime = self._mtime()
+        if self.value is None or (mtime != self.mtime and not self.is_owner()):
+            self.value, self.mtime = self.loader(self.path), mtime
+        return self.value
+
+    def save(self):
+        """Leader: tulis state (objek punya save(path)) agar follower ikut melihatnya"""
+        if self.value is not None:
+            self.value.save(self.path)
+            self.mtime = self._mtime()
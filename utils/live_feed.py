@@ -0,0 +1,182 @@
+"""
+Live Feed Broadcaster (Server-Sent Events)
+Satu poller upstream -> diff snapshot autogempa/gempaterkini/RSS -> fan-out event
+yang berubah saja ke semua client yang terhubung. Beban ke BMKG bergantung pada interval polling,
+bukan jumlah penonton.
+Multi-worker: hanya proses primary (leader) yang memanggil BMKG dan menulis snapshot ke file;
+worker lain (mirror) membaca file itu dan mem-fan-out perubahan ke client SSE-nya sendiri.
+"""
+import json
+import os
+import queue
+import threading
+import time
+
+MIRROR_INTERVAL = 2  # Detik; mirror hanya stat() file snapshot leader
+
+
+def quake_key(q):
+    return f"{q['jam']}|{q['koordinat']}|{q['magnitudo']}"
+
+
+def warning_key(w):
+    return f"{w['judul']}|{w['waktu']}"
+
+
+class LiveFeedBroadcaster:
+    def __init__(self, bmkg_handler, interval=30, queue_size=100, listeners=None, snapshot_path=None):
+        self.bmkg = bmkg_handler
+        self.snapshot_path = snapshot_path
+        self.primary = snapshot_path is None  # Tanpa file bersama: proses tunggal, selalu primary
+        self._mirror_mtime = None
+        self.listeners = listeners or []  # fn(latest, recent) tiap polling (mis. arsip gempa)
+        self.interval = interval
+        self.queue_size = queue_size
+        self.snapshot = {"latest": None, "recent": [], "warnings": []}
+        self.subscribers = set()
+        self.ready = threading.Event()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # --- 1. SUBSCRIBE / FAN-OUT ---
+    def subscribe(self):
+        q = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self.subscribers.add(q)
+        return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self.subscribers.discard(q)
+
+    def publish(self, event, data):
+        with self._lock:
+            subscribers = list(self.subscribers)
+        for q in subscribers:
+            try:
+                q.put_nowait((event, data))
+            except queue.Full:
+                # Client terlalu lambat membaca: putuskan, browser akan reconnect & dapat snapshot baru
+                self.unsubscribe(q)
+
+    def get_snapshot(self):
+        with self._lock:
+            return dict(self.snapshot)
+
+    # --- 2. POLLER & DIFF ---
+    def become_primary(self):
+        """Proses ini menjadi leader: polling BMKG langsung & menulis snapshot untuk worker lain"""
+        self.primary = True
+
+    def _fetch_upstream(self):
+        latest = self.bmkg.get_latest_quake()
+        recent = self.bmkg.get_recent_quakes() or []
+        warnings = self.bmkg.get_weather_warning()  # None = gagal; [] = semua peringatan sudah berakhir
+        for listener in self.listeners:
+            try:
+                listener(latest, recent)
+            except Exception as e:
+                print(f"⚠️ Live Feed Listener Error: {e}")
+        return latest, recent, warnings
+
+    def _read_mirror(self):
+        """Snapshot leader; None jika file belum ada / belum berubah sejak dibaca terakhir"""
+        try:
+            mtime = os.path.getmtime(self.snapshot_path)
+            if mtime == self._mirror_mtime:
+                return None
+            with open(self.snapshot_path) as f:
+                snap = json.load(f)
+        except (OSError, ValueError):
+            return None
+        self._mirror_mtime = mtime
+        return snap
+
+    def _write_snapshot(self, snap):
+        tmp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(dict(snap, written_at=time.time()), f)
+        os.replace(tmp_path, self.snapshot_path)
+
+    def poll_once(self):
+        """Primary: ambil 3 feed upstream; mirror: baca snapshot leader. Publish hanya bagian yang berubah"""
+        if self.primary:
+            latest, recent, warnings = self._fetch_upstream()
+        else:
+            snap = self._read_mirror()
+            if snap is None:
+                return
+            latest, recent, warnings = snap['latest'], snap['recent'], snap['warnings']
+
+        with self._lock:
+            old = self.snapshot
+            # Feed gagal (None / kosong) tidak menimpa data terakhir yang valid; daftar peringatan kosong
+            # dari fetch yang sukses tetap diterima agar peringatan yang berakhir ter-publish sebagai 'removed'
+            self.snapshot = {
+                "latest": latest or old['latest'],
+                "recent": recent or old['recent'],
+                "warnings": old['warnings'] if warnings is None else warnings
+            }
+            new = self.snapshot
+        if self.primary and self.snapshot_path:
+            self._write_snapshot(new)
+
+        if new['latest'] and (not old['latest'] or quake_key(new['latest']) != quake_key(old['latest'])):
+            self.publish('quake_latest', new['latest'])
+
+        old_recent = {quake_key(q) for q in old['recent']}
+        added = [q for q in new['recent'] if quake_key(q) not in old_recent]
+        if added:
+            self.publish('quake_recent', added)
+
+        old_warn = {warning_key(w) for w in old['warnings']}
+        new_warn = {warning_key(w) for w in new['warnings']}
+        if new_warn != old_warn:
+            self.publish('warning', {
+                "added": [w for w in new['warnings'] if warning_key(w) not in old_warn],
+                "removed": sorted(old_warn - new_warn)
+            })
+
+        self.ready.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+            except Exception as e:
+                print(f"⚠️ Live Feed Poller Error: {e}")
+            self._stop.wait(self.interval if self.primary else MIRROR_INTERVAL)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    # --- 3. SSE ---
+    def stream(self, keepalive=15, max_seconds=None, retry_ms=3000):
+        """Generator SSE: snapshot penuh saat connect, lalu event perubahan saja.
+        max_seconds: koneksi ditutup setelahnya agar thread worker tidak tertahan selamanya;
+        browser (EventSource) reconnect otomatis setelah retry_ms dan menerima snapshot baru."""
+        q = self.subscribe()
+        end = time.monotonic() + max_seconds if max_seconds else None
+        try:
+            yield f"retry: {retry_ms}\n\n"
+            yield sse_format('snapshot', self.get_snapshot())
+            while end is None or time.monotonic() < end:
+                try:
+                    wait = keepalive if end is None else max(min(keepalive, end - time.monotonic()), 0.01)
+                    event, data = q.get(timeout=wait)
+                    yield sse_format(event, data)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+        finally:
+            self.unsubscribe(q)
+
+
+def sse_format(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
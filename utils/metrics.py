@@ -0,0 +1,197 @@
+"""
+Registry Metrik In-Process (format teks Prometheus, endpoint /metrics)
+Dirancang murah untuk hot-path: 1 lock + bisect per observasi, tanpa alokasi string.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Bucket default (detik): dari 1 ms (Word2Vec / cache) sampai 10 s (timeout upstream)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+
+def _fmt_labels(names, values, extra=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _fmt_value(v):
+    return repr(float(v)) if v != int(v) else str(int(v))
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(n, '')) for n in self.labelnames)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self.values = {}
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, **labels):
+        return self.values.get(self._key(labels), 0)
+
+    def render(self):
+        with self._lock:
+            items = sorted(self.values.items())
+        lines = self.header()
+        for key, v in items:
+            lines.append(f"{self.name}{_fmt_labels(self.labelnames, key)} {_fmt_value(v)}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Gauge berbasis callback: nilai dihitung saat scrape (misal rasio cache hit)"""
+    kind = 'gauge'
+
+    def __init__(self, name, help_text, labelnames=(), callback=None):
+        super().__init__(name, help_text, labelnames)
+        self.values = {}
+        self.callback = callback
+
+    def set(self, value, **labels):
+        with self._lock:
+            self.values[self._key(labels)] = value
+
+    def render(self):
+        with self._lock:
+            values = dict(self.values)
+        if self.callback:
+            for labels, v in self.callback():
+                values[self._key(labels)] = v
+        lines = self.header()
+        for key, v in sorted(values.items()):
+            lines.append(f"{self.name}{_fmt_labels(self.labelnames, key)} {_fmt_value(v)}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+        self.series = {}  # key -> [counts per bucket (+Inf terakhir), sum]
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            s = self.series.get(key)
+            if s is None:
+                s = self.series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            s[0][idx] += 1
+            s[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self):
+        lines = self.header()
+        with self._lock:
+            snapshot = [(k, list(s[0]), s[1]) for k, s in sorted(self.series.items())]
+        for key, counts, total in snapshot:
+            cumulative = 0
+            for bound, c in zip(self.buckets + (float('inf'),), counts):
+                cumulative += c
+                le = '+Inf' if bound == float('inf') else _fmt_value(bound)
+                le_label = f'le="{le}"'
+                lines.append(f"{self.name}_bucket{_fmt_labels(self.labelnames, key, le_label)} {cumulative}")
+            labels = _fmt_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_fmt_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name, *args, **kwargs):
+        with self._lock:
+            if name not in self.metrics:
+                self.metrics[name] = cls(name, *args, **kwargs)
+            return self.metrics[name]
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._register(Counter, name, help_text, labelnames)
+
+    def gauge(self, name, help_text, labelnames=(), callback=None):
+        return self._register(Gauge, name, help_text, labelnames, callback=callback)
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram, name, help_text, labelnames, buckets=buckets)
+
+    def render(self):
+        lines = []
+        for metric in list(self.metrics.values()):
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+# ==========================================
+# METRIK BERSAMA (dipakai lintas modul)
+# ==========================================
+HTTP_LATENCY = REGISTRY.histogram(
+    'bmkg_http_request_duration_seconds', 'Latensi request Flask per route', ('route', 'method', 'status'))
+INFERENCE_LATENCY = REGISTRY.histogram(
+    'bmkg_inference_stage_seconds', 'Durasi tahap inferensi ModelHandler', ('model', 'stage'))
+INFERENCE_BATCH = REGISTRY.histogram(
+    'bmkg_inference_batch_size', 'Ukuran batch inferensi ModelHandler', ('model',), buckets=BATCH_BUCKETS)
+UPSTREAM_LATENCY = REGISTRY.histogram(
+    'bmkg_upstream_request_seconds', 'Latensi request ke upstream BMKG per feed', ('feed',))
+UPSTREAM_ERRORS = REGISTRY.counter(
+    'bmkg_upstream_errors_total', 'Jumlah error request upstream BMKG per feed', ('feed', 'reason'))
+CASCADE_TIER = REGISTRY.counter(
+    'bmkg_cascade_tier_total', 'Jumlah prediksi per tier cascade (fast / indobert) per head', ('head', 'tier'))
+WORD2VEC_LATENCY = REGISTRY.histogram(
+    'bmkg_word2vec_query_seconds', 'Latensi query most_similar Word2Vec')
+CACHE_REQUESTS = REGISTRY.counter(
+    'bmkg_cache_requests_total', 'Akses cache (hit/miss) per cache', ('cache', 'result'))
+
+
+def _cache_hit_ratios():
+    caches = {key[0] for key in list(CACHE_REQUESTS.values)}
+    for cache in caches:
+        hit = CACHE_REQUESTS.get(cache=cache, result='hit')
+        miss = CACHE_REQUESTS.get(cache=cache, result='miss')
+        if hit + miss:
+            yield {"cache": cache}, hit / (hit + miss)
+
+
+REGISTRY.gauge('bmkg_cache_hit_ratio', 'Rasio hit cache sejak proses start', ('cache',), callback=_cache_hit_ratios)
@@ -1,11 +1,25 @@
 import torch
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-import re
+import numpy as np
+from transformers import AutoTokenizer, AutoModel, AutoModelForSequenceClassification
 import os
+import json
+import time
+import threading
+from datetime import datetime
 import torch.nn.functional as F
+from utils.metrics import INFERENCE_LATENCY, INFERENCE_BATCH, CASCADE_TIER
+from utils.fast_classifier import FastClassifier
+from utils.student_model import load_student
+from utils.model_registry import ModelRegistry, HEADS
+from utils.recommendations import generate_recommendations
+from utils.preprocessing import clean_text
+
+# Teks warm-up versi baru sebelum swap (alokasi memori & kernel pertama tidak dibayar request user)
+WARMUP_TEXTS = ["aplikasi sering error saat buka radar cuaca", "info gempa cepat sangat membantu terima kasih"]
 
 class ModelHandler:
-    def __init__(self):
+    def __init__(self, backend='indobert', student_dir=None, cascade=False, cascade_threshold=0.85, fast_model_path=None,
+                 registry=None, metrics_path=None):
         # 1. Deteksi Device (GPU/CPU)
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         print(f"🔌 AI Engine Online: {self.device}")
@@ -14,141 +28,284 @@ class ModelHandler:
         base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         self.absa_path = os.path.join(base_dir, 'models', 'aspect_model')
         self.emotion_path = os.path.join(base_dir, 'models', 'emotion_model')
+        self.student_dir = student_dir or os.path.join(base_dir, 'models', 'student_model')
+        self.metrics_path = metrics_path or os.path.join(base_dir, 'static', 'model_metrics.json')
+        self.registry = registry or ModelRegistry(os.path.join(base_dir, 'models'))
+        self.backend = backend
 
         # 3. Label Mapping
         self.absa_labels = {0: "Akurasi", 1: "UI/UX", 2: "Performa", 3: "Lainnya"}
         self.emotion_labels = {0: "Marah", 1: "Takut", 2: "Bahagia", 3: "Sedih"}
 
-        # 4. Load Models
+        # 4. Load Models (versi aktif registry; tanpa registry -> direktori lama sesuai backend)
+        # self.models diganti utuh saat hot-swap, tidak pernah diubah di tempat
+        self.models = {}
+        self._embed_encoder = None  # Backend student: encoder IndoBERT aspek dimuat terpisah saat dibutuhkan
+        self.swap_status = {}
+        self._swap_lock = threading.Lock()
         try:
-            self.absa_tokenizer = AutoTokenizer.from_pretrained(self.absa_path)
-            self.absa_model = AutoModelForSequenceClassification.from_pretrained(self.absa_path).to(self.device).eval()
-            
-            self.emotion_tokenizer = AutoTokenizer.from_pretrained(self.emotion_path)
-            self.emotion_model = AutoModelForSequenceClassification.from_pretrained(self.emotion_path).to(self.device).eval()
+            self.models = {head: self._load_head(head) for head in HEADS}
         except Exception as e:
             print(f"❌ Error Loading Models: {e}")
 
+        # 5. Cascade: tier cepat (TF-IDF + SVM terkalibrasi) menjawab dulu, IndoBERT hanya jika ragu
+        self.cascade_threshold = cascade_threshold
+        self.fast_model = None
+        if cascade:
+            fast_model_path = fast_model_path or os.path.join(base_dir, 'models', 'fast_classifier.pkl')
+            try:
+                self.fast_model = FastClassifier.load(fast_model_path)
+                print(f"⚡ Cascade Aktif (threshold {cascade_threshold})")
+            except Exception as e:
+                print(f"⚠️ Cascade nonaktif, tier cepat gagal dimuat: {e} (jalankan scripts/14_train_fast_classifier.py)")
+
     def clean_text(self, text):
-        text = str(text).lower()
-        text = re.sub(r'http\S+', '', text)
-        text = re.sub(r'[^\w\s]', ' ', text)
-        return text.strip()
+        # Sama persis dengan cleaning dataset training (01/04)
+        return clean_text(text)
+
+    # ==========================================
+    # VERSI MODEL & HOT-SWAP
+    # ==========================================
+    def _resolve(self, head, version=None):
+        """-> {version, format, path, metrics} sesuai backend: versi aktif registry jika formatnya cocok, lalu versi
+        registry terbaru berformat backend, lalu direktori lama backend; versi eksplisit selalu dipakai apa adanya"""
+        if version:
+            return self.registry.get(head, version)
+        fmt = 'student' if self.backend == 'student' else 'hf'
+        active = self.registry.active(head)
+        if active and active['format'] == fmt:
+            return active
+        entry = self.registry.latest(head, fmt)
+        if entry is None:
+            if fmt == 'student':
+                entry = {"version": "unversioned", "format": "student", "path": os.path.join(self.student_dir, f'{head}.pt')}
+            else:
+                entry = {"version": "unversioned", "format": "hf", "path": self.absa_path if head == 'absa' else self.emotion_path}
+            if active and not os.path.exists(entry['path']):
+                # Tidak ada model berformat backend sama sekali: versi aktif registry dipakai (dilaporkan di metadata)
+                print(f"⚠️ {head}: tidak ada model '{fmt}' untuk MODEL_BACKEND={self.backend}, "
+                      f"memakai versi aktif registry {active['version']} ({active['format']})")
+                return active
+        if active:
+            print(f"ℹ️ {head}: versi aktif registry {active['version']} berformat {active['format']}, "
+                  f"MODEL_BACKEND={self.backend} -> memakai {entry['version']}")
+        return entry
+
+    @property
+    def served_backend(self):
+        """Backend yang benar-benar dimuat (bisa beda dari MODEL_BACKEND jika model berformat backend tidak ada)"""
+        formats = {bundle['format'] for bundle in self.models.values()}
+        if formats == {'student'}:
+            return 'student'
+        return 'indobert' if formats == {'hf'} else ('mixed' if formats else self.backend)
+
+    def _load_head(self, head, version=None):
+        spec = self._resolve(head, version)
+        if spec['format'] == 'student':
+            # Student hasil distilasi: antarmuka tokenizer/model sama, jalur inferensi tidak berubah
+            tokenizer, model = load_student(spec['path'], self.device)
+        else:
+            tokenizer = AutoTokenizer.from_pretrained(spec['path'])
+            model = AutoModelForSequenceClassification.from_pretrained(spec['path']).to(self.device).eval()
+        # Serving tidak butuh gradien: bobot read-only, halaman memori tetap dibagi antar worker hasil fork
+        model.requires_grad_(False)
+        return dict(spec, tokenizer=tokenizer, model=model, loaded_at=time.time())
+
+    def _warm_up(self, head, bundle):
+        """Forward pertama versi baru + cek jumlah label (model rusak/salah head tidak ikut di-swap)"""
+        id2label = self.absa_labels if head == 'absa' else self.emotion_labels
+        inputs = bundle['tokenizer'](WARMUP_TEXTS, return_tensors="pt", padding=True, truncation=True, max_length=128).to(self.device)
+        with torch.no_grad():
+            logits = bundle['model'](**inputs).logits
+        if logits.shape[1] != len(id2label):
+            raise ValueError(f"Model {bundle['version']} punya {logits.shape[1]} label, head '{head}' butuh {len(id2label)}")
+
+    def swap(self, head, version=None):
+        """Muat + warm-up versi baru, lalu ganti referensi sekaligus.
+        Request yang sedang berjalan sudah memegang snapshot self.models lama & selesai di versi lama."""
+        with self._swap_lock:
+            self.swap_status[head] = {"state": "loading", "version": version or "active", "since": time.time()}
+            try:
+                bundle = self._load_head(head, version)
+                self._warm_up(head, bundle)
+            except Exception as e:
+                self.swap_status[head] = {"state": "failed", "version": version or "active", "error": str(e), "since": time.time()}
+                print(f"❌ Hot-swap {head} gagal, tetap di versi lama: {e}")
+                raise
+            self.models = dict(self.models, **{head: bundle})
+            self.swap_status[head] = {"state": "ready", "version": bundle['version'], "since": time.time()}
+        print(f"🔄 Model {head} aktif: versi {bundle['version']}")
+        return bundle['version']
+
+    def swap_async(self, head, version=None):
+        def run():
+            try:
+                self.swap(head, version)
+            except Exception:
+                pass  # Sudah tercatat di swap_status
+        thread = threading.Thread(target=run, daemon=True, name=f"model-swap-{head}")
+        thread.start()
+        return thread
+
+    def activate(self, head, version=None):
+        """Pindahkan versi aktif registry (KeyError jika tidak ada) lalu swap di background.
+        Tanpa versi: muat ulang versi aktif (mis. setelah file model diganti)"""
+        if version:
+            self.registry.activate(head, version)
+        # Tanpa versi eksplisit: semua worker (watcher) memilih model yang sama lewat _resolve sesuai backend
+        self.swap_async(head)
+        return {"head": head, "version": version or "active", "state": "loading"}
+
+    def watch_registry(self, interval):
+        """Pantau mtime models/registry.json; tiap worker gunicorn memantau sendiri sehingga semua ikut swap"""
+        def loop():
+            last = self.registry.mtime()
+            while True:
+                time.sleep(interval)
+                mtime = self.registry.mtime()
+                if mtime == last:
+                    continue
+                last = mtime
+                for head in HEADS:
+                    try:
+                        entry = self._resolve(head)
+                        current = self.models.get(head)
+                        loading = self.swap_status.get(head, {}).get('state') == 'loading'  # Sudah dipicu endpoint admin
+                        if not loading and (current is None or entry['version'] != current['version']):
+                            self.swap(head)
+                    except Exception as e:
+                        print(f"⚠️ Registry watcher ({head}): {e}")
+        threading.Thread(target=loop, daemon=True, name="model-registry-watch").start()
+        print(f"👀 Registry model dipantau tiap {interval}s: {self.registry.path}")
+
+    def _published_metrics(self):
+        """Metrik evaluasi terakhir dari scripts/06_generate_metrics.py (untuk model tanpa versi)"""
+        try:
+            with open(self.metrics_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
 
     def get_model_metadata(self):
-        return {
-            "absa": {"name": "IndoBERT (Fine-Tuned)", "acc": "78.5%", "arch": "Transformer"},
-            "emotion": {"name": "IndoBERT (Fine-Tuned)", "acc": "72.3%", "arch": "Transformer"}
-        }
+        published = None
+        info = {}
+        for head, bundle in self.models.items():
+            student = bundle['format'] == 'student'
+            metrics = bundle.get('metrics')
+            if not metrics:
+                published = self._published_metrics() if published is None else published
+                metrics = published.get(f"{head}_student" if student else head) or {}
+            info[head] = {
+                "name": "Bi-LSTM Student (Distilasi IndoBERT)" if student else "IndoBERT (Fine-Tuned)",
+                "arch": "Bi-LSTM" if student else "Transformer",
+                "acc": f"{metrics['accuracy']}%" if 'accuracy' in metrics else "N/A",
+                "version": bundle['version'],
+                "format": bundle['format'],
+                "loaded_at": datetime.fromtimestamp(bundle['loaded_at']).isoformat(timespec='seconds'),
+                "metrics": {k: metrics[k] for k in ('accuracy', 'f1', 'single_ms', 'batch_ms_per_item') if k in metrics}
+            }
+        return dict(info, backend=self.served_backend, configured_backend=self.backend, swap=self.swap_status,
+                    cascade={"enabled": self.fast_model is not None, "threshold": self.cascade_threshold})
 
     def generate_recommendations(self, text, aspek, emosi):
-        """
-        LOGIC CERDAS V3: Context-Aware Recommendation Engine
-        Menangani kasus spesifik (Waktu, Widget, GPS) sebelum fallback ke prediksi AI.
-        """
-        txt = text.lower()
-        
-        # Default Output
-        recs = {
-            "action_dev": "Lakukan pengecekan log server pada timestamp laporan.",
-            "action_ux": "Evaluasi user journey terkait.",
-            "draft_reply": "Terima kasih atas laporannya. Kami akan segera menindaklanjuti."
-        }
-
-        # ==========================================
-        # KATEGORI 1: ZONA WAKTU (TIMEZONE)
-        # ==========================================
-        # Kasus: User di Papua/Bali bingung kenapa jam di aplikasi WIB
-        if any(x in txt for x in ['waktu', 'jam', 'wib', 'wita', 'wit', 'zona', 'papua', 'bali', 'makassar']):
-            if 'salah' in txt or 'beda' in txt or 'atur' in txt or 'bingung' in txt:
-                recs["action_dev"] = "🔧 Terapkan `DateTime.now().toLocal()` pada kode aplikasi agar otomatis mengikuti pengaturan jam HP user, bukan jam server Jakarta."
-                recs["action_ux"] = "🎨 Tambahkan opsi 'Ganti Zona Waktu' di menu Pengaturan agar user bisa memilih manual (WIB/WITA/WIT)."
-                recs["draft_reply"] = "Halo Kak, mohon maaf atas kebingungannya. Saat ini aplikasi memang default menggunakan WIB (Server). Namun, tim kami sedang mengerjakan update agar jam otomatis mengikuti lokasi Kakak (WIT/WITA). Terima kasih masukannya!"
-                return recs
-
-        # ==========================================
-        # KATEGORI 2: WIDGET & NOTIFIKASI
-        # ==========================================
-        if 'widget' in txt or 'layar depan' in txt or 'notif' in txt:
-            if 'mati' in txt or 'kosong' in txt or 'ilang' in txt or 'muncul' in txt:
-                recs["action_dev"] = "🔧 Cek `Background Service` pada Android 12+. Pastikan Widget Service tidak dimatikan oleh fitur 'Battery Saver' bawaan HP."
-                recs["action_ux"] = "🎨 Berikan tutorial singkat 'Cara Pasang Widget' saat user pertama kali instal aplikasi."
-                recs["draft_reply"] = "Halo Kak, jika widget tidak update/hilang, mohon pastikan fitur 'Penghemat Baterai' tidak membatasi aplikasi BMKG ya. Coba hapus dan pasang ulang widget-nya."
-                return recs
-
-        # ==========================================
-        # KATEGORI 3: LOKASI & GPS
-        # ==========================================
-        if 'lokasi' in txt or 'gps' in txt or 'tempat' in txt or 'kota' in txt:
-            if 'salah' in txt or 'jauh' in txt or 'ngaco' in txt or 'deteksi' in txt:
-                recs["action_dev"] = "🔧 Integrasikan Google Places API untuk akurasi lebih tinggi. Cek izin akses lokasi (Fine Location)."
-                recs["action_ux"] = "🎨 Tampilkan nama Kecamatan/Kelurahan di header aplikasi, bukan hanya koordinat angka."
-                recs["draft_reply"] = "Halo Kak, pastikan GPS di HP sudah aktif dan izin lokasi diberikan ke aplikasi ya. Terkadang sinyal yang lemah membuat deteksi lokasi meleset ke tower terdekat."
-                return recs
-
-        # ==========================================
-        # KATEGORI 4: GEMPA BUMI (BENCANA)
-        # ==========================================
-        if "gempa" in txt or "guncang" in txt or "magnitude" in txt:
-            recs["action_dev"] = "🔥 CRITICAL: Pastikan latency Push Notification via FCM di bawah 3 detik."
-            recs["action_ux"] = "🎨 Gunakan warna Merah Dominan dan Font Besar saat Mode Warning Gempa aktif."
-            recs["draft_reply"] = "Tetap waspada Kak! Kami memprioritaskan kecepatan info gempa. Jika notifikasi telat, kemungkinan karena antrian trafik operator seluler yang padat saat kejadian."
-            return recs
-
-        # ==========================================
-        # KATEGORI 5: CUACA & HUJAN
-        # ==========================================
-        if "hujan" in txt or "panas" in txt or "cuaca" in txt or "mendung" in txt:
-            recs["action_dev"] = "🔧 Kalibrasi data radar cuaca dengan stasiun pengamatan terdekat."
-            recs["action_ux"] = "🎨 Tampilkan persentase 'Peluang Hujan' (misal: 80%) agar user tidak kecewa jika meleset."
-            recs["draft_reply"] = "Halo Kak, cuaca tropis sangat dinamis dan bisa berubah hitungan menit. Kami terus mengkalibrasi radar kami agar prediksi semakin akurat. Sedia payung sebelum hujan ya!"
-            return recs
-
-        # ==========================================
-        # KATEGORI 6: GENERAL UI/UX & PERFORMA (Fallback AI)
-        # ==========================================
-        # Jika tidak ada kata kunci spesifik di atas, gunakan prediksi Model IndoBERT
-        if aspek == "UI/UX":
-            recs["action_dev"] = "🔧 Cek responsivitas layout XML pada perangkat dengan DPI rendah/tinggi."
-            recs["action_ux"] = "🎨 Lakukan A/B Testing pada menu navigasi. Pertimbangkan Dark Mode jika banyak user mengeluh silau."
-            recs["draft_reply"] = "Terima kasih feedback-nya Kak. Kami sadar tampilan perlu penyegaran. Tim desain kami sedang menyiapkan update antarmuka (UI) yang lebih modern."
-        
-        elif aspek == "Performa":
-            recs["action_dev"] = "🔧 Profiling memori (Memory Leak Check). Optimasi query database lokal (SQLite/Realm)."
-            recs["action_ux"] = "🎨 Tampilkan 'Skeleton Loading' (bayangan abu-abu) saat data sedang dimuat agar aplikasi tidak terkesan macet."
-            recs["draft_reply"] = "Mohon maaf atas kendalanya. Silakan coba 'Clear Cache' atau instal ulang aplikasi. Tim kami terus bekerja keras mengoptimalkan performa server."
-        
-        elif aspek == "Akurasi":
-            recs["action_dev"] = "🔧 Validasi data backend dengan data observasi lapangan."
-            recs["action_ux"] = "🎨 Berikan label waktu 'Data Diperbarui: xx menit lalu' agar user tahu validitas data."
-            recs["draft_reply"] = "Halo Kak, terima kasih laporannya. Ketepatan data adalah prioritas kami. Laporan ini akan kami jadikan bahan evaluasi tim teknis."
+        return generate_recommendations(text, aspek, emosi)
+
+    def _classify(self, name, tokenizer, model, batch):
+        """1 model, 1 batch: tokenize -> forward -> softmax (tiap tahap tercatat di /metrics)"""
+        INFERENCE_BATCH.observe(len(batch), model=name)
+        with INFERENCE_LATENCY.time(model=name, stage='tokenize'):
+            inputs = tokenizer(batch, return_tensors="pt", padding=True, truncation=True, max_length=128).to(self.device)
+        with INFERENCE_LATENCY.time(model=name, stage='forward'):
+            with torch.no_grad():
+                logits = model(**inputs).logits
+        with INFERENCE_LATENCY.time(model=name, stage='postprocess'):
+            conf, pred = torch.max(F.softmax(logits, dim=1), dim=1)
+            return conf.tolist(), pred.tolist()
+
+    def _run_head(self, name, bundle, batch):
+        """1 head untuk 1 batch -> list (label, conf, tier); IndoBERT hanya untuk item di bawah threshold"""
+        tokenizer, model = bundle['tokenizer'], bundle['model']
+        id2label = self.absa_labels if name == 'absa' else self.emotion_labels
+
+        results = [None] * len(batch)
+        pending = list(range(len(batch)))
+        if self.fast_model:
+            with INFERENCE_LATENCY.time(model=f'fast_{name}', stage='forward'):
+                labels, confs = self.fast_model.predict(name, batch)
+            pending = []
+            for i, (label, conf) in enumerate(zip(labels, confs)):
+                if conf >= self.cascade_threshold:
+                    results[i] = (label, conf, 'fast')
+                else:
+                    pending.append(i)
+            CASCADE_TIER.inc(len(batch) - len(pending), head=name, tier='fast')
+            CASCADE_TIER.inc(len(pending), head=name, tier='indobert')
+
+        if pending:
+            confs, preds = self._classify(name, tokenizer, model, [batch[i] for i in pending])
+            for i, conf, pred in zip(pending, confs, preds):
+                results[i] = (id2label[pred], conf, 'indobert')
+        return results
+
+    def predict_batch(self, texts, batch_size=32):
+        """Klasifikasi Aspek & Emosi untuk banyak teks sekaligus (tanpa rekomendasi)"""
+        models = self.models  # Snapshot: hot-swap di tengah request tidak mencampur versi
+        results = []
+        for i in range(0, len(texts), batch_size):
+            batch = [self.clean_text(t) for t in texts[i:i+batch_size]]
+
+            absa = self._run_head('absa', models['absa'], batch)
+            emotion = self._run_head('emotion', models['emotion'], batch)
+
+            for (pa, ca, ta), (pe, ce, te) in zip(absa, emotion):
+                results.append({
+                    "aspek": pa,
+                    "aspek_conf": round(ca * 100, 1),
+                    "aspek_tier": ta,
+                    "emosi": pe.title(),
+                    "emosi_conf": round(ce * 100, 1),
+                    "emosi_tier": te
+                })
+        return results
 
-        return recs
+    # ==========================================
+    # EMBEDDING KALIMAT (KELUHAN SERUPA)
+    # ==========================================
+    def _encoder(self):
+        """-> (versi, tokenizer, encoder): IndoBERT fine-tuned head aspek tanpa lapisan klasifikasi.
+        Student Bi-LSTM tidak punya encoder kalimat -> direktori IndoBERT aspek dimuat sekali."""
+        bundle = self.models['absa']
+        if bundle['format'] != 'student':
+            return bundle['version'], bundle['tokenizer'], bundle['model'].base_model
+        if self._embed_encoder is None:
+            encoder = AutoModel.from_pretrained(self.absa_path).to(self.device).eval()
+            encoder.requires_grad_(False)
+            self._embed_encoder = ("unversioned", AutoTokenizer.from_pretrained(self.absa_path), encoder)
+        return self._embed_encoder
+
+    def embedding_version(self):
+        return self._encoder()[0]
+
+    def embed_batch(self, texts, batch_size=32):
+        """-> (versi encoder, float32 n x dim): mean pooling hidden state terakhir (tanpa padding), normalisasi L2"""
+        version, tokenizer, encoder = self._encoder()
+        chunks = [np.zeros((0, encoder.config.hidden_size), dtype=np.float32)]
+        for i in range(0, len(texts), batch_size):
+            batch = [self.clean_text(t) for t in texts[i:i+batch_size]]
+            INFERENCE_BATCH.observe(len(batch), model='embed')
+            with INFERENCE_LATENCY.time(model='embed', stage='forward'):
+                inputs = tokenizer(batch, return_tensors="pt", padding=True, truncation=True, max_length=128).to(self.device)
+                with torch.no_grad():
+                    hidden = encoder(**inputs).last_hidden_state
+                    mask = inputs['attention_mask'].unsqueeze(-1).to(hidden.dtype)
+                    pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+                chunks.append(F.normalize(pooled, dim=1).cpu().numpy())
+        return version, np.concatenate(chunks)
 
     def predict(self, text):
-        clean_txt = self.clean_text(text)
-        
         # 1. Prediksi AI (Deep Learning)
-        inp_absa = self.absa_tokenizer(clean_txt, return_tensors="pt", truncation=True, max_length=128).to(self.device)
-        inp_emo = self.emotion_tokenizer(clean_txt, return_tensors="pt", truncation=True, max_length=128).to(self.device)
-        
-        with torch.no_grad():
-            prob_absa = F.softmax(self.absa_model(**inp_absa).logits, dim=1)
-            conf_absa, pred_absa = torch.max(prob_absa, dim=1)
-            
-            prob_emo = F.softmax(self.emotion_model(**inp_emo).logits, dim=1)
-            conf_emo, pred_emo = torch.max(prob_emo, dim=1)
-
-        aspek = self.absa_labels[pred_absa.item()]
-        emosi = self.emotion_labels[pred_emo.item()].title()
-        
+        result = self.predict_batch([text])[0]
+
         # 2. Generate Logic (Rule-Based Expert System)
-        recommendations = self.generate_recommendations(text, aspek, emosi)
-
-        return {
-            "aspek": aspek,
-            "aspek_conf": round(conf_absa.item() * 100, 1),
-            "emosi": emosi,
-            "emosi_conf": round(conf_emo.item() * 100, 1),
-            "recommendations": recommendations 
-        }
\ No newline at end of file
+        result["recommendations"] = self.generate_recommendations(text, result["aspek"], result["emosi"])
+        return result
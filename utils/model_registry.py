@@ -0,0 +1,113 @@
+"""
+Registry Versi Model (models/registry.json)
+Tiap head (absa/emotion) punya banyak versi di models/versions/<head>/<versi>/ + satu pointer versi aktif.
+ModelHandler memantau mtime registry: versi aktif berubah -> muat + warm-up di background -> swap atomik.
+Tanpa registry, ModelHandler tetap memakai direktori lama (models/aspect_model, models/emotion_model).
+"""
+import json
+import os
+import shutil
+from datetime import datetime
+
+HEADS = ('absa', 'emotion')
+
+
+class ModelRegistry:
+    def __init__(self, models_dir):
+        self.models_dir = models_dir
+        self.path = os.path.join(models_dir, 'registry.json')
+
+    # ==========================================
+    # 1. BACA MANIFEST
+    # ==========================================
+    def load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def mtime(self):
+        try:
+            return os.path.getmtime(self.path)
+        except OSError:
+            return None
+
+    def _entry(self, head, version, entry):
+        """Entry manifest + versi & path absolut (path di manifest relatif ke models/)"""
+        return dict(entry, version=version, path=os.path.join(self.models_dir, entry['path']))
+
+    def get(self, head, version):
+        entry = self.load().get(head, {}).get('versions', {}).get(version)
+        if entry is None:
+            raise KeyError(f"Versi '{version}' untuk head '{head}' tidak ada di registry")
+        return self._entry(head, version, entry)
+
+    def active(self, head):
+        """-> entry versi aktif, atau None jika head belum pernah didaftarkan"""
+        info = self.load().get(head, {})
+        version = info.get('active')
+        if not version:
+            return None
+        return self._entry(head, version, info['versions'][version])
+
+    def latest(self, head, fmt):
+        """-> entry terbaru (waktu dibuat) berformat `fmt` ('hf' / 'student'), atau None"""
+        versions = self.load().get(head, {}).get('versions', {})
+        matching = [(entry.get('created', ''), version) for version, entry in versions.items() if entry.get('format') == fmt]
+        if not matching:
+            return None
+        version = max(matching)[1]
+        return self._entry(head, version, versions[version])
+
+    # ==========================================
+    # 2. TULIS MANIFEST (DIPAKAI scripts/16_model_registry.py & endpoint admin)
+    # ==========================================
+    def _save(self, manifest):
+        # Tulis atomik: watcher di worker lain tidak pernah membaca JSON setengah jadi
+        os.makedirs(self.models_dir, exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def register(self, head, src, version=None, metrics=None, note='', activate=False):
+        """Salin model hasil training (folder HF atau file .pt student) ke folder versi baru"""
+        if head not in HEADS:
+            raise ValueError(f"Head tidak dikenal: {head}")
+        fmt = 'student' if os.path.isfile(src) else 'hf'
+        version = version or datetime.now().strftime('v%Y%m%d-%H%M%S')
+        manifest = self.load()
+        info = manifest.setdefault(head, {"active": None, "versions": {}})
+        if version in info['versions']:
+            raise ValueError(f"Versi '{version}' untuk head '{head}' sudah ada")
+
+        version_dir = os.path.join(self.models_dir, 'versions', head, version)
+        if fmt == 'hf':
+            # Checkpoint Trainer tidak dipakai serving, cukup bobot final + tokenizer
+            shutil.copytree(src, version_dir, ignore=shutil.ignore_patterns('checkpoint-*'))
+            target = version_dir
+        else:
+            os.makedirs(version_dir)
+            target = os.path.join(version_dir, os.path.basename(src))
+            shutil.copy2(src, target)
+
+        info['versions'][version] = {
+            "format": fmt,
+            "path": os.path.relpath(target, self.models_dir),
+            "created": datetime.now().isoformat(timespec='seconds'),
+            "metrics": metrics or {},
+            "note": note
+        }
+        if activate or not info['active']:
+            info['active'] = version
+        self._save(manifest)
+        return version
+
+    def activate(self, head, version):
+        """Pindahkan pointer versi aktif (rollback = aktifkan versi lama)"""
+        manifest = self.load()
+        if version not in manifest.get(head, {}).get('versions', {}):
+            raise KeyError(f"Versi '{version}' untuk head '{head}' tidak ada di registry")
+        manifest[head]['active'] = version
+        self._save(manifest)
@@ -0,0 +1,150 @@
+"""
+Deteksi Review Hampir Duplikat (MinHash + LSH)
+- shingles       : byte k-gram teks ter-normalisasi (clean + slang + huruf berulang dipadatkan), dikemas jadi uint64
+- minhash        : signature num_perm per review, dihitung per permutasi atas SEMUA shingle sekaligus (reduceat)
+- LSH banding    : b band x r baris; review dengan band identik = kandidat, diverifikasi estimasi Jaccard
+- cluster        : komponen terhubung pasangan >= threshold; representatif = anggota pertama (urutan arsip)
+Biaya ~O(total shingle x num_perm + n x band), bukan O(n^2) perbandingan pasangan.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+from utils.preprocessing import clean_series
+
+SHINGLE_SIZE = 5  # Byte; k <= 6 agar k-gram + penanda teks pendek muat di uint64
+SHORT_MARK = np.uint64(1 << 56)
+ELONGATION_RE = re.compile(r'(\w)\1{2,}')  # "tolonggggg" -> "tolong", "bangettt" -> "banget"
+
+
+def normalize_for_dedupe(texts):
+    """Teks mentah -> bentuk pembanding (emoji/tanda baca hilang lewat clean, slang & elongasi diseragamkan)"""
+    cleaned = clean_series(pd.Series(texts, dtype=object), slang=True)
+    return [ELONGATION_RE.sub(r'\1', t) for t in cleaned]
+
+
+def shingles(texts, k=SHINGLE_SIZE):
+    """Semua k-gram semua teks dalam 1 array uint64 (k byte dikemas big-endian, tanpa hash per string di Python)
+    -> (grams, starts): k-gram review i = grams[starts[i]:starts[i+1]]. Teks < k byte = 1 shingle utuh bertanda.
+    Duplikat k-gram dalam 1 teks tidak dibuang: min atas multiset = min atas set."""
+    encoded = [t.encode('utf-8') for t in texts]
+    lengths = np.array([len(e) for e in encoded], dtype=np.int64)
+    blob = np.frombuffer(b''.join(encoded) + bytes(k), dtype=np.uint8).astype(np.uint64)  # Padding: window terakhir tetap valid
+    ends = np.cumsum(lengths)
+    begins = ends - lengths
+
+    n_windows = max(int(lengths.sum()), 1)
+    grams = np.zeros(n_windows, dtype=np.uint64)
+    for j in range(k):
+        grams <<= np.uint64(8)
+        grams |= blob[j:j + n_windows]
+
+    # Window valid = tidak melewati akhir teksnya; teks pendek diwakili 1 window di posisi awalnya
+    counts = np.maximum(lengths - k + 1, 1)
+    doc = np.repeat(np.arange(len(texts)), counts)
+    offset = np.arange(len(doc)) - np.repeat(np.cumsum(counts) - counts, counts)
+    positions = np.repeat(begins, counts) + offset
+    grams = grams[np.minimum(positions, n_windows - 1)]
+    short = lengths[doc] < k
+    if short.any():
+        # Byte setelah teks pendek ikut terbaca -> buang dengan shift, lalu beri penanda panjang
+        drop = ((k - lengths[doc][short]) * 8).astype(np.uint64)
+        grams[short] = (grams[short] >> drop) | SHORT_MARK | (lengths[doc][short].astype(np.uint64) << np.uint64(48))
+    return grams, np.cumsum(counts) - counts
+
+
+def choose_bands(num_perm, threshold):
+    """(band, baris) dengan b x r = num_perm; titik belok (1/b)^(1/r) paling dekat di bawah threshold
+    (sedikit di bawah: pasangan di sekitar threshold tetap jadi kandidat, diverifikasi kemudian)"""
+    options = [(num_perm // r, r) for r in range(1, num_perm + 1) if num_perm % r == 0]
+    below = [(b, r) for b, r in options if (1 / b) ** (1 / r) <= threshold]
+    return max(below or options[:1], key=lambda br: (1 / br[0]) ** (1 / br[1]))
+
+
+class MinHashLSH:
+    def __init__(self, threshold=0.8, num_perm=128, k=SHINGLE_SIZE, seed=42):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.k = k
+        self.bands, self.rows = choose_bands(num_perm, threshold)
+        rng = np.random.default_rng(seed)
+        # Hash multiply-shift h(x) = (a*x + b) >> 32 (overflow uint64 disengaja, a ganjil): tanpa modulo yang mahal
+        self.a = rng.integers(0, np.iinfo(np.uint64).max, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self.b = rng.integers(0, np.iinfo(np.uint64).max, size=num_perm, dtype=np.uint64)
+
+    def signatures(self, texts):
+        """-> uint32 n x num_perm. Semua shingle digabung 1 array; min per review lewat np.minimum.reduceat"""
+        flat, starts = shingles(texts, self.k)
+        sigs = np.empty((len(texts), self.num_perm), dtype=np.uint32)
+        permuted = np.empty_like(flat)
+        for i in range(self.num_perm):
+            np.multiply(flat, self.a[i], out=permuted)
+            permuted += self.b[i]
+            permuted >>= np.uint64(32)
+            sigs[:, i] = np.minimum.reduceat(permuted, starts)
+        return sigs
+
+    def candidate_pairs(self, sigs):
+        """Per band: review dengan potongan signature identik masuk 1 bucket.
+        Tiap anggota bucket dipasangkan dengan anggota pertamanya saja (bucket template besar tidak meledak kuadratik)"""
+        pairs = []
+        for band in range(self.bands):
+            chunk = np.ascontiguousarray(sigs[:, band * self.rows:(band + 1) * self.rows])
+            keys = chunk.view(np.dtype((np.void, chunk.dtype.itemsize * self.rows))).ravel()
+            _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+            leader = first[inverse.ravel()]
+            member = np.flatnonzero(leader != np.arange(len(keys)))
+            pairs.append(np.stack([leader[member], member], axis=1))
+        pairs = np.concatenate(pairs) if pairs else np.zeros((0, 2), dtype=np.int64)
+        return np.unique(pairs, axis=0)
+
+    def cluster(self, texts):
+        """-> (cluster id per review, jumlah pasangan terverifikasi); cluster id = indeks representatif"""
+        n = len(texts)
+        sigs = self.signatures(texts)
+        pairs = self.candidate_pairs(sigs)
+        if len(pairs):
+            similarity = (sigs[pairs[:, 0]] == sigs[pairs[:, 1]]).mean(axis=1)
+            pairs = pairs[similarity >= self.threshold]
+        graph = coo_matrix((np.ones(len(pairs), dtype=np.int8), (pairs[:, 0], pairs[:, 1])), shape=(n, n))
+        _, labels = connected_components(graph, directed=False)
+        # Representatif = baris pertama tiap komponen
+        first = np.full(labels.max() + 1 if n else 0, n, dtype=np.int64)
+        np.minimum.at(first, labels, np.arange(n))
+        return first[labels], len(pairs)
+
+
+def dedupe_frame(df, text_column='Komentar', threshold=0.8, num_perm=128):
+    """-> (df representatif + kolom Dup_Count = ukuran cluster, df lengkap + Dup_Cluster = indeks representatif)"""
+    df = df.reset_index(drop=True)
+    lsh = MinHashLSH(threshold=threshold, num_perm=num_perm)
+    clusters, _ = lsh.cluster(normalize_for_dedupe(df[text_column].tolist()))
+    df['Dup_Cluster'] = clusters
+    df['Dup_Count'] = df.groupby('Dup_Cluster')['Dup_Cluster'].transform('size')
+    representatives = df[df['Dup_Cluster'] == df.index].drop(columns='Dup_Cluster')
+    return representatives, df
+
+
+def cluster_report(full, text_column='Komentar', top=20, examples=5):
+    """Cluster terbesar + contoh anggota (audit threshold)"""
+    dup = full[full['Dup_Count'] > 1]
+    sizes = dup.groupby('Dup_Cluster').size().sort_values(ascending=False).head(top)
+    return [{"size": int(size), "representative": str(full.at[cid, text_column]),
+             "examples": dup.loc[dup['Dup_Cluster'] == cid, text_column].astype(str).head(examples).tolist()}
+            for cid, size in sizes.items()]
+
+
+def propagate_labels(full, labeled, columns):
+    """Label representatif -> semua anggota cluster-nya (tren & hitungan keluhan tetap per review).
+    Dup_Representative menandai baris yang benar-benar dilabeli (input training / evaluasi)."""
+    out = full.join(labeled[columns], on='Dup_Cluster')
+    out['Dup_Representative'] = out['Dup_Cluster'] == out.index
+    return out.drop(columns='Dup_Cluster')
+
+
+def representatives(df):
+    """Baris unik untuk training / evaluasi; CSV tanpa kolom Dup_Representative (dedupe mati) = semua baris"""
+    return df[df['Dup_Representative'].astype(bool)] if 'Dup_Representative' in df else df
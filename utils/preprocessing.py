@@ -0,0 +1,145 @@
+"""
+Preprocessing Teks Bersama (training, serving, Word2Vec, WordCloud)
+Satu definisi cleaning untuk semua jalur -> model melihat teks yang identik saat training & inferensi.
+- clean_text(text)      : 1 teks (serving /analyze, ingest)
+- clean_series(series)  : seluruh kolom; tiap nilai unik diproses sekali (tanpa .apply per baris)
+- SLANG                 : tabel slang -> kata baku ("gak"/"ga"/"gk" -> "tidak")
+- Stemmer               : Sastrawi opsional, cache per kata di disk (Sastrawi ~puluhan ms per kata baru)
+
+Default MODEL_SLANG/MODEL_STEM dipakai 01/04 (training) & ModelHandler (serving) sekaligus.
+Mengubahnya berarti dataset & model harus dibuat ulang (01 -> 02/04 -> 14/15).
+"""
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+try:
+    from Sastrawi.Stemmer.StemmerFactory import StemmerFactory  # Opsional: stemming bahasa Indonesia
+except ImportError:
+    StemmerFactory = None
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STEM_CACHE_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'stem_cache.json')
+
+URL_RE = re.compile(r'http\S+')
+NON_WORD_RE = re.compile(r'[^\w\s]')
+
+# Pipeline classifier (training 01/04 & serving ModelHandler harus sama)
+MODEL_SLANG = False
+MODEL_STEM = False
+
+# ==========================================
+# 1. TABEL SLANG (REVIEW PLAY STORE)
+# ==========================================
+SLANG = {
+    # Negasi
+    'gak': 'tidak', 'ga': 'tidak', 'gk': 'tidak', 'ngga': 'tidak', 'nggak': 'tidak', 'enggak': 'tidak',
+    'engga': 'tidak', 'tdk': 'tidak', 'kagak': 'tidak', 'gaada': 'tidak ada', 'gabisa': 'tidak bisa',
+    'blm': 'belum', 'bkn': 'bukan',
+    # Kata tugas
+    'yg': 'yang', 'dgn': 'dengan', 'utk': 'untuk', 'untk': 'untuk', 'krn': 'karena', 'karna': 'karena',
+    'tp': 'tapi', 'tpi': 'tapi', 'jg': 'juga', 'aja': 'saja', 'dr': 'dari', 'kalo': 'kalau', 'klo': 'kalau',
+    'sm': 'sama', 'lg': 'lagi', 'trs': 'terus', 'trus': 'terus', 'dpt': 'dapat', 'hrs': 'harus',
+    'sdh': 'sudah', 'udh': 'sudah', 'udah': 'sudah', 'dah': 'sudah', 'skrg': 'sekarang', 'skrng': 'sekarang',
+    'gmn': 'bagaimana', 'gimana': 'bagaimana', 'knp': 'kenapa', 'napa': 'kenapa', 'gitu': 'begitu',
+    'gini': 'begini', 'emang': 'memang', 'emg': 'memang', 'ntar': 'nanti', 'bs': 'bisa', 'sy': 'saya',
+    'org': 'orang', 'bgt': 'banget',
+    # Khas ulasan aplikasi
+    'apk': 'aplikasi', 'app': 'aplikasi', 'apps': 'aplikasi', 'lemot': 'lambat', 'lelet': 'lambat',
+    'bener': 'benar', 'mantul': 'mantap', 'notif': 'notifikasi', 'makasih': 'terima kasih',
+    'mksh': 'terima kasih', 'thx': 'terima kasih', 'tks': 'terima kasih',
+}
+# Kata terpanjang dulu agar alternasi regex tidak berhenti di awalan yang lebih pendek
+SLANG_RE = re.compile(r'\b(' + '|'.join(sorted(map(re.escape, SLANG), key=len, reverse=True)) + r')\b')
+
+
+def _slang_sub(match):
+    return SLANG[match.group(1)]
+
+
+def normalize_slang(text):
+    """Teks yang sudah di-clean (lowercase, tanpa tanda baca) -> slang diganti kata baku"""
+    return SLANG_RE.sub(_slang_sub, text)
+
+
+# ==========================================
+# 2. STEMMING (SASTRAWI + CACHE PER KATA)
+# ==========================================
+class Stemmer:
+    """Kosakata review jauh lebih kecil dari jumlah token: tiap kata cukup di-stem sekali seumur cache"""
+    def __init__(self, cache_path=None):
+        if StemmerFactory is None:
+            raise ImportError("Sastrawi belum terpasang (pip install Sastrawi)")
+        self._stemmer = StemmerFactory().create_stemmer()
+        self.cache_path = cache_path
+        self.cache = {}
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path) as f:
+                self.cache = json.load(f)
+        self._saved = len(self.cache)
+
+    def stem_word(self, word):
+        stem = self.cache.get(word)
+        if stem is None:
+            stem = self.cache[word] = self._stemmer.stem(word)
+        return stem
+
+    def stem(self, text):
+        return ' '.join(self.stem_word(w) for w in text.split())
+
+    def save(self):
+        """Simpan cache jika ada kata baru (dipanggil setelah memproses 1 kolom)"""
+        if not self.cache_path or len(self.cache) == self._saved:
+            return
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.cache, f, ensure_ascii=False)
+        os.replace(tmp_path, self.cache_path)
+        self._saved = len(self.cache)
+
+
+_stemmer = None
+
+
+def get_stemmer():
+    """Stemmer bersama per proses (cache kata dipakai ulang antar panggilan)"""
+    global _stemmer
+    if _stemmer is None:
+        _stemmer = Stemmer(STEM_CACHE_PATH)
+    return _stemmer
+
+
+# ==========================================
+# 3. CLEANING
+# ==========================================
+def clean_text(text, slang=MODEL_SLANG, stem=MODEL_STEM):
+    """Lowercase, hapus URL & tanda baca, rapikan spasi (+ slang / stemming opsional)"""
+    if not isinstance(text, str):
+        text = '' if text is None or text != text else str(text)  # None / NaN -> ''
+    text = NON_WORD_RE.sub(' ', URL_RE.sub('', text.lower()))
+    text = ' '.join(text.split())
+    if slang:
+        text = normalize_slang(text)
+    if stem:
+        text = get_stemmer().stem(text)
+    return text
+
+
+def clean_series(series, slang=MODEL_SLANG, stem=MODEL_STEM):
+    """Versi kolom dari clean_text (hasil identik per baris).
+    Tiap nilai unik diproses sekali lalu dipetakan balik; rantai .str.replace (1 pass per pola)
+    terukur ~2x lebih lambat dari clean_text 1 pass (lihat scripts/12_perf_benchmark.py)."""
+    codes, uniques = series.factorize()
+    cleaned = np.array([clean_text(t, slang=slang, stem=stem) for t in uniques] + [''], dtype=object)
+    if stem:
+        get_stemmer().save()
+    return pd.Series(cleaned[codes], index=series.index, name=series.name)  # code -1 (NaN) -> ''
+
+
+def tokenize_series(series, slang=True):
+    """Kolom teks mentah -> list token (Word2Vec)"""
+    return clean_series(series, slang=slang).str.split().tolist()
@@ -0,0 +1,187 @@
+"""
+Arsip Riwayat Gempa (SQLite + R-tree)
+Feed BMKG hanya menyimpan 15 gempa terakhir (gempaterkini) + 1 terkini (autogempa); arsip ini menampung
+semua event yang pernah terlihat poller, tanpa duplikat:
+- quakes       : 1 baris per event, kunci unik (waktu UTC, lat, lon); revisi magnitudo/wilayah BMKG menimpa baris lama
+- index        : ts (rentang waktu), (mag, ts) (filter magnitudo minimum)
+- quakes_rtree : R-tree titik episentrum (query bbox tanpa scan seluruh arsip)
+Mode WAL: poller (app / scripts/22_quake_poller.py) menulis, banyak worker membaca bersamaan.
+Query memilih 1 dari 3 jalur (estimasi baris dari statistik ter-cache): scan index waktu terbaru-dulu sampai
+limit terpenuhi, kandidat R-tree (bbox sempit), atau index magnitudo (magnitudo minimum tinggi).
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+DEPTH_RE = re.compile(r'[-\d.]+')
+EXTENT = (90.0, -15.0, 145.0, 10.0)  # Cakupan katalog BMKG (min_lon, min_lat, max_lon, max_lat) untuk estimasi selektivitas bbox
+STATS_TTL = 600  # Detik; statistik planner (jumlah, rentang waktu, histogram magnitudo) dihitung ulang
+LOOKUP_COST = 3  # Biaya relatif lookup baris via id (R-tree / index magnitudo) dibanding scan index waktu
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS quakes (
+    id INTEGER PRIMARY KEY,
+    ts INTEGER NOT NULL,
+    lat REAL NOT NULL,
+    lon REAL NOT NULL,
+    mag REAL NOT NULL,
+    depth_km REAL,
+    wilayah TEXT,
+    potensi TEXT,
+    dirasakan TEXT,
+    shakemap TEXT,
+    jam TEXT,
+    UNIQUE (ts, lat, lon)
+);
+CREATE INDEX IF NOT EXISTS quakes_ts ON quakes (ts);
+CREATE INDEX IF NOT EXISTS quakes_mag_ts ON quakes (mag, ts);
+CREATE VIRTUAL TABLE IF NOT EXISTS quakes_rtree USING rtree (id, min_lat, max_lat, min_lon, max_lon);
+"""
+FIELDS = ('ts', 'lat', 'lon', 'mag', 'depth_km', 'wilayah', 'potensi', 'dirasakan', 'shakemap', 'jam')
+UPDATE_FIELDS = ('mag', 'depth_km', 'wilayah', 'potensi', 'dirasakan', 'shakemap')  # Boleh direvisi BMKG
+
+
+def parse_quake(q):
+    """Dict gempa BMKGHandler (get_latest_quake / get_recent_quakes) -> baris arsip; None jika tanpa waktu/koordinat"""
+    try:
+        ts = datetime.fromisoformat(q['datetime'].replace('Z', '+00:00'))
+        lat, lon = (float(v) for v in q['koordinat'].split(','))
+        depth = DEPTH_RE.search(str(q.get('kedalaman', '')))
+        return {
+            "ts": int(ts.replace(tzinfo=ts.tzinfo or timezone.utc).timestamp()),
+            "lat": round(lat, 4), "lon": round(lon, 4), "mag": float(q['magnitudo']),
+            "depth_km": float(depth.group()) if depth else None,
+            "wilayah": q.get('wilayah'), "potensi": q.get('potensi'), "dirasakan": q.get('dirasakan'),
+            "shakemap": q.get('shakemap'), "jam": q.get('jam')
+        }
+    except (KeyError, TypeError, ValueError, AttributeError):
+        return None
+
+
+class QuakeHistory:
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()  # 1 koneksi per thread (sqlite3 tidak berbagi koneksi antar thread)
+        self._stats = None
+        self._stats_at = 0.0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._conn() as conn:
+            conn.executescript(SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    # ==========================================
+    # 1. APPEND (DEDUPE)
+    # ==========================================
+    def add(self, quakes):
+        """Event mentah BMKGHandler -> jumlah event BARU; event lama dengan data berubah (revisi) diperbarui"""
+        rows = [r for r in (parse_quake(q) for q in quakes if q) if r]
+        new = 0
+        with self._conn() as conn:
+            for r in rows:
+                cur = conn.execute(f"INSERT OR IGNORE INTO quakes ({', '.join(FIELDS)}) VALUES ({', '.join('?' * len(FIELDS))})",
+                                   [r[f] for f in FIELDS])
+                if cur.rowcount:
+                    conn.execute("INSERT INTO quakes_rtree VALUES (?, ?, ?, ?, ?)",
+                                 (cur.lastrowid, r['lat'], r['lat'], r['lon'], r['lon']))
+                    new += 1
+                else:
+                    # COALESCE: feed yang tidak membawa field (gempaterkini tanpa Dirasakan/Shakemap) tidak menghapus nilai lama
+                    conn.execute(f"UPDATE quakes SET {', '.join(f'{f} = COALESCE(?, {f})' for f in UPDATE_FIELDS)} "
+                                 "WHERE ts = ? AND lat = ? AND lon = ?",
+                                 [r[f] for f in UPDATE_FIELDS] + [r['ts'], r['lat'], r['lon']])
+        if self._stats is not None and new > self._stats[0] * 0.1:
+            self._stats = None  # Arsip tumbuh >10%: statistik planner dihitung ulang di query berikutnya
+        return new
+
+    # ==========================================
+    # 2. QUERY
+    # ==========================================
+    def _planner_stats(self):
+        """(jumlah event, ts pertama, ts terakhir, fraksi event per magnitudo >= m dalam bin 0.1)"""
+        if self._stats is None or time.time() - self._stats_at > STATS_TTL:
+            conn = self._conn()
+            row = conn.execute("SELECT COUNT(*), MIN(ts), MAX(ts) FROM quakes").fetchone()
+            hist = np.zeros(101)
+            for bin_, count in conn.execute("SELECT MIN(MAX(CAST(mag * 10 AS INTEGER), 0), 100), COUNT(*) FROM quakes GROUP BY 1"):
+                hist[bin_] = count
+            at_least = np.cumsum(hist[::-1])[::-1] / max(row[0], 1)
+            self._stats, self._stats_at = (row[0], row[1] or 0, row[2] or 0, at_least), time.time()
+        return self._stats
+
+    def plan(self, bbox=None, since=None, until=None, min_mag=None, limit=100):
+        """Jalur termurah: 'time' (scan ts terbaru-dulu, berhenti di limit), 'rtree', atau 'mag'"""
+        n, first, last, at_least = self._planner_stats()
+        span = max(last - first, 1)
+        f_time = (min(until or last, last) - max(since or first, first)) / span
+        f_time = min(max(f_time, 1 / span), 1.0)
+        f_mag = at_least[min(max(int(round(min_mag * 10)), 0), 100)] if min_mag is not None else 1.0
+        f_bbox = 1.0
+        if bbox is not None:
+            width = max(min(bbox[2], EXTENT[2]) - max(bbox[0], EXTENT[0]), 0)
+            height = max(min(bbox[3], EXTENT[3]) - max(bbox[1], EXTENT[1]), 0)
+            f_bbox = width * height / ((EXTENT[2] - EXTENT[0]) * (EXTENT[3] - EXTENT[1]))
+        hits = max(f_bbox * f_mag, 1e-9)
+        costs = {'time': min(n * f_time, limit / hits)}
+        if bbox is not None:
+            costs['rtree'] = LOOKUP_COST * n * f_bbox
+        if min_mag is not None:
+            costs['mag'] = LOOKUP_COST * n * f_mag
+        return min(costs, key=costs.get)
+
+    def query(self, bbox=None, since=None, until=None, min_mag=None, limit=100):
+        """bbox = (min_lon, min_lat, max_lon, max_lat); since/until = epoch UTC; terbaru dulu"""
+        path = self.plan(bbox, since, until, min_mag, limit)
+        where, params = [], []
+        if since is not None:
+            where.append("q.ts >= ?"); params.append(since)
+        if until is not None:
+            where.append("q.ts <= ?"); params.append(until)
+        if min_mag is not None:
+            where.append("q.mag >= ?"); params.append(min_mag)
+        if bbox is not None and path == 'rtree':
+            # R-tree mempersempit kandidat ke kotak; id IN (...) -> lookup primary key
+            where.append("q.id IN (SELECT id FROM quakes_rtree WHERE min_lat >= ? AND max_lat <= ? AND min_lon >= ? AND max_lon <= ?)")
+            params += [bbox[1], bbox[3], bbox[0], bbox[2]]
+        elif bbox is not None:
+            where.append("q.lat BETWEEN ? AND ? AND q.lon BETWEEN ? AND ?")
+            params += [bbox[1], bbox[3], bbox[0], bbox[2]]
+        index = {'time': ' INDEXED BY quakes_ts', 'mag': ' INDEXED BY quakes_mag_ts'}.get(path, '')
+        sql = f"SELECT q.* FROM quakes q{index}" + (" WHERE " + " AND ".join(where) if where else "")
+        sql += " ORDER BY q.ts DESC LIMIT ?"
+        rows = self._conn().execute(sql, params + [limit]).fetchall()
+        return [self._format(r) for r in rows]
+
+    @staticmethod
+    def _format(r):
+        return {
+            "datetime": datetime.fromtimestamp(r['ts'], timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            "jam": r['jam'], "magnitudo": r['mag'], "kedalaman_km": r['depth_km'],
+            "lat": r['lat'], "lon": r['lon'], "koordinat": f"{r['lat']},{r['lon']}",
+            "wilayah": r['wilayah'], "potensi": r['potensi'], "dirasakan": r['dirasakan'], "shakemap": r['shakemap']
+        }
+
+    def stats(self):
+        row = self._conn().execute("SELECT COUNT(*) AS n, MIN(ts) AS first, MAX(ts) AS last FROM quakes").fetchone()
+        return {"events": row['n'], "first_ts": row['first'], "last_ts": row['last']}
+
+
+def quake_listener(history):
+    """Listener LiveFeedBroadcaster: tiap polling, gempa terkini + 15 riwayat masuk arsip"""
+    def on_poll(latest, recent):
+        n = history.add(([latest] if latest else []) + list(recent or []))
+        if n:
+            print(f"🌋 Arsip gempa: +{n} event baru")
+    return on_poll
@@ -0,0 +1,255 @@
+"""
+Ingest Review Play Store Secara Kontinu
+Source (pluggable) -> Dedupe -> Cleaning -> Klasifikasi Batch (ModelHandler) -> Append Store -> Listener Agregat
+"""
+import csv
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+from utils.issue_categories import categorize_issue
+from utils.preprocessing import clean_text
+
+RAW_COLUMNS = ['Komentar', 'Bintang', 'Tanggal']
+LABELED_COLUMNS = ['Komentar', 'Bintang', 'Tanggal', 'clean_text', 'Sentimen',
+                   'Aspek_Terdeteksi', 'Confidence_Score', 'Emosi', 'Emosi_Confidence']
+
+
+def map_sentiment(star):
+    """Mapping Bintang ke Label Sentimen (sama dengan 01_data_preparation)"""
+    if star <= 2: return 'Negatif'
+    elif star == 3: return 'Netral'
+    else: return 'Positif'
+
+
+def load_labeled_archive(raw_path, absa_path, emotion_path, live_path=None):
+    """Arsip mentah (semua review) + label Aspek (ABSA / live) + label Emosi, digabung per (Komentar, Tanggal).
+    Review tanpa label (mis. tidak lolos cleaning 01) tetap ikut dengan label kosong."""
+    df = pd.read_csv(raw_path).dropna(subset=['Komentar'])
+    keys = ['Komentar', 'Tanggal']
+
+    aspek = [pd.read_csv(absa_path, usecols=keys + ['Aspek_Terdeteksi'])] if os.path.exists(absa_path) else []
+    emosi = [pd.read_csv(emotion_path, usecols=keys + ['Emosi'])] if os.path.exists(emotion_path) else []
+    if live_path and os.path.exists(live_path):
+        live = pd.read_csv(live_path, usecols=keys + ['Aspek_Terdeteksi', 'Emosi'])
+        aspek.append(live[keys + ['Aspek_Terdeteksi']])
+        emosi.append(live[keys + ['Emosi']])
+
+    for labels in (aspek, emosi):
+        if labels:
+            df = df.merge(pd.concat(labels).drop_duplicates(keys), on=keys, how='left')
+    df['Sentimen'] = df['Bintang'].apply(map_sentiment)
+    return df
+
+
+def review_key(komentar, tanggal):
+    """Kunci dedupe: isi komentar + waktu (arsip CSV tidak menyimpan reviewId)"""
+    raw = f"{str(komentar).strip()}|{str(tanggal).strip()}"
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+# ==========================================
+# 1. REVIEW SOURCE (PLUGGABLE)
+# ==========================================
+class ReviewSource:
+    """
+    Interface sumber review. fetch(cursor) mengembalikan (reviews, cursor_baru),
+    review = {"Komentar": str, "Bintang": int, "Tanggal": "YYYY-mm-dd HH:MM:SS"}.
+    Cursor harus JSON-serializable agar bisa disimpan antar restart.
+    """
+    def fetch(self, cursor):
+        raise NotImplementedError
+
+
+class PlayStoreSource(ReviewSource):
+    """Ambil review terbaru dari Google Play; cursor = timestamp review terbaru yang sudah diproses"""
+    def __init__(self, app_id='com.Info_BMKG', lang='id', country='id', page_size=200, max_pages=10):
+        self.app_id = app_id
+        self.lang = lang
+        self.country = country
+        self.page_size = page_size
+        self.max_pages = max_pages
+
+    def fetch(self, cursor):
+        from google_play_scraper import reviews, Sort
+
+        since = cursor or 0
+        collected = []
+        token = None
+        for _ in range(self.max_pages):
+            page, token = reviews(self.app_id, lang=self.lang, country=self.country,
+                                  sort=Sort.NEWEST, count=self.page_size, continuation_token=token)
+            fresh = [r for r in page if r['at'].timestamp() > since]
+            collected.extend(fresh)
+            # Halaman diurutkan terbaru dulu: berhenti begitu menyentuh review lama
+            if len(fresh) < len(page) or not token:
+                break
+
+        newest = max([r['at'].timestamp() for r in collected], default=since)
+        collected.reverse()  # Proses dari yang terlama agar urutan waktu terjaga
+        return [{
+            "Komentar": r['content'],
+            "Bintang": int(r['score']),
+            "Tanggal": r['at'].strftime('%Y-%m-%d %H:%M:%S')
+        } for r in collected], newest
+
+
+class FixtureReviewSource(ReviewSource):
+    """Replay file lokal (CSV kolom Komentar,Bintang,Tanggal atau JSONL); cursor = offset baris"""
+    def __init__(self, path, page_size=200):
+        self.path = path
+        self.page_size = page_size
+        if path.endswith('.jsonl'):
+            with open(path, encoding='utf-8') as f:
+                self.rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            self.rows = pd.read_csv(path, usecols=RAW_COLUMNS).to_dict('records')
+
+    def fetch(self, cursor):
+        offset = cursor or 0
+        page = self.rows[offset:offset + self.page_size]
+        return page, offset + len(page)
+
+
+# ==========================================
+# 2. REVIEW STORE (CSV APPEND-ONLY)
+# ==========================================
+class ReviewStore:
+    """Append review mentah ke arsip & review berlabel ke CSV live, dengan index dedupe di memori"""
+    def __init__(self, raw_path, labeled_path):
+        self.raw_path = raw_path
+        self.labeled_path = labeled_path
+        self.keys = set()
+        for path in (raw_path, labeled_path):
+            if os.path.exists(path):
+                df = pd.read_csv(path, usecols=['Komentar', 'Tanggal'])
+                self.keys.update(review_key(k, t) for k, t in zip(df['Komentar'], df['Tanggal']))
+
+    def filter_new(self, reviews):
+        """Buang review yang sudah tersimpan (dan duplikat di dalam batch itu sendiri)"""
+        fresh, seen = [], set()
+        for r in reviews:
+            key = review_key(r['Komentar'], r['Tanggal'])
+            if key in self.keys or key in seen:
+                continue
+            seen.add(key)
+            fresh.append(r)
+        return fresh
+
+    def _append(self, path, columns, rows):
+        write_header = not os.path.exists(path) or os.path.getsize(path) == 0
+        with open(path, 'a', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=columns, extrasaction='ignore')
+            if write_header:
+                writer.writeheader()
+            writer.writerows(rows)
+
+    def append(self, records):
+        self._append(self.raw_path, RAW_COLUMNS, records)
+        self._append(self.labeled_path, LABELED_COLUMNS, records)
+        self.keys.update(review_key(r['Komentar'], r['Tanggal']) for r in records)
+
+
+# ==========================================
+# 3. INGEST WORKER
+# ==========================================
+class IngestWorker:
+    def __init__(self, source, store, classifier, cursor_path, batch_size=32,
+                 poll_interval=300, listeners=()):
+        self.source = source
+        self.store = store
+        self.classifier = classifier
+        self.cursor_path = cursor_path
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.listeners = list(listeners)
+        self.cursor = self._load_cursor()
+        self.stats = {"fetched": 0, "duplicates": 0, "ingested": 0, "last_run": None}
+
+    def _load_cursor(self):
+        if os.path.exists(self.cursor_path):
+            with open(self.cursor_path) as f:
+                return json.load(f).get('cursor')
+        return None
+
+    def _save_cursor(self):
+        tmp_path = self.cursor_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({"cursor": self.cursor, "updated": datetime.now().isoformat()}, f)
+        os.replace(tmp_path, self.cursor_path)
+
+    def label(self, reviews):
+        """Cleaning + klasifikasi batch; review yang kosong setelah cleaning dibuang"""
+        records = []
+        for r in reviews:
+            clean_txt = clean_text(r['Komentar'])
+            if clean_txt:
+                records.append(dict(r, clean_text=clean_txt, Bintang=int(r['Bintang'])))
+        if not records:
+            return []
+
+        preds = self.classifier.predict_batch([r['clean_text'] for r in records], batch_size=self.batch_size)
+        for rec, pred in zip(records, preds):
+            rec['Sentimen'] = map_sentiment(rec['Bintang'])
+            rec['Aspek_Terdeteksi'] = pred['aspek']
+            rec['Confidence_Score'] = pred['aspek_conf'] / 100
+            rec['Emosi'] = pred['emosi']
+            rec['Emosi_Confidence'] = pred['emosi_conf'] / 100
+        return records
+
+    def run_once(self):
+        """1 siklus polling: ambil semua halaman baru sampai source habis"""
+        total = 0
+        while True:
+            reviews, new_cursor = self.source.fetch(self.cursor)
+            self.stats['fetched'] += len(reviews)
+            fresh = self.store.filter_new(reviews)
+            self.stats['duplicates'] += len(reviews) - len(fresh)
+
+            for i in range(0, len(fresh), self.batch_size):
+                records = self.label(fresh[i:i+self.batch_size])
+                if not records:
+                    continue
+                self.store.append(records)
+                for listener in self.listeners:
+                    try:
+                        listener(records)
+                    except Exception as e:
+                        print(f"⚠️ Ingest Listener Error: {e}")
+                total += len(records)
+
+            # Cursor disimpan setelah batch tersimpan: crash di tengah = ulang, bukan hilang
+            progressed = new_cursor != self.cursor
+            self.cursor = new_cursor
+            self._save_cursor()
+            if not reviews or not progressed:
+                break
+
+        self.stats['ingested'] += total
+        self.stats['last_run'] = datetime.now().isoformat()
+        return total
+
+    def run_forever(self, stop_event=None):
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            try:
+                n = self.run_once()
+                if n:
+                    print(f"📥 INGEST: {n} review baru diproses")
+            except Exception as e:
+                print(f"⚠️ Ingest Error: {e}")
+            stop_event.wait(self.poll_interval)
+
+
+def spike_listener(detector):
+    """Listener: keluhan baru (Bintang <= 2) langsung meng-update Spike Detector"""
+    def _update(records):
+        for r in records:
+            if r['Bintang'] <= 2:
+                detector.observe_review(r['Aspek_Terdeteksi'], r['Emosi'], categorize_issue(r['Komentar']),
+                                        ts=pd.Timestamp(r['Tanggal']).timestamp())
+    return _update
@@ -0,0 +1,380 @@
+"""
+Pencarian Full-Text Review (BM25 + Filter)
+Base di disk (dibaca via mmap, tidak dimuat utuh ke RAM):
+- postings : doc id (int32) & tf (uint16) diurutkan per term, offsets[term] -> rentang postings
+- teks     : 1 blob UTF-8 + offsets (untuk menampilkan hasil)
+- kolom    : ts, Bintang, panjang dokumen, kode Sentimen/Aspek/Emosi/Kategori bug (filter vektor numpy)
+Review baru masuk segmen delta di memori + log delta.jsonl, lalu digabung ke base saat compact/save.
+Bangun ulang dari arsip: python scripts/19_build_search_index.py
+"""
+import json
+import os
+import shutil
+import threading
+from collections import Counter
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from utils.preprocessing import clean_text
+from utils.issue_categories import categorize_issue
+from utils.review_ingest import map_sentiment
+
+# Parameter BM25 standar
+K1 = 1.2
+B = 0.75
+
+LABEL_FIELDS = ('sentimen', 'aspek', 'emosi', 'kategori')
+COLUMN_DTYPES = {'ts': np.int64, 'bintang': np.int8, 'length': np.uint16,
+                 'sentimen': np.int16, 'aspek': np.int16, 'emosi': np.int16, 'kategori': np.int16}
+POSTING_DTYPES = {'term': np.int32, 'doc': np.int32, 'tf': np.uint16}
+ARRAY_FILES = ('offsets', 'post_docs', 'post_tf', 'text_blob', 'text_offsets')
+META_FILE = 'meta.json'
+DELTA_LOG = 'delta.jsonl'
+COMPACT_AT = 50000  # Jumlah dokumen delta sebelum digabung otomatis ke base
+
+
+def tokenize(text):
+    """Pipeline sama dengan term index / Word2Vec (cleaning + slang), tanpa buang stopword"""
+    return clean_text(text, slang=True).split()
+
+
+class GrowableColumns:
+    """Kolom numpy berkapasitas ganda: append amortized O(1), baca lewat view tanpa salin"""
+    def __init__(self, dtypes, capacity=1024):
+        self.n = 0
+        self.arrays = {name: np.zeros(capacity, dtype=dt) for name, dt in dtypes.items()}
+
+    def extend(self, **values):
+        size = len(next(iter(values.values())))
+        capacity = len(next(iter(self.arrays.values())))
+        if self.n + size > capacity:
+            capacity = max(capacity * 2, self.n + size)
+            for name, arr in self.arrays.items():
+                grown = np.zeros(capacity, dtype=arr.dtype)
+                grown[:self.n] = arr[:self.n]
+                self.arrays[name] = grown
+        for name, vals in values.items():
+            self.arrays[name][self.n:self.n + size] = vals
+        self.n += size
+
+    def __getitem__(self, name):
+        return self.arrays[name][:self.n]
+
+
+class SearchIndex:
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self.labels = {f: [''] for f in LABEL_FIELDS}  # Kode 0 = tidak berlabel
+        self._codes = {f: {'': 0} for f in LABEL_FIELDS}
+        self.vocab = {}  # term -> term id (id base = indeks offsets; term baru dari delta menyusul)
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.post_docs = np.zeros(0, dtype=np.int32)
+        self.post_tf = np.zeros(0, dtype=np.uint16)
+        self.text_blob = np.zeros(0, dtype=np.uint8)
+        self.text_offsets = np.zeros(1, dtype=np.int64)
+        self.columns = GrowableColumns(COLUMN_DTYPES)
+        self.n_base = 0
+        self.total_len = 0
+        self.delta = GrowableColumns(POSTING_DTYPES)
+        self.delta_df = {}
+        self.delta_texts = []
+        self._meta_mtime = None
+        self._delta_read = 0
+
+    @property
+    def n_docs(self):
+        return self.columns.n
+
+    # ==========================================
+    # 1. UPDATE INKREMENTAL (SEGMEN DELTA)
+    # ==========================================
+    def _code(self, field, value):
+        """Label -> kode kolom; tidak peka huruf besar ("sedih" dari dataset = "Sedih" dari model)"""
+        value = '' if value is None or value != value else str(value)
+        code = self._codes[field].get(value.lower())
+        if code is None:
+            code = self._codes[field][value.lower()] = len(self.labels[field])
+            self.labels[field].append(value.title() if value.islower() else value)
+        return code
+
+    def _add(self, records):
+        """Tokenisasi + append kolom & postings delta (pemanggil memegang lock)"""
+        if not records:
+            return
+        stamps = pd.to_datetime([r['Tanggal'] for r in records]).values.astype('datetime64[s]').astype(np.int64)
+        rows = {name: [] for name in COLUMN_DTYPES}
+        terms, docs, tfs = [], [], []
+        doc = self.columns.n
+        for r, ts in zip(records, stamps):
+            text = str(r['Komentar'])
+            tokens = tokenize(text)
+            for term, tf in Counter(tokens).items():
+                tid = self.vocab.get(term)
+                if tid is None:
+                    tid = self.vocab[term] = len(self.vocab)
+                terms.append(tid)
+                docs.append(doc)
+                tfs.append(min(tf, 65535))
+                self.delta_df[tid] = self.delta_df.get(tid, 0) + 1
+            bintang = int(r['Bintang'])
+            rows['ts'].append(ts)
+            rows['bintang'].append(bintang)
+            rows['length'].append(min(len(tokens), 65535))
+            rows['sentimen'].append(self._code('sentimen', r.get('Sentimen') or map_sentiment(bintang)))
+            rows['aspek'].append(self._code('aspek', r.get('Aspek_Terdeteksi')))
+            rows['emosi'].append(self._code('emosi', r.get('Emosi')))
+            rows['kategori'].append(self._code('kategori', categorize_issue(text)))
+            self.delta_texts.append(text)
+            self.total_len += len(tokens)
+            doc += 1
+        self.columns.extend(**rows)
+        self.delta.extend(term=terms, doc=docs, tf=tfs)
+
+    def add_records(self, records):
+        """Review berlabel (format ingest) -> segmen delta + log delta.jsonl; compact otomatis jika delta besar"""
+        with self._lock:
+            if not self.path:
+                self._add(records)
+                return
+            self._replay_delta()  # Tulisan proses lain yang belum dimuat lebih dulu (urutan dokumen = urutan log)
+            self._add(records)
+            os.makedirs(self.path, exist_ok=True)
+            lines = []
+            for r in records:
+                entry = {"Komentar": str(r['Komentar']), "Tanggal": str(r['Tanggal']), "Bintang": int(r['Bintang'])}
+                for key in ('Sentimen', 'Aspek_Terdeteksi', 'Emosi'):
+                    value = r.get(key)
+                    entry[key] = None if value is None or value != value else str(value)  # NaN -> null
+                lines.append(json.dumps(entry, ensure_ascii=False) + '\n')
+            blob = ''.join(lines).encode('utf-8')
+            # 1 write O_APPEND: offset akhir = posisi tulisan sendiri walau proses lain ikut menulis
+            fd = os.open(os.path.join(self.path, DELTA_LOG), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, blob)
+                end = os.lseek(fd, 0, os.SEEK_CUR)
+            finally:
+                os.close(fd)
+            # Baris proses lain yang masuk di antara replay & tulisan ini tetap dimuat; tulisan sendiri dilewati
+            self._replay_delta(until=end - len(blob))
+            self._delta_read = end
+            if len(self.delta_texts) >= COMPACT_AT:
+                self.save()
+
+    # ==========================================
+    # 2. QUERY BM25 + FILTER
+    # ==========================================
+    def _postings(self, tid):
+        """Postings base (slice mmap) + delta (scan kolom term delta, kecil sampai compact)"""
+        docs, tfs = [], []
+        if tid < len(self.offsets) - 1:
+            start, end = self.offsets[tid], self.offsets[tid + 1]
+            docs.append(self.post_docs[start:end])
+            tfs.append(self.post_tf[start:end])
+        if self.delta_df.get(tid):
+            hit = np.flatnonzero(self.delta['term'] == tid)
+            docs.append(self.delta['doc'][hit])
+            tfs.append(self.delta['tf'][hit])
+        if not docs:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.uint16)
+        return np.concatenate(docs), np.concatenate(tfs)
+
+    def _filter(self, docs, bintang=None, date_from=None, date_to=None, labels=None):
+        """Mask filter untuk doc id kandidat (None = semua dokumen)"""
+        def col(name):
+            arr = self.columns[name]
+            return arr if docs is None else arr[docs]
+        mask = np.ones(self.n_docs if docs is None else len(docs), dtype=bool)
+        if bintang:
+            mask &= np.isin(col('bintang'), bintang)
+        if date_from:
+            mask &= col('ts') >= pd.Timestamp(date_from).value // 10**9
+        if date_to:
+            mask &= col('ts') < (pd.Timestamp(date_to) + pd.Timedelta(days=1)).value // 10**9
+        for field, value in (labels or {}).items():
+            if value:
+                code = self._codes[field].get(str(value).lower())
+                if code is None:
+                    return np.zeros_like(mask)
+                mask &= col(field) == code
+        return mask
+
+    def _doc(self, doc, score=None):
+        if doc < self.n_base:
+            text = bytes(self.text_blob[self.text_offsets[doc]:self.text_offsets[doc + 1]]).decode('utf-8')
+        else:
+            text = self.delta_texts[doc - self.n_base]
+        row = {name: self.columns[name][doc] for name in COLUMN_DTYPES}
+        result = {
+            "komentar": text,
+            "tanggal": pd.Timestamp(int(row['ts']), unit='s').strftime('%Y-%m-%d %H:%M:%S'),
+            "bintang": int(row['bintang']),
+            **{field: self.labels[field][row[field]] or None for field in LABEL_FIELDS}
+        }
+        if score is not None:
+            result["score"] = round(float(score), 3)
+        return result
+
+    def search(self, q='', top=20, offset=0, bintang=None, date_from=None, date_to=None, **labels):
+        """q kosong -> semua dokumen yang lolos filter, terbaru dulu (drill-down kategori bug)"""
+        labels = {f: labels.get(f) for f in LABEL_FIELDS}
+        with self._lock:
+            n = self.n_docs
+            tids = [self.vocab[t] for t in dict.fromkeys(tokenize(q)) if t in self.vocab]
+            if not n or (q.strip() and not tids):
+                return {"total": 0, "results": []}
+
+            if tids:
+                avgdl = np.float32(self.total_len / n)
+                doc_parts, score_parts = [], []
+                for tid in tids:
+                    docs, tfs = self._postings(tid)
+                    idf = np.float32(np.log1p((n - len(docs) + 0.5) / (len(docs) + 0.5)))
+                    tf = tfs.astype(np.float32)
+                    norm = K1 * (1 - B + B * self.columns['length'][docs] / avgdl)
+                    doc_parts.append(docs)
+                    score_parts.append(idf * tf * np.float32(K1 + 1) / (tf + norm))
+                if len(tids) == 1:
+                    docs, scores = doc_parts[0], score_parts[0]
+                elif sum(map(len, doc_parts)) > n // 16:
+                    # Union besar (kata umum): akumulasi di array skor padat lebih murah dari sort/unique
+                    dense = np.zeros(n, dtype=np.float32)
+                    for part_docs, part_scores in zip(doc_parts, score_parts):
+                        dense[part_docs] += part_scores  # doc unik per term -> += aman
+                    docs = np.flatnonzero(dense)
+                    scores = dense[docs]
+                else:
+                    docs, inverse = np.unique(np.concatenate(doc_parts), return_inverse=True)
+                    scores = np.bincount(inverse, weights=np.concatenate(score_parts))
+                mask = self._filter(docs, bintang, date_from, date_to, labels)
+                docs, rank_key = docs[mask], scores[mask]
+            else:
+                docs = np.flatnonzero(self._filter(None, bintang, date_from, date_to, labels))
+                scores, rank_key = None, self.columns['ts'][docs].astype(np.float64)
+
+            total = len(docs)
+            k = min(offset + top, total)
+            if k == 0:
+                return {"total": total, "results": []}
+            # Top-k parsial (tanpa sort penuh): O(n) + O(k log k)
+            best = np.argpartition(-rank_key, k - 1)[:k] if k < total else np.arange(total)
+            best = best[np.argsort(-rank_key[best], kind='stable')][offset:]
+            results = [self._doc(docs[i], None if scores is None else rank_key[i]) for i in best]
+        return {"total": total, "results": results}
+
+    # ==========================================
+    # 3. COMPACT & PERSISTENSI
+    # ==========================================
+    def compact(self):
+        """Gabungkan delta ke base: postings diurutkan ulang per term (vektor numpy), teks ke blob"""
+        with self._lock:
+            if not self.delta_texts:
+                return
+            base_terms = np.repeat(np.arange(len(self.offsets) - 1, dtype=np.int32), np.diff(self.offsets))
+            terms = np.concatenate([base_terms, self.delta['term']])
+            docs = np.concatenate([self.post_docs, self.delta['doc']])
+            order = np.lexsort((docs, terms))
+            self.post_docs = docs[order]
+            self.post_tf = np.concatenate([self.post_tf, self.delta['tf']])[order]
+            counts = np.bincount(terms, minlength=len(self.vocab))
+            self.offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+            encoded = [t.encode('utf-8') for t in self.delta_texts]
+            self.text_blob = np.concatenate([self.text_blob, np.frombuffer(b''.join(encoded), dtype=np.uint8)])
+            ends = self.text_offsets[-1] + np.cumsum([len(e) for e in encoded], dtype=np.int64)
+            self.text_offsets = np.concatenate([self.text_offsets, ends])
+
+            self.n_base = self.n_docs
+            self.delta = GrowableColumns(POSTING_DTYPES)
+            self.delta_df = {}
+            self.delta_texts = []
+
+    def save(self, path=None):
+        """Compact lalu tulis base baru ke direktori sementara, tukar dengan yang lama.
+        Proses lain yang masih memegang mmap file lama tetap aman (file lama baru hilang setelah ditutup)."""
+        path = path or self.path
+        with self._lock:
+            self.compact()
+            tmp_dir = f"{path}.{os.getpid()}.tmp"
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            os.makedirs(tmp_dir)
+            for name in ARRAY_FILES:
+                np.save(os.path.join(tmp_dir, f'{name}.npy'), getattr(self, name))
+            np.savez(os.path.join(tmp_dir, 'columns.npz'), **{name: self.columns[name] for name in COLUMN_DTYPES})
+            with open(os.path.join(tmp_dir, META_FILE), 'w', encoding='utf-8') as f:
+                json.dump({"n_docs": self.n_docs, "total_len": self.total_len, "labels": self.labels,
+                           "terms": sorted(self.vocab, key=self.vocab.get),
+                           "saved": datetime.now().isoformat()}, f, ensure_ascii=False)
+
+            old_dir = f"{path}.{os.getpid()}.old"
+            if os.path.exists(path):
+                os.rename(path, old_dir)
+            os.rename(tmp_dir, path)
+            shutil.rmtree(old_dir, ignore_errors=True)
+
+            self.path = path
+            self._reset()
+            self._load_base()
+
+    def _load_base(self):
+        with open(os.path.join(self.path, META_FILE), encoding='utf-8') as f:
+            meta = json.load(f)
+        self._meta_mtime = os.path.getmtime(os.path.join(self.path, META_FILE))
+        self.labels = meta['labels']
+        self._codes = {f: {v.lower(): i for i, v in enumerate(values)} for f, values in self.labels.items()}
+        self.vocab = {term: i for i, term in enumerate(meta['terms'])}
+        for name in ARRAY_FILES:
+            setattr(self, name, np.load(os.path.join(self.path, f'{name}.npy'), mmap_mode='r'))
+        with np.load(os.path.join(self.path, 'columns.npz')) as cols:
+            self.columns.extend(**{name: cols[name] for name in COLUMN_DTYPES})
+        self.n_base = meta['n_docs']
+        self.total_len = meta['total_len']
+
+    def _replay_delta(self, until=None):
+        """Review dari log delta yang belum dimuat, sampai offset `until` (default akhir file);
+        hanya baris lengkap: penulis lain bisa sedang menulis"""
+        log_path = os.path.join(self.path, DELTA_LOG)
+        if not os.path.exists(log_path):
+            return
+        end = os.path.getsize(log_path) if until is None else until
+        if end <= self._delta_read:
+            return
+        with open(log_path, 'rb') as f:
+            f.seek(self._delta_read)
+            chunk = f.read(end - self._delta_read)
+        complete = chunk[:chunk.rfind(b'\n') + 1]
+        self._add([json.loads(line) for line in complete.decode('utf-8').splitlines() if line.strip()])
+        self._delta_read += len(complete)
+
+    def refresh(self):
+        """Ikuti perubahan dari proses lain (ingest scripts/08): base baru -> muat ulang, delta bertambah -> replay"""
+        if not self.path:
+            return
+        try:
+            meta_mtime = os.path.getmtime(os.path.join(self.path, META_FILE))
+        except OSError:
+            return
+        with self._lock:
+            if meta_mtime != self._meta_mtime:
+                self._reset()
+                self._load_base()
+            self._replay_delta()
+
+    @classmethod
+    def load(cls, path):
+        """Base (mmap) + replay delta; index kosong jika belum dibangun"""
+        index = cls(path)
+        index.refresh()
+        return index
+
+
+def search_listener(index):
+    """Listener ingest: review baru langsung bisa dicari"""
+    def _update(records):
+        index.add_records(records)
+    return _update
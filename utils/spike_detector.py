@@ -0,0 +1,150 @@
+"""
+Deteksi Lonjakan Keluhan (Streaming Spike Detector)
+Setiap seri (aspek / emosi / kategori bug) menyimpan state konstan:
+EWMA rata-rata & varians per bucket waktu + akumulator CUSUM.
+Update per review = O(1), tidak pernah memindai ulang histori.
+"""
+import json
+import math
+import os
+import threading
+import time
+
+# Batas bucket kosong yang diproses saat "mengejar" jeda panjang.
+# Setelah ~1/alpha bucket nol, EWMA sudah konvergen sehingga sisa jeda cukup dilewati.
+MAX_CATCHUP = 200
+
+
+class _SeriesState:
+    __slots__ = ('bucket', 'count', 'mean', 'var', 'cusum', 'n_buckets')
+
+    def __init__(self, bucket):
+        self.bucket = bucket
+        self.count = 0
+        self.mean = 0.0
+        self.var = 0.0
+        self.cusum = 0.0
+        self.n_buckets = 0
+
+
+class SpikeDetector:
+    def __init__(self, bucket_seconds=86400, alpha=0.1, z_threshold=3.0,
+                 cusum_k=0.5, cusum_h=5.0, min_count=5, warmup_buckets=7):
+        self.bucket_seconds = bucket_seconds
+        self.alpha = alpha
+        self.z_threshold = z_threshold
+        self.cusum_k = cusum_k
+        self.cusum_h = cusum_h
+        self.min_count = min_count
+        self.warmup_buckets = warmup_buckets
+        self.series = {}
+        self._lock = threading.Lock()
+
+    # --- 1. UPDATE STATE ---
+    def _std(self, st):
+        # Lantai Poisson: volume keluhan adalah data cacah, varians >= rata-rata
+        return math.sqrt(max(st.var, st.mean, 1.0))
+
+    def _close_bucket(self, st, x):
+        """Tutup 1 bucket dengan nilai x: update CUSUM lalu EWMA"""
+        z = (x - st.mean) / self._std(st)
+        st.cusum = max(0.0, st.cusum + z - self.cusum_k)
+        diff = x - st.mean
+        incr = self.alpha * diff
+        st.mean += incr
+        st.var = (1 - self.alpha) * (st.var + diff * incr)
+        st.n_buckets += 1
+
+    def _roll(self, st, bucket):
+        """Majukan seri ke bucket target (bucket kosong di antaranya bernilai 0)"""
+        if bucket <= st.bucket:
+            return
+        self._close_bucket(st, st.count)
+        gap = bucket - st.bucket - 1
+        for _ in range(min(gap, MAX_CATCHUP)):
+            self._close_bucket(st, 0)
+        st.n_buckets += max(0, gap - MAX_CATCHUP)
+        st.bucket = bucket
+        st.count = 0
+
+    def observe(self, key, ts=None, weight=1):
+        """Catat 1 kejadian untuk seri `key` (misal 'aspek:Performa')"""
+        bucket = int((ts if ts is not None else time.time()) // self.bucket_seconds)
+        with self._lock:
+            st = self.series.get(key)
+            if st is None:
+                st = self.series[key] = _SeriesState(bucket)
+            # Data terlambat (bucket lampau) dihitung ke bucket berjalan
+            self._roll(st, bucket)
+            st.count += weight
+
+    def observe_review(self, aspek=None, emosi=None, bug=None, ts=None):
+        """Catat 1 keluhan berlabel ke seri aspek, emosi, dan kategori bug"""
+        if aspek:
+            self.observe(f"aspek:{aspek}", ts)
+        if emosi:
+            self.observe(f"emosi:{str(emosi).title()}", ts)
+        if bug:
+            self.observe(f"bug:{bug}", ts)
+
+    # --- 2. ALERT ---
+    def alerts(self, now=None):
+        """Daftar alert aktif, diurutkan dari skor z tertinggi"""
+        bucket = int((now if now is not None else time.time()) // self.bucket_seconds)
+        results = []
+        with self._lock:
+            for key, st in self.series.items():
+                self._roll(st, bucket)
+                if st.n_buckets < self.warmup_buckets:
+                    continue
+                z = (st.count - st.mean) / self._std(st)
+                spike = z >= self.z_threshold and st.count >= self.min_count
+                shift = st.cusum > self.cusum_h
+                if not (spike or shift):
+                    continue
+                dimension, label = key.split(':', 1)
+                results.append({
+                    "series": key,
+                    "dimension": dimension,
+                    "label": label,
+                    "type": "spike" if spike else "shift",
+                    "count": st.count,
+                    "expected": round(st.mean, 2),
+                    "z": round(z, 2),
+                    "cusum": round(st.cusum, 2),
+                    "bucket_start": st.bucket * self.bucket_seconds
+                })
+        results.sort(key=lambda a: (a['z'], a['cusum']), reverse=True)
+        return results
+
+    # --- 3. PERSISTENSI ---
+    def to_dict(self):
+        with self._lock:
+            return {
+                "bucket_seconds": self.bucket_seconds,
+                "series": {k: [st.bucket, st.count, st.mean, st.var, st.cusum, st.n_buckets]
+                           for k, st in self.series.items()}
+            }
+
+    def save(self, path):
+        # tmp per proses: beberapa worker gunicorn bisa menyimpan bersamaan saat shutdown
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        """Muat state tersimpan; mulai kosong jika file tidak ada / ukuran bucket berubah"""
+        detector = cls(**kwargs)
+        if not os.path.exists(path):
+            return detector
+        with open(path) as f:
+            data = json.load(f)
+        if data.get('bucket_seconds') != detector.bucket_seconds:
+            return detector
+        for key, values in data.get('series', {}).items():
+            st = _SeriesState(values[0])
+            st.count, st.mean, st.var, st.cusum, st.n_buckets = values[1:]
+            detector.series[key] = st
+        return detector
@@ -0,0 +1,100 @@
+"""
+Model Student Ringan (Bi-LSTM) untuk Inferensi CPU
+Hasil distilasi dari IndoBERT (scripts/15_distill_student.py). StudentTokenizer & StudentModel
+meniru antarmuka tokenizer/model HuggingFace yang dipakai ModelHandler._classify,
+sehingga bisa dipasang sebagai backend pengganti tanpa mengubah jalur inferensi.
+"""
+import os
+from collections import Counter
+
+import torch
+import torch.nn as nn
+from transformers import BatchEncoding
+from transformers.modeling_outputs import SequenceClassifierOutput
+
+MAX_LEN = 50
+
+
+# --- KELAS BI-LSTM MODEL (PYTORCH) ---
+class BiLSTMClassifier(nn.Module):
+    def __init__(self, vocab_size, embed_dim, hidden_dim, output_dim, n_layers):
+        super(BiLSTMClassifier, self).__init__()
+        self.embedding = nn.Embedding(vocab_size, embed_dim, padding_idx=0)
+        self.lstm = nn.LSTM(embed_dim, hidden_dim, num_layers=n_layers,
+                            bidirectional=True, batch_first=True, dropout=0.3)
+        self.fc = nn.Linear(hidden_dim * 2, output_dim) # *2 karena Bidirectional
+        self.dropout = nn.Dropout(0.3)
+
+    def forward(self, text):
+        # text = [batch size, sent len]
+        embedded = self.embedding(text)
+        # Pack: hidden state terakhir diambil dari token asli, bukan dari padding
+        lengths = (text != 0).sum(dim=1).clamp(min=1).cpu()
+        packed = nn.utils.rnn.pack_padded_sequence(embedded, lengths, batch_first=True, enforce_sorted=False)
+        output, (hidden, cell) = self.lstm(packed)
+        # Ambil hidden state terakhir dari forward dan backward
+        hidden = self.dropout(torch.cat((hidden[-2,:,:], hidden[-1,:,:]), dim = 1))
+        return self.fc(hidden)
+
+
+# --- UTILS UNTUK TEXT PROCESSING LSTM ---
+def build_vocab(texts, max_size=5000):
+    words = []
+    for t in texts: words.extend(t.split())
+    count = Counter(words)
+    # Urutkan kata yang paling sering muncul
+    vocab = {word: i+2 for i, (word, _) in enumerate(count.most_common(max_size))}
+    vocab["<PAD>"] = 0
+    vocab["<UNK>"] = 1
+    return vocab
+
+
+def text_pipeline(text, vocab, max_len=MAX_LEN):
+    tokens = [vocab.get(w, 1) for w in text.split()]
+    if len(tokens) < max_len:
+        tokens += [0] * (max_len - len(tokens)) # Padding
+    else:
+        tokens = tokens[:max_len] # Truncate
+    return tokens
+
+
+# ==========================================
+# BACKEND DROP-IN UNTUK ModelHandler
+# ==========================================
+class StudentTokenizer:
+    """Tokenizer kata -> id vocab; padding dinamis (sepanjang teks terpanjang di batch)"""
+    def __init__(self, vocab, max_len=MAX_LEN):
+        self.vocab = vocab
+        self.max_len = max_len
+
+    def __call__(self, texts, return_tensors="pt", padding=True, truncation=True, max_length=None):
+        ids = [[self.vocab.get(w, 1) for w in t.split()][:self.max_len] or [1] for t in texts]
+        width = max(len(x) for x in ids)
+        input_ids = torch.tensor([x + [0] * (width - len(x)) for x in ids], dtype=torch.long)
+        return BatchEncoding({"input_ids": input_ids})
+
+
+class StudentModel(nn.Module):
+    """Bungkus BiLSTMClassifier agar mengembalikan `.logits` seperti AutoModelForSequenceClassification"""
+    def __init__(self, net, id2label):
+        super().__init__()
+        self.net = net
+        self.id2label = id2label
+
+    def forward(self, input_ids, **kwargs):
+        return SequenceClassifierOutput(logits=self.net(input_ids))
+
+
+def save_student(path, net, config, vocab, id2label):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    torch.save({"config": config, "vocab": vocab, "id2label": id2label,
+                "state_dict": net.cpu().state_dict()}, path)
+
+
+def load_student(path, device='cpu'):
+    """-> (tokenizer, model) siap pakai di ModelHandler"""
+    ckpt = torch.load(path, map_location='cpu')
+    net = BiLSTMClassifier(**ckpt['config'])
+    net.load_state_dict(ckpt['state_dict'])
+    model = StudentModel(net, ckpt['id2label']).to(device).eval()
+    return StudentTokenizer(ckpt['vocab']), model
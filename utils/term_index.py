@@ -0,0 +1,154 @@
+"""
+Index Frekuensi Kata Streaming (pengganti WordCloud PNG statis)
+Tabel per hari x irisan (Sentimen|Aspek|Emosi): jumlah review & jumlah review yang memuat tiap kata.
+- add_records() : update inkremental per batch ingest, tidak membaca ulang arsip
+- query(...)    : gabungkan irisan hari/filter yang cocok -> top-N kata untuk word cloud
+                  (bulan yang tercakup penuh memakai rollup bulanan: ~30x lebih sedikit Counter digabung)
+Kata dihitung sekali per review (frekuensi dokumen): 1 review spam "lama lama lama" tidak mendominasi.
+"""
+import json
+import os
+import re
+import threading
+from collections import Counter
+
+from utils.preprocessing import clean_text
+
+DIMENSIONS = ('sentimen', 'aspek', 'emosi')
+
+# Stopwords Bahasa Indonesia (setelah normalisasi slang: "gak"/"ga" sudah menjadi "tidak")
+STOPWORDS = frozenset([
+    'yang', 'dan', 'di', 'ke', 'dari', 'ini', 'itu', 'untuk', 'ada', 'dengan', 'tapi',
+    'saya', 'tidak', 'bisa', 'aplikasi', 'bmkg', 'nya', 'sangat', 'terlalu', 'tolong',
+    'min', 'kalau', 'pas', 'saja', 'juga', 'mau', 'sudah', 'lagi', 'sama', 'bikin',
+    'malah', 'kok', 'biar', 'karena', 'banget', 'info', 'update', 'padahal', 'lebih',
+    'masih', 'jadi', 'atau', 'pada', 'kita', 'aku', 'kami', 'dalam', 'akan', 'apa',
+    'udah', 'buat', 'kenapa', 'bagaimana', 'begitu', 'terus', 'harus', 'dapat', 'belum',
+])
+DIGITS_RE = re.compile(r'^\d+$')
+MIN_TERM_LEN = 3
+QUERY_CACHE_SIZE = 256
+
+
+def review_terms(text):
+    """Teks mentah -> set kata unik (cleaning bersama + slang, tanpa stopword/angka/kata < 3 huruf)"""
+    return {w for w in clean_text(text, slang=True).split()
+            if len(w) >= MIN_TERM_LEN and w not in STOPWORDS and not DIGITS_RE.match(w)}
+
+
+def slice_key(sentimen, aspek, emosi):
+    """-> (sentimen, aspek, emosi); label kosong (mis. review tanpa label emosi) -> '' :
+    hanya ikut query yang tidak memfilter dimensi itu"""
+    return tuple('' if v is None or v != v else str(v).title() for v in (sentimen, aspek, emosi))
+
+
+class TermIndex:
+    def __init__(self):
+        self.days = {}    # 'YYYY-mm-dd' -> {(sentimen, aspek, emosi): [jumlah_review, Counter kata]}
+        self.months = {}  # 'YYYY-mm' -> rollup irisan seluruh hari di bulan itu (format sama)
+        self.month_days = {}  # 'YYYY-mm' -> set hari yang punya data
+        self._cache = {}  # Hasil query terakhir (dikosongkan tiap add): dashboard default tanpa merge ulang
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _merge_into(table, key, count, terms):
+        cell = table.get(key)
+        if cell is None:
+            cell = table[key] = [0, Counter()]
+        cell[0] += count
+        cell[1].update(terms)
+
+    # --- 1. UPDATE INKREMENTAL ---
+    def add(self, text, tanggal, sentimen=None, aspek=None, emosi=None):
+        day = str(tanggal)[:10]
+        key = slice_key(sentimen, aspek, emosi)
+        terms = review_terms(text)
+        with self._lock:
+            self._merge_into(self.days.setdefault(day, {}), key, 1, terms)
+            self._merge_into(self.months.setdefault(day[:7], {}), key, 1, terms)
+            self.month_days.setdefault(day[:7], set()).add(day)
+            self._cache.clear()
+
+    def add_records(self, records):
+        """Record berlabel format ingest / dataset (Komentar, Tanggal, Sentimen, Aspek_Terdeteksi, Emosi)"""
+        for r in records:
+            self.add(r['Komentar'], r['Tanggal'], r.get('Sentimen'), r.get('Aspek_Terdeteksi'), r.get('Emosi'))
+
+    # --- 2. QUERY ---
+    def query(self, date_from=None, date_to=None, top=50, **filters):
+        """Gabungkan irisan yang cocok. Filter: sentimen/aspek/emosi (None = semua), tanggal inklusif"""
+        wanted = [None if filters.get(d) is None else str(filters[d]).title() for d in DIMENSIONS]
+        cache_key = (date_from, date_to, top, *wanted)
+        merged, docs, n_days = Counter(), 0, 0
+        with self._lock:
+            if cache_key in self._cache:
+                return self._cache[cache_key]
+            for month, days in self.month_days.items():
+                # Bulan di luar rentang dilewati; bulan tercakup penuh -> 1 rollup; sisanya per hari
+                if (date_from and f"{month}-31" < date_from) or (date_to and f"{month}-01" > date_to):
+                    continue
+                if (not date_from or f"{month}-01" >= date_from) and (not date_to or f"{month}-31" <= date_to):
+                    tables = [self.months[month]]
+                    n_days += len(days)
+                else:
+                    selected = [d for d in days if (not date_from or d >= date_from) and (not date_to or d <= date_to)]
+                    tables = [self.days[d] for d in selected]
+                    n_days += len(selected)
+                for slices in tables:
+                    for key, (count, terms) in slices.items():
+                        if any(w is not None and w != v for w, v in zip(wanted, key)):
+                            continue
+                        docs += count
+                        merged.update(terms)
+            result = {
+                "docs": docs,
+                "days": n_days,
+                "terms": [{"term": t, "count": c, "share": round(c / docs, 4)} for t, c in merged.most_common(top)]
+            }
+            if len(self._cache) >= QUERY_CACHE_SIZE:
+                self._cache.clear()
+            self._cache[cache_key] = result
+        return result
+
+    def date_range(self):
+        with self._lock:
+            return (min(self.days), max(self.days)) if self.days else (None, None)
+
+    # --- 3. PERSISTENSI ---
+    def to_dict(self):
+        with self._lock:
+            return {"days": {day: {'|'.join(key): [count, dict(terms)] for key, (count, terms) in slices.items()}
+                             for day, slices in self.days.items()}}
+
+    def save(self, path):
+        # tmp per proses: beberapa worker gunicorn bisa menyimpan bersamaan saat shutdown
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Muat index tersimpan; kosong jika file belum ada (jalankan scripts/09_generate_wordcloud.py)"""
+        index = cls()
+        if not os.path.exists(path):
+            return index
+        with open(path) as f:
+            data = json.load(f)
+        for day, slices in data.get('days', {}).items():
+            index.days[day] = {}
+            for key, (count, terms) in slices.items():
+                key = tuple(key.split('|'))
+                index._merge_into(index.days[day], key, count, terms)
+                index._merge_into(index.months.setdefault(day[:7], {}), key, count, terms)
+            index.month_days.setdefault(day[:7], set()).add(day)
+        return index
+
+
+def term_listener(index, path=None):
+    """Listener ingest: review baru langsung masuk index (+ simpan jika path diberikan)"""
+    def _update(records):
+        index.add_records(records)
+        if path:
+            index.save(path)
+    return _update
@@ -0,0 +1,159 @@
+"""
+Utilitas Training & Evaluasi IndoBERT (dipakai 02, 04 & 06)
+- Cache dataset ter-tokenisasi di disk (tanpa padding): tokenisasi sekali, bukan tiap run
+- Padding dinamis + length-grouped sampling: batch tidak lagi dipad ke panjang maksimum global
+- Profil hardware: jumlah thread, DataLoader worker, bf16/fp16 hanya jika benar-benar didukung
+"""
+import dataclasses
+import glob
+import hashlib
+import inspect
+import os
+
+import torch
+from sklearn.model_selection import train_test_split
+from transformers import DataCollatorWithPadding, Trainer, TrainingArguments
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.path.join(BASE_DIR, 'data', 'processed', 'tokenized')
+CACHE_VERSION = 1
+
+
+# ==========================================
+# 1. PROFIL HARDWARE
+# ==========================================
+def _cpu_flags():
+    try:
+        with open('/proc/cpuinfo') as f:
+            for line in f:
+                if line.startswith('flags'):
+                    return set(line.split(':', 1)[1].split())
+    except OSError:
+        pass
+    return set()
+
+
+def hardware_profile():
+    """Deteksi device & presisi yang aman dipakai Trainer"""
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else (os.cpu_count() or 1)
+    if torch.cuda.is_available():
+        bf16 = torch.cuda.is_bf16_supported()
+        return {"device": "cuda", "name": torch.cuda.get_device_name(0), "threads": cores,
+                "workers": min(4, max(1, cores // 2)), "bf16": bf16, "fp16": not bf16}
+    flags = _cpu_flags()
+    # bf16 di CPU hanya cepat dengan AMX / AVX512-BF16; tanpa itu justru lebih lambat dari fp32.
+    # fp16 tidak didukung Trainer di CPU.
+    bf16 = bool(flags & {'amx_bf16', 'avx512_bf16'})
+    # Data sudah ter-tokenisasi (collate murah): worker tambahan hanya merebut core dari matmul
+    return {"device": "cpu", "name": f"CPU ({cores} core)", "threads": cores,
+            "workers": 0, "bf16": bf16, "fp16": False}
+
+
+def apply_threads(profile):
+    torch.set_num_threads(profile['threads'])
+
+
+def training_arguments(output_dir, profile, epochs=3, **overrides):
+    """TrainingArguments bersama 02 & 04, disesuaikan dengan profil hardware"""
+    on_gpu = profile['device'] == 'cuda'
+    kwargs = dict(
+        output_dir=output_dir,
+        num_train_epochs=epochs,
+        per_device_train_batch_size=16,
+        per_device_eval_batch_size=64,
+        warmup_steps=100,
+        weight_decay=0.01,
+        logging_steps=50,
+        # GPU: evaluasi tiap 50 step; CPU: per epoch (evaluasi val set terlalu mahal tiap 50 step)
+        eval_strategy="steps" if on_gpu else "epoch",
+        save_strategy="steps" if on_gpu else "epoch",  # HARUS SAMA dengan eval
+        eval_steps=50,
+        save_steps=50,
+        save_total_limit=2,
+        load_best_model_at_end=True,
+        bf16=profile['bf16'],
+        fp16=profile['fp16'],
+        dataloader_num_workers=profile['workers'],
+        dataloader_pin_memory=on_gpu,
+        use_cpu=not on_gpu,
+        report_to="none"
+    )
+    # Batch berisi teks sepanjang mirip -> padding minimal (transformers 5 mengganti nama opsinya)
+    if 'group_by_length' in {f.name for f in dataclasses.fields(TrainingArguments)}:
+        kwargs['group_by_length'] = True
+    else:
+        kwargs['train_sampling_strategy'] = 'group_by_length'
+    kwargs.update(overrides)
+    return TrainingArguments(**kwargs)
+
+
+def build_trainer(model, args, train_dataset, eval_dataset, compute_metrics, tokenizer):
+    """Trainer bersama 02 & 04 (padding dinamis); transformers 5 mengganti argumen tokenizer= jadi processing_class="""
+    key = 'processing_class' if 'processing_class' in inspect.signature(Trainer.__init__).parameters else 'tokenizer'
+    return Trainer(model=model, args=args, train_dataset=train_dataset, eval_dataset=eval_dataset,
+                   compute_metrics=compute_metrics, data_collator=DataCollatorWithPadding(tokenizer=tokenizer),
+                   **{key: tokenizer})
+
+
+# ==========================================
+# 2. CACHE DATASET TER-TOKENISASI
+# ==========================================
+class TokenizedDataset(torch.utils.data.Dataset):
+    """input_ids tanpa padding; DataCollatorWithPadding mem-pad per batch"""
+    def __init__(self, input_ids, labels, texts):
+        self.input_ids = input_ids
+        self.labels = labels
+        self.texts = texts
+
+    def __getitem__(self, idx):
+        ids = self.input_ids[idx]
+        return {"input_ids": ids, "attention_mask": [1] * len(ids), "labels": self.labels[idx]}
+
+    def __len__(self):
+        return len(self.labels)
+
+
+def _fingerprint(tokenizer, texts, labels, max_length, test_size, random_state):
+    h = hashlib.sha1(f"v{CACHE_VERSION}|{type(tokenizer).__name__}|{max_length}|{test_size}|{random_state}".encode())
+    # Vocab (bukan nama/path) -> checkpoint dasar & model fine-tuned berbagi cache yang sama
+    h.update('\x1f'.join(f"{t}={i}" for t, i in sorted(tokenizer.get_vocab().items())).encode())
+    h.update('\x1f'.join(map(str, texts)).encode())
+    h.update(','.join(map(str, labels)).encode())
+    return h.hexdigest()[:12]
+
+
+def tokenized_splits(name, texts, labels, tokenizer, max_length=128, test_size=0.2, random_state=42):
+    """Split train/val (identik dengan train_test_split lama) + tokenisasi, di-cache di data/processed/tokenized"""
+    key = _fingerprint(tokenizer, texts, labels, max_length, test_size, random_state)
+    path = os.path.join(CACHE_DIR, f"{name}-{key}.pt")
+    if os.path.exists(path):
+        data = torch.load(path)
+        print(f"♻️  Dataset ter-tokenisasi dari cache: {os.path.relpath(path, BASE_DIR)}")
+    else:
+        train_texts, val_texts, train_labels, val_labels = train_test_split(
+            texts, labels, test_size=test_size, random_state=random_state)
+        encode = lambda t: tokenizer(list(map(str, t)), truncation=True, max_length=max_length)['input_ids']
+        data = {"train": (encode(train_texts), list(train_labels), list(train_texts)),
+                "val": (encode(val_texts), list(val_labels), list(val_texts))}
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        for old in glob.glob(os.path.join(CACHE_DIR, f"{name}-*.pt")):
+            os.remove(old)  # Cache versi data/tokenizer lama
+        torch.save(data, path)
+        print(f"💾 Dataset ter-tokenisasi disimpan: {os.path.relpath(path, BASE_DIR)}")
+    return TokenizedDataset(*data['train']), TokenizedDataset(*data['val'])
+
+
+def predict_dataset(model, tokenizer, dataset, device, batch_size=64):
+    """Prediksi label id seluruh dataset; batch diurutkan per panjang agar padding minimal"""
+    collator = DataCollatorWithPadding(tokenizer=tokenizer)
+    order = sorted(range(len(dataset)), key=lambda i: len(dataset.input_ids[i]))
+    preds = [None] * len(dataset)
+    for start in range(0, len(order), batch_size):
+        chunk = order[start:start + batch_size]
+        batch = collator([dataset[i] for i in chunk])
+        batch.pop('labels', None)
+        with torch.no_grad():
+            logits = model(**batch.to(device)).logits
+        for i, p in zip(chunk, logits.argmax(dim=1).tolist()):
+            preds[i] = p
+    return preds
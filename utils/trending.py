@@ -0,0 +1,262 @@
+"""
+Kata Trending Real-Time (Heavy-Hitter Sketch, memori tetap)
+- CountMinSketch : estimasi frekuensi semua unigram/bigram (array depth x width, conservative update)
+- SpaceSaving    : top-k kandidat heavy hitter (maksimal k entri)
+- DecayedCounter : CMS + SpaceSaving + total dengan peluruhan eksponensial (half-life)
+- TrendingTracker: jendela pendek (sekarang) vs baseline panjang -> lift = share sekarang / share baseline
+Peluruhan memakai "forward decay": bobot item = 2^((ts - landmark) / half_life), estimasi dibagi bobot "sekarang".
+Update tidak pernah menyentuh seluruh tabel kecuali saat landmark digeser (jarang), memori tidak tumbuh.
+"""
+import hashlib
+import heapq
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.preprocessing import clean_text
+from utils.term_index import STOPWORDS, MIN_TERM_LEN, DIGITS_RE
+
+# Eksponen bobot maksimum sebelum landmark digeser (2^40 masih jauh dari batas presisi float64)
+MAX_EXPONENT = 40
+
+
+def review_ngrams(text):
+    """Teks mentah -> set unigram + bigram (cleaning bersama + slang)
+    Unigram tanpa stopword; bigram cukup 1 kata bermakna ("tidak muncul", "notifikasi telat")."""
+    words = [w for w in clean_text(text, slang=True).split() if not DIGITS_RE.match(w)]
+    meaningful = [len(w) >= MIN_TERM_LEN and w not in STOPWORDS for w in words]
+    grams = {w for w, ok in zip(words, meaningful) if ok}
+    grams.update(f"{a} {b}" for a, b, ok_a, ok_b in zip(words, words[1:], meaningful, meaningful[1:])
+                 if (ok_a or ok_b) and a != b)
+    return grams
+
+
+# ==========================================
+# 1. COUNT-MIN SKETCH
+# ==========================================
+class CountMinSketch:
+    def __init__(self, width=16384, depth=4):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.float64)
+        self._rows = np.arange(depth)
+
+    def _index(self, terms):
+        """Hash stabil antar proses/restart (hash() bawaan Python diacak per proses).
+        Double hashing: baris i = (h1 + i * h2) mod width"""
+        idx = np.empty((len(terms), self.depth), dtype=np.int64)
+        for n, term in enumerate(terms):
+            digest = hashlib.blake2b(term.encode('utf-8'), digest_size=16).digest()
+            h1, h2 = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+            idx[n] = [(h1 + i * h2) % self.width for i in range(self.depth)]
+        return idx
+
+    def add(self, terms, weight=1.0):
+        """Conservative update: tiap sel hanya dinaikkan sampai estimasi min + weight (overestimasi lebih kecil)"""
+        if not terms:
+            return
+        idx = self._index(terms)
+        rows = np.broadcast_to(self._rows, idx.shape)
+        target = self.table[rows, idx].min(axis=1) + weight
+        np.maximum.at(self.table, (rows, idx), np.broadcast_to(target[:, None], idx.shape))
+
+    def query(self, terms):
+        if not terms:
+            return np.zeros(0)
+        idx = self._index(terms)
+        return self.table[np.broadcast_to(self._rows, idx.shape), idx].min(axis=1)
+
+
+# ==========================================
+# 2. SPACE-SAVING TOP-K
+# ==========================================
+class SpaceSaving:
+    """Maksimal k counter; item baru mengganti counter terkecil (error = nilai counter yang diganti)
+    Min-heap lazy: counter hanya naik, entri heap yang basi disegarkan saat muncul di puncak."""
+    def __init__(self, k=256):
+        self.k = k
+        self.counters = {}  # term -> [count, error]
+        self.heap = []      # (count saat di-push, term), tepat 1 entri per term
+
+    def add(self, term, weight=1.0):
+        entry = self.counters.get(term)
+        if entry is not None:
+            entry[0] += weight
+        elif len(self.counters) < self.k:
+            self.counters[term] = [weight, 0.0]
+            heapq.heappush(self.heap, (weight, term))
+        else:
+            while self.heap[0][0] != self.counters[self.heap[0][1]][0]:
+                heapq.heapreplace(self.heap, (self.counters[self.heap[0][1]][0], self.heap[0][1]))
+            floor, victim = self.heap[0]
+            del self.counters[victim]
+            self.counters[term] = [floor + weight, floor]
+            heapq.heapreplace(self.heap, (floor + weight, term))
+
+    def rebuild(self):
+        """Setelah count diskalakan / dimuat dari disk"""
+        self.heap = [(count, term) for term, (count, _) in self.counters.items()]
+        heapq.heapify(self.heap)
+
+    def top(self, n):
+        return sorted(self.counters.items(), key=lambda kv: kv[1][0], reverse=True)[:n]
+
+
+# ==========================================
+# 3. COUNTER DENGAN PELURUHAN WAKTU
+# ==========================================
+class DecayedCounter:
+    def __init__(self, half_life, width=16384, depth=4, k=256):
+        self.half_life = half_life
+        self.cms = CountMinSketch(width, depth)
+        self.topk = SpaceSaving(k)
+        self.total = 0.0
+        self.landmark = None  # Waktu item pertama (replay histori tidak underflow ke 0)
+
+    def _weight(self, ts):
+        return 2.0 ** ((ts - self.landmark) / self.half_life)
+
+    def advance(self, ts):
+        """Geser landmark jika bobot `ts` terlalu besar: skala ulang semua nilai
+        (O(ukuran tabel), terjadi tiap ~MAX_EXPONENT half-life; jeda sangat panjang -> semua luruh ke 0)"""
+        if self.landmark is None:
+            self.landmark = ts
+        elif (ts - self.landmark) / self.half_life > MAX_EXPONENT:
+            factor = 2.0 ** ((self.landmark - ts) / self.half_life)
+            self.cms.table *= factor
+            for entry in self.topk.counters.values():
+                entry[0] *= factor
+                entry[1] *= factor
+            self.topk.rebuild()
+            self.total *= factor
+            self.landmark = ts
+
+    def add(self, terms, ts):
+        self.advance(ts)
+        weight = self._weight(ts)
+        terms = list(terms)
+        self.cms.add(terms, weight)
+        for term in terms:
+            self.topk.add(term, weight)
+        self.total += weight
+
+    def estimate(self, terms, now):
+        """Jumlah kejadian ter-decay per term pada waktu `now` (panggil advance(now) dulu)"""
+        return self.cms.query(list(terms)) / self._weight(now)
+
+    def decayed_total(self, now):
+        return self.total / self._weight(now) if self.landmark is not None else 0.0
+
+
+# ==========================================
+# 4. TRENDING TRACKER (JENDELA PENDEK VS BASELINE)
+# ==========================================
+class TrendingTracker:
+    def __init__(self, short_half_life=6 * 3600, long_half_life=7 * 86400, width=16384, depth=4, k=256,
+                 min_count=3.0):
+        self.min_count = min_count
+        self.short = DecayedCounter(short_half_life, width, depth, k)
+        self.long = DecayedCounter(long_half_life, width, depth, k)
+        self._lock = threading.Lock()
+
+    def observe(self, text, ts=None):
+        """1 review / teks analisis -> update kedua jendela (tiap n-gram dihitung sekali per review)"""
+        grams = review_ngrams(text)
+        if not grams:
+            return
+        ts = float(ts) if ts is not None else time.time()
+        with self._lock:
+            self.short.add(grams, ts)
+            self.long.add(grams, ts)
+
+    def trending(self, top=20, now=None):
+        """Kandidat = heavy hitter jendela pendek; lift = share sekarang / share baseline (smoothing +1)"""
+        now = now if now is not None else time.time()
+        with self._lock:
+            candidates = [term for term, _ in self.short.topk.top(self.short.topk.k)]
+            if not candidates:
+                return []
+            self.short.advance(now)
+            self.long.advance(now)
+            recent = self.short.estimate(candidates, now)
+            baseline = self.long.estimate(candidates, now)
+            short_total = self.short.decayed_total(now)
+            long_total = self.long.decayed_total(now)
+
+        results = []
+        for term, r, b in zip(candidates, recent, baseline):
+            if r < self.min_count:
+                continue
+            share_now = r / short_total
+            share_base = (b + 1.0) / (long_total + 1.0)
+            results.append({
+                "term": term,
+                "ngram": 2 if ' ' in term else 1,
+                "recent": round(float(r), 2),
+                "baseline": round(float(b), 2),
+                "share": round(float(share_now), 4),
+                "lift": round(float(share_now / share_base), 2)
+            })
+        results.sort(key=lambda t: t['lift'], reverse=True)
+        return results[:top]
+
+    def heavy_hitters(self, top=20, now=None):
+        """Term paling sering di jendela pendek (tanpa pembanding baseline)"""
+        now = now if now is not None else time.time()
+        with self._lock:
+            items = self.short.topk.top(top)
+            if not items:
+                return []
+            self.short.advance(now)
+            scale = 1.0 / self.short._weight(now)
+        return [{"term": t, "recent": round(float(c * scale), 2), "error": round(float(e * scale), 2)}
+                for t, (c, e) in items]
+
+    def memory_bytes(self):
+        return self.short.cms.table.nbytes + self.long.cms.table.nbytes
+
+    # --- PERSISTENSI ---
+    def save(self, path):
+        with self._lock:
+            arrays = {}
+            for name, counter in (('short', self.short), ('long', self.long)):
+                terms = list(counter.topk.counters)
+                arrays[f'{name}_table'] = counter.cms.table
+                landmark = counter.landmark if counter.landmark is not None else np.nan
+                arrays[f'{name}_meta'] = np.array([counter.half_life, counter.total, landmark])
+                arrays[f'{name}_terms'] = np.array(terms, dtype=str)
+                arrays[f'{name}_counts'] = np.array([counter.topk.counters[t] for t in terms], dtype=np.float64).reshape(-1, 2)
+            # tmp per proses: beberapa worker gunicorn bisa menyimpan bersamaan saat shutdown
+            tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+            np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        """Muat state tersimpan; mulai kosong jika file tidak ada / ukuran sketch atau half-life berubah"""
+        tracker = cls(**kwargs)
+        if not os.path.exists(path):
+            return tracker
+        with np.load(path) as data:
+            for name, counter in (('short', tracker.short), ('long', tracker.long)):
+                half_life, total, landmark = data[f'{name}_meta']
+                if data[f'{name}_table'].shape != counter.cms.table.shape or half_life != counter.half_life:
+                    return cls(**kwargs)
+                counter.cms.table[:] = data[f'{name}_table']
+                counter.total = float(total)
+                counter.landmark = None if np.isnan(landmark) else float(landmark)
+                for term, (count, error) in zip(data[f'{name}_terms'][:counter.topk.k], data[f'{name}_counts']):
+                    counter.topk.counters[str(term)] = [float(count), float(error)]
+                counter.topk.rebuild()
+        return tracker
+
+
+def trending_listener(tracker):
+    """Listener ingest: tiap review baru meng-update sketch dengan waktu review-nya"""
+    def _update(records):
+        for r in records:
+            tracker.observe(r['Komentar'], ts=pd.Timestamp(r['Tanggal']).timestamp())
+    return _update
@@ -0,0 +1,150 @@
+"""
+Pelindung Upstream BMKG: circuit breaker per host, hedged request, budget latensi per route
+- CircuitBreaker : N kegagalan beruntun -> OPEN (call ditolak instan, pemanggil menyajikan data baik terakhir);
+                   setelah reset_timeout -> HALF_OPEN (1 probe); probe sukses -> CLOSED, gagal -> OPEN lagi
+- LatencyWindow  : latensi sukses terakhir per feed; persentil-nya (mis. p95) = jeda sebelum request cadangan (hedge)
+- budget         : tenggat end-to-end 1 request Flask (contextvar); timeout tiap call upstream dipotong ke sisa budget
+"""
+import contextvars
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+from utils.metrics import REGISTRY
+
+CLOSED, HALF_OPEN, OPEN = 'closed', 'half_open', 'open'
+STATE_CODES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+_deadline = contextvars.ContextVar('upstream_deadline', default=None)
+_BREAKERS = []  # Semua breaker di proses ini (gauge /metrics)
+
+SHORT_CIRCUITS = REGISTRY.counter(
+    'bmkg_upstream_short_circuit_total', 'Call upstream yang ditolak tanpa request (breaker OPEN / budget habis)',
+    ('host', 'reason'))
+HEDGES = REGISTRY.counter(
+    'bmkg_upstream_hedges_total', 'Request cadangan (hedge) per feed: sent = dikirim, won = lebih cepat dari request utama',
+    ('feed', 'outcome'))
+
+
+class UpstreamUnavailable(Exception):
+    """Breaker host OPEN atau budget latensi route habis; pemanggil menyajikan data baik terakhir"""
+
+
+# ==========================================
+# 1. CIRCUIT BREAKER
+# ==========================================
+class CircuitBreaker:
+    def __init__(self, host, failure_threshold=5, reset_timeout=30.0):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0          # Kegagalan beruntun
+        self.opened_at = 0.0
+        self.probing = False       # HALF_OPEN: 1 probe sedang berjalan
+        self.stats = {"successes": 0, "failures": 0, "short_circuits": 0, "opens": 0}
+        self._lock = threading.Lock()
+        _BREAKERS.append(self)
+
+    def allow(self):
+        """True jika call boleh dikirim; OPEN -> False sampai reset_timeout lewat, lalu 1 probe"""
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state, self.probing = HALF_OPEN, False
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self.probing:
+                self.probing = True
+                return True
+            self.stats['short_circuits'] += 1
+            return False
+
+    def record(self, ok):
+        with self._lock:
+            if ok:
+                self.stats['successes'] += 1
+                if self.state != CLOSED:
+                    print(f"✅ Circuit breaker {self.host}: CLOSED")
+                self.state, self.failures, self.probing = CLOSED, 0, False
+                return
+            self.stats['failures'] += 1
+            if self.state == OPEN:
+                return  # Call lama yang selesai setelah breaker terbuka tidak memperpanjang jeda
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.stats['opens'] += 1
+                self.state, self.opened_at, self.probing = OPEN, time.monotonic(), False
+                print(f"⚠️ Circuit breaker {self.host}: OPEN ({self.failures} gagal beruntun, coba lagi {self.reset_timeout:.0f} s)")
+
+    def release(self):
+        """Call selesai tanpa bukti sehat/gagal (budget route habis): probe HALF_OPEN dilepas tanpa mengubah state"""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self.probing = False
+
+    def snapshot(self):
+        with self._lock:
+            retry_in = max(self.reset_timeout - (time.monotonic() - self.opened_at), 0) if self.state == OPEN else 0
+            return dict(self.stats, host=self.host, state=self.state, consecutive_failures=self.failures,
+                        retry_in_seconds=round(retry_in, 1))
+
+
+def _breaker_states():
+    for breaker in list(_BREAKERS):
+        yield {"host": breaker.host}, STATE_CODES[breaker.state]
+
+
+REGISTRY.gauge('bmkg_upstream_breaker_state', 'State circuit breaker per host upstream (0=closed, 1=half_open, 2=open)',
+               ('host',), callback=_breaker_states)
+
+
+# ==========================================
+# 2. LATENSI (DELAY HEDGE)
+# ==========================================
+class LatencyWindow:
+    def __init__(self, size=200, min_samples=20):
+        self.samples = deque(maxlen=size)
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        with self._lock:
+            self.samples.append(seconds)
+
+    def percentile(self, q):
+        """Persentil latensi sukses terakhir (detik); None sebelum sampel cukup (belum ada dasar untuk hedge)"""
+        with self._lock:
+            if len(self.samples) < self.min_samples:
+                return None
+            samples = list(self.samples)
+        return float(np.percentile(samples, q))
+
+
+# ==========================================
+# 3. BUDGET LATENSI PER REQUEST
+# ==========================================
+def set_budget(seconds):
+    """Mulai tenggat untuk konteks saat ini (None = tanpa batas) -> token untuk reset_budget"""
+    return _deadline.set(time.monotonic() + seconds if seconds else None)
+
+
+def reset_budget(token):
+    _deadline.reset(token)
+
+
+@contextmanager
+def budget(seconds):
+    token = set_budget(seconds)
+    try:
+        yield
+    finally:
+        reset_budget(token)
+
+
+def remaining():
+    """Sisa budget (detik) konteks saat ini; None jika tanpa batas"""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
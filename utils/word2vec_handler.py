@@ -1,6 +1,7 @@
 # utils/word2vec_handler.py
 from gensim.models import KeyedVectors
 import os
+from utils.metrics import WORD2VEC_LATENCY
 
 class Word2VecHandler:
     def __init__(self, model_path=None):
@@ -10,7 +11,9 @@ class Word2VecHandler:
 
     def get_similar(self, word, topn=10):
         try:
-            results = self.model.most_similar(word, topn=topn)
+            with WORD2VEC_LATENCY.time():
+                # Normalisasi slang bisa menghasilkan >1 kata ("makasih" -> "terima kasih"): rata-rata vektornya
+                results = self.model.most_similar(positive=word.split(), topn=topn)
             return [{"word": w, "score": float(s)} for w, s in results]
         except Exception as e:
             return []